@@ -2,22 +2,51 @@
 Account endpoints: CRUD, search, filtering.
 """
 import uuid
+from datetime import datetime
+from decimal import Decimal
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.core.auth import get_current_user
-from app.models.models import User, Account, Contact
+from app.models.models import User, Account, AccountSummary, Contact
 from app.schemas.schemas import (
-    AccountCreate, AccountUpdate, AccountResponse, AccountListResponse,
-    ContactResponse,
+    AccountCreate, AccountUpdate, AccountResponse, AccountListResponse, AccountFilter,
+    AccountMergeRequest, AccountMergeResponse, ContactResponse,
+    AccountOverviewResponse, AccountOverviewSummary, PolicyResponse, ServiceItemResponse, TaskResponse,
+    NoteResponse, CommLogResponse,
 )
+from app.services.account_overview import load_account_overview
+from app.services.account_summaries import SUMMARY_FIELDS, mark_summaries_stale
 from app.services.audit import audit_create, audit_update, audit_delete
+from app.services.duplicates import flag_duplicates
+from app.services.entities import ids_condition, parse_ids
+from app.services.filters import account_conditions
+from app.services.merge import MergeError, merge_accounts
+from app.services.ndjson import FORMATS, ndjson_response
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
+SORTS = {
+    "name": Account.name,
+    "policy_count": AccountSummary.policy_count,
+    "active_premium": AccountSummary.active_premium,
+    "written_premium": AccountSummary.written_premium,
+    "open_service_items": AccountSummary.open_service_items,
+    "last_contact_at": AccountSummary.last_contact_at,
+}
+
+
+def _account_item(row) -> AccountResponse:
+    account, summary = row
+    item = AccountResponse.model_validate(account)
+    if summary is not None:
+        for field in SUMMARY_FIELDS:
+            setattr(item, field, getattr(summary, field))
+    return item
+
 
 @router.get("", response_model=AccountListResponse)
 async def list_accounts(
@@ -28,44 +57,56 @@ async def list_accounts(
     status: Optional[str] = None,
     zip_code: Optional[str] = None,
     county: Optional[str] = None,
+    min_policies: Optional[int] = None,
+    max_policies: Optional[int] = None,
+    min_premium: Optional[Decimal] = None,
+    max_premium: Optional[Decimal] = None,
+    min_written_premium: Optional[Decimal] = None,
+    has_open_service_items: Optional[bool] = None,
+    last_contact_before: Optional[datetime] = None,
+    last_contact_after: Optional[datetime] = None,
+    sort: str = Query("name", pattern=f"^({'|'.join(SORTS)})$"),
+    descending: bool = False,
+    ids: Optional[str] = Query(None, description="Comma-separated ids (batch fetch, max 100)"),
+    format: str = Query("json", pattern=FORMATS, description="ndjson streams every match, one account per line"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = select(Account)
-
-    # Filters
-    if search:
-        query = query.where(
-            or_(
-                Account.name.ilike(f"%{search}%"),
-                Account.email.ilike(f"%{search}%"),
-                Account.phone.ilike(f"%{search}%"),
-            )
-        )
-    if type:
-        query = query.where(Account.type == type)
-    if status:
-        query = query.where(Account.status == status)
-    if zip_code:
-        query = query.where(Account.zip_code == zip_code)
-    if county:
-        query = query.where(Account.county.ilike(f"%{county}%"))
-
-    # Role-based filtering: Producers see only assigned accounts
-    if current_user.role == "Producer":
-        query = query.where(Account.assigned_producer_id == current_user.id)
-
-    # Count
-    count_q = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_q)).scalar()
+    # Filters (shared with bulk operations; includes role-based scoping)
+    filters = AccountFilter(
+        search=search, type=type, status=status, zip_code=zip_code, county=county,
+        min_policies=min_policies, max_policies=max_policies, min_premium=min_premium, max_premium=max_premium,
+        min_written_premium=min_written_premium, has_open_service_items=has_open_service_items,
+        last_contact_before=last_contact_before, last_contact_after=last_contact_after,
+    )
+    query = (
+        select(Account, AccountSummary)
+        .outerjoin(AccountSummary, AccountSummary.account_id == Account.id)
+        .where(*account_conditions(filters, current_user))
+    )
+    if ids:
+        # Batch fetch: just these records, unpaginated
+        try:
+            id_list = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(ids_condition(Account.id, id_list))
+        page, page_size = 1, len(id_list)
 
-    # Paginate
-    query = query.order_by(Account.name).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    accounts = result.scalars().all()
+    # Sort (rollup columns are indexed on account_summaries)
+    order = SORTS[sort].desc().nullslast() if descending else SORTS[sort].asc().nullslast()
+    query = query.order_by(order, Account.name)
+    if format == "ndjson":
+        return ndjson_response(query.order_by(Account.id), _account_item)
+
+    # Count and paginate
+    count_q = select(func.count()).select_from(query.order_by(None).subquery())
+    total = (await db.execute(count_q)).scalar()
+    result = await db.execute(query.offset((page - 1) * page_size).limit(page_size))
+    items = [_account_item(row) for row in result.all()]
 
     return AccountListResponse(
-        items=[AccountResponse.model_validate(a) for a in accounts],
+        items=items,
         total=total,
         page=page,
         page_size=page_size,
@@ -85,16 +126,39 @@ async def create_account(
     account = Account(**body.model_dump())
     db.add(account)
     await db.flush()
+    mark_summaries_stale(db, [account.id])
 
     await audit_create(
         db, current_user.id, "Account", account.id,
         ip=request.client.host if request.client else None,
         ua=request.headers.get("user-agent"),
     )
+    await flag_duplicates(db, "Account", account)
 
     return AccountResponse.model_validate(account)
 
 
+@router.post("/merge", response_model=AccountMergeResponse)
+async def merge_duplicate_accounts(
+    body: AccountMergeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Merge each merged_id into its survivor_id: policies, contacts, service items,
+    sales, notes, communications, documents, tasks and tags move to the survivor,
+    which keeps its own values (blanks are filled) and the merged account is
+    deleted. All pairs are applied in one transaction.
+    """
+    if current_user.role != "Admin":
+        raise HTTPException(status_code=403, detail="Only admins can merge accounts")
+
+    try:
+        return await merge_accounts(db, [(p.survivor_id, p.merged_id) for p in body.pairs], current_user.id)
+    except MergeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{account_id}", response_model=AccountResponse)
 async def get_account(
     account_id: uuid.UUID,
@@ -113,6 +177,55 @@ async def get_account(
     return AccountResponse.model_validate(account)
 
 
+@router.get("/{account_id}/overview", response_model=AccountOverviewResponse)
+async def get_account_overview(
+    account_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Account 360 for the detail page: the account, its contacts, policies, open
+    service items, open tasks, recent notes and communications, and summary
+    numbers, in one request. Lists are capped; summary holds the full counts.
+    """
+    result = await db.execute(select(Account).where(Account.id == account_id))
+    account = result.scalar_one_or_none()
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    # Role check: Producer can only see assigned accounts
+    if current_user.role == "Producer" and account.assigned_producer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    data = await load_account_overview(db, account)
+
+    policies = []
+    for row in data["policies"]:
+        item = PolicyResponse.model_validate(row[0])
+        item.carrier_name = row.carrier_name
+        item.account_name = account.name
+        policies.append(item)
+
+    service_items = []
+    for row in data["service_items"]:
+        item = ServiceItemResponse.model_validate(row[0])
+        item.account_name = account.name
+        item.policy_lob = row.policy_lob
+        item.assignee_name = row.assignee_name
+        service_items.append(item)
+
+    return AccountOverviewResponse(
+        account=AccountResponse.model_validate(account),
+        contacts=[ContactResponse.model_validate(c) for c in data["contacts"]],
+        policies=policies,
+        service_items=service_items,
+        tasks=[TaskResponse.model_validate(t) for t in data["tasks"]],
+        notes=[NoteResponse.model_validate(n) for n in data["notes"]],
+        comm_logs=[CommLogResponse.model_validate(c) for c in data["comm_logs"]],
+        summary=AccountOverviewSummary(**data["summary"]),
+    )
+
+
 @router.put("/{account_id}", response_model=AccountResponse)
 async def update_account(
     account_id: uuid.UUID,
@@ -0,0 +1,65 @@
+"""
+Book-of-business analytics: group-by / filter reports over the policy cube
+(in-force premium by carrier, LOB, producer or county; retention; expiring
+premium by month).
+"""
+import uuid
+from typing import Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import get_current_user
+from app.models.models import User
+from app.schemas.schemas import BookCubeResponse
+from app.services.book_cube import DIMENSIONS, cube_conditions, query_book_cube
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get("/book", response_model=BookCubeResponse)
+async def book_of_business(
+    group_by: str = Query("carrier", description="Comma-separated: " + ", ".join(DIMENSIONS)),
+    carrier_id: Optional[uuid.UUID] = None,
+    line_of_business: Optional[str] = None,
+    producer_id: Optional[uuid.UUID] = None,
+    county: Optional[str] = None,
+    account_type: Optional[str] = None,
+    status: Optional[str] = Query(None, description="Policy status, e.g. Active for in-force"),
+    effective_from: Optional[date] = None,
+    effective_to: Optional[date] = None,
+    expiration_from: Optional[date] = None,
+    expiration_to: Optional[date] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Policy count, premium, renewed count and retention grouped by any of the
+    cube's dimensions. Served from the policy_book_cube materialized view, so
+    figures are as of `refreshed_at` (refreshed hourly by the worker).
+
+    Examples:
+      in-force premium by carrier x LOB   ?group_by=carrier,lob&status=Active
+      retention by carrier                ?group_by=carrier&expiration_from=2025-01-01&expiration_to=2025-12-31
+      expiring premium curve              ?group_by=expiration_month&status=Active&expiration_from=2026-01-01
+    """
+    dims = list(dict.fromkeys(d.strip() for d in group_by.split(",") if d.strip()))
+    unknown = [d for d in dims if d not in DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension(s): {', '.join(unknown)}")
+
+    conditions = cube_conditions(
+        carrier_id=carrier_id,
+        line_of_business=line_of_business,
+        producer_id=producer_id,
+        county=county,
+        account_type=account_type,
+        status=status,
+        effective_from=effective_from,
+        effective_to=effective_to,
+        expiration_from=expiration_from,
+        expiration_to=expiration_to,
+    )
+    return await query_book_cube(db, dims, conditions, limit=limit)
@@ -1,17 +1,20 @@
 """
-Carrier endpoints: CRUD for carriers and carrier contacts.
+Carrier endpoints: CRUD for carriers and carrier contacts, and carrier
+policy/billing download ingestion.
 """
+import json
 import uuid
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, require_role
 from app.models.models import User, Carrier, CarrierContact
-from app.schemas.schemas import CarrierCreate, CarrierResponse
+from app.schemas.schemas import CarrierCreate, CarrierResponse, CarrierDownloadResponse
 from app.services.audit import audit_create
+from app.services.carrier_downloads import ingest_download
 
 router = APIRouter(prefix="/carriers", tags=["Carriers"])
 
@@ -55,3 +58,35 @@ async def get_carrier(
     if not carrier:
         raise HTTPException(status_code=404, detail="Carrier not found")
     return CarrierResponse.model_validate(carrier)
+
+
+@router.post("/{carrier_id}/downloads", response_model=CarrierDownloadResponse)
+async def ingest_carrier_download(
+    carrier_id: uuid.UUID,
+    file: UploadFile = File(...),
+    kind: str = Form(..., pattern="^(policies|billing)$"),
+    layout: Optional[str] = Form(None),
+    dry_run: bool = Form(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """
+    Apply a carrier policy or billing download. CSV files need a header row;
+    fixed-width files need `layout`, a JSON object of field -> [start, end]
+    character offsets. Only lines that differ from current data are written.
+    Use dry_run to preview the counts without writing.
+    """
+    carrier = (await db.execute(select(Carrier.id).where(Carrier.id == carrier_id))).scalar_one_or_none()
+    if not carrier:
+        raise HTTPException(status_code=404, detail="Carrier not found")
+
+    try:
+        parsed_layout = json.loads(layout) if layout else None
+        result = await ingest_download(
+            db, file.file, carrier_id, kind, file.filename or "", current_user.id,
+            layout=parsed_layout, apply=not dry_run,
+        )
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CarrierDownloadResponse(**result.__dict__)
@@ -0,0 +1,73 @@
+"""
+Commission endpoints: expected commission generation and carrier statement
+reconciliation.
+"""
+import uuid
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import require_role
+from app.models.models import User, Carrier
+from app.schemas.schemas import ExpectedCommissionRequest, ExpectedCommissionResponse, ReconcileResponse
+from app.services.commissions import generate_expected_commissions, reconcile_statement
+
+router = APIRouter(prefix="/commissions", tags=["Commissions"])
+
+
+@router.post("/expected", response_model=ExpectedCommissionResponse)
+async def generate_expected(
+    body: ExpectedCommissionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """
+    Upsert expected commissions from policy premiums and carrier rates. By default
+    only policies and carriers changed since the last run are recomputed; Expected
+    rows of policies that are no longer Active are removed.
+    """
+    return await generate_expected_commissions(db, period=body.period, full=body.full)
+
+
+@router.post("/reconcile", response_model=ReconcileResponse)
+async def reconcile_commission_statement(
+    file: UploadFile = File(...),
+    carrier_id: uuid.UUID = Form(...),
+    period: str = Form(..., max_length=50),
+    received_date: Optional[date] = Form(None),
+    tolerance: Decimal = Form(Decimal("1.00"), ge=0),
+    dry_run: bool = Form(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """
+    Reconcile a carrier commission statement (CSV with policy number and commission
+    amount columns; an optional period column overrides `period` per line).
+    Received amounts within `tolerance` of expected are marked Received, others
+    Discrepancy. Use dry_run to preview the report without writing.
+    """
+    carrier = (await db.execute(select(Carrier.id).where(Carrier.id == carrier_id))).scalar_one_or_none()
+    if not carrier:
+        raise HTTPException(status_code=404, detail="Carrier not found")
+
+    try:
+        result = await reconcile_statement(
+            db, file.file, carrier_id, period, received_date or date.today(), tolerance,
+            current_user.id, apply=not dry_run,
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ReconcileResponse(
+        lines=result.lines,
+        matched_lines=result.matched_lines,
+        updated=result.updated,
+        unmatched_count=result.unmatched_count,
+        unmatched=result.unmatched,
+        variances=result.variances,
+        missing=result.missing,
+    )
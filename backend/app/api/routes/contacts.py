@@ -11,6 +11,7 @@ from app.core.auth import get_current_user
 from app.models.models import User, Contact
 from app.schemas.schemas import ContactCreate, ContactUpdate, ContactResponse
 from app.services.audit import audit_create, audit_update
+from app.services.duplicates import flag_duplicates
 
 router = APIRouter(prefix="/contacts", tags=["Contacts"])
 
@@ -31,6 +32,7 @@ async def create_contact(
 
     await audit_create(db, current_user.id, "Contact", contact.id,
                        ip=request.client.host if request.client else None)
+    await flag_duplicates(db, "Contact", contact)
     return ContactResponse.model_validate(contact)
 
 
@@ -85,7 +85,7 @@ async def get_dashboard(
     inst_due_week = (await db.execute(inst_due_week_q)).scalar() or 0
 
     inst_past_due_q = select(func.count(Installment.id)).where(
-        and_(Installment.due_date < today, Installment.status.in_(["Scheduled", "Reminded"]))
+        and_(Installment.due_date < today, Installment.status.in_(["Scheduled", "Reminded", "Past Due"]))
     )
     inst_past_due = (await db.execute(inst_past_due_q)).scalar() or 0
 
@@ -0,0 +1,204 @@
+"""
+Document endpoints: streaming upload/download and listing for any linked entity.
+
+Uploads take the raw file as the request body (Content-Type and Content-Length
+required) with metadata in the query string, so bytes stream straight to
+storage in fixed-size chunks instead of being buffered. Storage is content-
+addressed on the digest computed here while streaming (see app.services.blobs);
+X-Content-SHA256, when sent, is only checked against it. Downloads support a
+single HTTP Range.
+"""
+import re
+import uuid
+from typing import Optional
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import commit, get_db
+from app.core.auth import get_current_user
+from app.models.models import User, Document
+from app.schemas.schemas import DocumentResponse
+from app.services.audit import audit_create, audit_delete
+from app.services import blobs
+from app.services.storage import StorageError, fixed_chunks, get_storage, storage_for
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """(start, end) inclusive for a single 'bytes=' range, or None for the whole file."""
+    if not header:
+        return None
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # unsupported forms (e.g. multiple ranges) get the full body
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+async def _get_document(db: AsyncSession, document_id: uuid.UUID) -> Document:
+    result = await db.execute(select(Document).where(Document.id == document_id))
+    document = result.scalar_one_or_none()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+@router.get("", response_model=list[DocumentResponse])
+async def list_documents(
+    linked_entity_type: str = Query(...),
+    linked_entity_id: uuid.UUID = Query(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = await db.execute(
+        select(Document)
+        .where(and_(Document.linked_entity_type == linked_entity_type, Document.linked_entity_id == linked_entity_id))
+        .order_by(Document.uploaded_at.desc())
+    )
+    return [DocumentResponse.model_validate(d) for d in result.scalars().all()]
+
+
+@router.post("", response_model=DocumentResponse, status_code=201)
+async def upload_document(
+    request: Request,
+    name: str = Query(..., min_length=1, max_length=255),
+    linked_entity_type: str = Query(...),
+    linked_entity_id: uuid.UUID = Query(...),
+    category: Optional[str] = Query(None, max_length=50),
+    description: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Upload a file as the raw request body."""
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot upload documents")
+
+    content_length = request.headers.get("content-length")
+    if not content_length or not content_length.isdigit():
+        raise HTTPException(status_code=411, detail="Content-Length required")
+    size = int(content_length)
+    if size > settings.DOCUMENT_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    declared_hash = (request.headers.get("x-content-sha256") or "").lower() or None
+    if declared_hash and not SHA256_HEX.match(declared_hash):
+        raise HTTPException(status_code=400, detail="X-Content-SHA256 must be a hex SHA-256 digest")
+
+    # The bytes are always transferred: linking by a client-supplied hash alone
+    # would hand out any stored file to whoever knows its digest
+    try:
+        storage = get_storage()
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    key = f"blobs/{uuid.uuid4()}"
+    # Committed before the transfer (which also frees the pooled connection
+    # meanwhile): sweeps the upload unless the document below commits
+    guard_id = await blobs.guard_upload(db, storage, key)
+    await commit(db)
+
+    digest = blobs.new_digest()
+    try:
+        stored = await storage.upload(key, blobs.hashing(fixed_chunks(request.stream()), digest), size)
+    except StorageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    content_hash = digest.hexdigest()
+    if declared_hash and declared_hash != content_hash:
+        raise HTTPException(status_code=400, detail="Content does not match X-Content-SHA256")
+    # Links to the stored blob (and queues this copy's removal) if the content was stored already
+    blob = await blobs.register(db, content_hash, stored.size, storage, stored.ref, guard_id)
+
+    onedrive = blob.storage == "onedrive"
+    document = Document(
+        name=name,
+        file_path=None if onedrive else blob.ref,
+        onedrive_file_id=blob.ref if onedrive else None,
+        content_hash=blob.sha256,
+        file_type=request.headers.get("content-type", "application/octet-stream")[:50],
+        file_size=blob.size,
+        category=category,
+        linked_entity_type=linked_entity_type,
+        linked_entity_id=linked_entity_id,
+        description=description,
+        uploaded_by=current_user.id,
+    )
+    db.add(document)
+    await db.flush()
+    await audit_create(db, current_user.id, "Document", document.id)
+    return DocumentResponse.model_validate(document)
+
+
+@router.get("/{document_id}/content")
+async def download_document(
+    document_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream a document's bytes. Honors a single `Range: bytes=` request header."""
+    document = await _get_document(db, document_id)
+    size = document.file_size or 0
+    ref = document.onedrive_file_id or document.file_path
+    if not ref:
+        raise HTTPException(status_code=404, detail="Document has no stored content")
+
+    byte_range = _parse_range(request.headers.get("range"), size) if size else None
+    start, end = byte_range or (0, size - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1 if size else 0),
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(document.name)}",
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    try:
+        storage = storage_for(document.onedrive_file_id)
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    body = storage.download(ref, start, end) if size else iter(())
+    return StreamingResponse(
+        body,
+        status_code=206 if byte_range else 200,
+        media_type=document.file_type or "application/octet-stream",
+        headers=headers,
+    )
+
+
+@router.delete("/{document_id}", status_code=204)
+async def delete_document(
+    document_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot delete documents")
+
+    document = await _get_document(db, document_id)
+    content_hash = document.content_hash
+    await db.delete(document)
+    await db.flush()
+    # Stored objects are removed by the blob sweep once this commits
+    if content_hash:
+        await blobs.release(db, content_hash)
+    elif document.onedrive_file_id or document.file_path:
+        await blobs.queue_deletion(db, "onedrive" if document.onedrive_file_id else "local",
+                                   document.onedrive_file_id or document.file_path)
+    await audit_delete(db, current_user.id, "Document", document.id,
+                       ip=request.client.host if request.client else None)
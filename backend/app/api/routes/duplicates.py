@@ -0,0 +1,80 @@
+"""
+Duplicate detection endpoints: check a record before saving it, and review the
+candidate pairs flagged on create and by the nightly scan.
+"""
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import get_current_user
+from app.models.models import User, DuplicateCandidate
+from app.schemas.schemas import (
+    DuplicateCheckRequest, DuplicateMatch, DuplicateCandidateResponse, DuplicateCandidateUpdate,
+)
+from app.services.audit import audit_update
+from app.services.duplicates import check_duplicates
+
+router = APIRouter(prefix="/duplicates", tags=["Duplicates"])
+
+
+@router.post("/check", response_model=list[DuplicateMatch])
+async def check_for_duplicates(
+    body: DuplicateCheckRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Likely existing duplicates of the record being entered, best match first."""
+    values = body.model_dump(exclude={"entity_type", "exclude_id"})
+    matches = await check_duplicates(db, body.entity_type, values, exclude_id=body.exclude_id)
+    return [DuplicateMatch.model_validate(m) for m in matches]
+
+
+@router.get("", response_model=list[DuplicateCandidateResponse])
+async def list_duplicate_candidates(
+    entity_type: Optional[str] = Query(None, pattern="^(Account|Contact|Prospect)$"),
+    status: str = Query("Open", pattern="^(Open|Dismissed|Merged)$"),
+    min_score: Optional[float] = Query(None, ge=0, le=1),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query = select(DuplicateCandidate).where(DuplicateCandidate.status == status)
+    if entity_type:
+        query = query.where(DuplicateCandidate.entity_type == entity_type)
+    if min_score is not None:
+        query = query.where(DuplicateCandidate.score >= min_score)
+    query = query.order_by(DuplicateCandidate.score.desc(), DuplicateCandidate.id).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return [DuplicateCandidateResponse.model_validate(c) for c in result.scalars().all()]
+
+
+@router.put("/{candidate_id}", response_model=DuplicateCandidateResponse)
+async def update_duplicate_candidate(
+    candidate_id: uuid.UUID,
+    body: DuplicateCandidateUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Dismiss a pair (not duplicates) or reopen it."""
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot review duplicates")
+
+    result = await db.execute(select(DuplicateCandidate).where(DuplicateCandidate.id == candidate_id))
+    candidate = result.scalar_one_or_none()
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Duplicate candidate not found")
+    if candidate.status == "Merged":
+        raise HTTPException(status_code=400, detail="Pair has already been merged")
+
+    if candidate.status != body.status:
+        await audit_update(db, current_user.id, "DuplicateCandidate", candidate.id, "status", candidate.status, body.status)
+        candidate.status = body.status
+        candidate.resolved_by = current_user.id if body.status == "Dismissed" else None
+        candidate.resolved_at = datetime.utcnow() if body.status == "Dismissed" else None
+        await db.flush()
+    return DuplicateCandidateResponse.model_validate(candidate)
@@ -0,0 +1,29 @@
+"""
+Entity reference endpoint: display names and links for linked_entity_type /
+linked_entity_id pairs, resolved in bulk.
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import get_current_user
+from app.models.models import User
+from app.schemas.schemas import EntityResolveRequest, ResolvedEntity
+from app.services.entities import resolve_entities
+
+router = APIRouter(prefix="/entities", tags=["Entities"])
+
+
+@router.post("/resolve", response_model=list[ResolvedEntity])
+async def resolve(
+    body: EntityResolveRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Resolve many (type, id) references at once, e.g. the "linked to" column of a
+    task or note list. One query per entity type; references that do not exist
+    (or that the user cannot see) are left out.
+    """
+    resolved = await resolve_entities(db, [(ref.type, ref.id) for ref in body.refs], current_user)
+    return list(resolved.values())
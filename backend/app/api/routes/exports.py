@@ -0,0 +1,66 @@
+"""
+Columnar export endpoints: sales, policies and commissions as Parquet files.
+"""
+import tempfile
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from app.db.session import get_db
+from app.core.auth import require_role
+from app.models.models import User
+from app.services.exports import ExportError, write_parquet
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _chunks(file):
+    while chunk := file.read(CHUNK_SIZE):
+        yield chunk
+
+
+@router.get("/{kind}")
+async def export_parquet(
+    kind: str = Path(..., pattern="^(sales|policies|commissions)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """
+    Download a Parquet file of the records with their joined names.
+    - date_from / date_to: sale date (sales), effective date (policies), received date (commissions)
+    - since: only records changed after this time (created_at for sales, updated_at otherwise),
+      re-reading a 10-minute overlap before it so late commits aren't missed
+    X-Export-Watermark carries the latest change time exported; pass it as the next `since`
+    and dedup on id, since consecutive incremental files overlap.
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        result = await write_parquet(db, kind, spool, date_from=date_from, date_to=date_to, since=since)
+    except ExportError as e:
+        spool.close()
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{kind}-{date.today().isoformat()}.parquet"',
+        "X-Export-Rows": str(result["rows"]),
+    }
+    if result["watermark"]:
+        headers["X-Export-Watermark"] = result["watermark"].isoformat()
+    return StreamingResponse(
+        _chunks(spool),
+        media_type="application/vnd.apache.parquet",
+        headers=headers,
+        background=BackgroundTask(spool.close),
+    )
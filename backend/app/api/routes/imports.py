@@ -0,0 +1,37 @@
+"""
+Bulk import endpoints: accounts, contacts and policies from CSV or XLSX.
+"""
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import require_role
+from app.models.models import User
+from app.schemas.schemas import ImportResponse
+from app.services.imports import ImportFileError, import_file
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+
+@router.post("/{entity}", response_model=ImportResponse)
+async def import_records(
+    entity: str = Path(..., pattern="^(accounts|contacts|policies)$"),
+    file: UploadFile = File(...),
+    dry_run: bool = Form(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """
+    Import a CSV/XLSX file. Columns match the create schemas, plus:
+    - accounts: external_id (previous system's key), producer, csr (user email or name)
+    - contacts/policies: account_external_id instead of account_id
+    - policies: carrier (name), servicing_owner, producing_agent (user email or name)
+    external_id (accounts) and policy_number (policies) are required, as the keys
+    re-imports match on. Rows already present are skipped, so a file can be
+    re-imported. dry_run only validates.
+    """
+    try:
+        result = await import_file(db, entity, file.file, file.filename or "", current_user.id, dry_run=dry_run)
+    except (ImportFileError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ImportResponse(**result.__dict__)
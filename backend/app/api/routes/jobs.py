@@ -0,0 +1,123 @@
+"""
+Scheduled job endpoints: Admin-only triggers for the batch jobs that the
+background worker (app.worker) runs on a timer, for on-demand runs or an
+external cron.
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import require_role
+from app.models.models import User
+from app.services.account_summaries import run_account_summary_reconcile
+from app.services.automation import run_date_based_rules
+from app.services.blobs import run_blob_sweep
+from app.services.book_cube import run_book_cube_refresh
+from app.services.duplicates import run_duplicate_scan
+from app.services.email_outbox import run_email_outbox
+from app.services.installments import run_installment_job
+from app.services.mail_sync import run_mail_sync
+from app.services.notifications import dispatch_due_reminders
+from app.services.nurture import run_nurture_scheduler
+from app.services.renewals import run_renewal_generator
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.post("/automation")
+async def run_automation_rules(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Evaluate all active Date-based automation rules."""
+    return await run_date_based_rules(db)
+
+
+@router.post("/nurture")
+async def run_nurture(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Advance all nurture sequence enrollments that are due."""
+    return await run_nurture_scheduler(db)
+
+
+@router.post("/reminders")
+async def run_reminders(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Deliver all due, undismissed reminders."""
+    return await dispatch_due_reminders(db)
+
+
+@router.post("/renewals")
+async def run_renewals(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Open Renewal / MidTermReview service items for policies that have come due."""
+    return await run_renewal_generator(db)
+
+
+@router.post("/installments")
+async def run_installments(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Send installment reminders, flag past-due installments and open PaymentIssue items."""
+    return await run_installment_job(db)
+
+
+@router.post("/mail-sync")
+async def run_outlook_sync(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Log new Outlook mail to/from known contacts (changes since the previous sync)."""
+    return await run_mail_sync(db)
+
+
+@router.post("/duplicate-scan")
+async def run_duplicates(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Rescan accounts, contacts and prospects for likely duplicates."""
+    return await run_duplicate_scan(db)
+
+
+@router.post("/account-summaries")
+async def run_account_summaries(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Recompute every account's rollups (policy count, premium, open items, last contact)."""
+    return await run_account_summary_reconcile(db)
+
+
+@router.post("/book-cube")
+async def run_book_cube(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Refresh the book-of-business analytics cube (concurrently; reports stay readable)."""
+    return await run_book_cube_refresh(db)
+
+
+@router.post("/email-outbox")
+async def run_outbox(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Send queued outbound email (installment reminders, reminder emails)."""
+    return await run_email_outbox(db)
+
+
+@router.post("/blob-sweep")
+async def run_blobs(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """Remove stored document objects whose deletion has committed (and abandoned uploads)."""
+    return await run_blob_sweep(db)
@@ -12,6 +12,7 @@ from app.db.session import get_db
 from app.core.auth import get_current_user
 from app.models.models import User, Note, CommunicationLog
 from app.schemas.schemas import NoteCreate, NoteResponse, CommLogCreate, CommLogResponse
+from app.services.account_summaries import mark_summaries_stale
 from app.services.audit import audit_create
 
 router = APIRouter(tags=["Notes & Communications"])
@@ -86,5 +87,7 @@ async def create_comm_log(
     log = CommunicationLog(**body.model_dump(), user_id=current_user.id)
     db.add(log)
     await db.flush()
+    if log.linked_entity_type == "Account":
+        mark_summaries_stale(db, [log.linked_entity_id])
     await audit_create(db, current_user.id, "CommunicationLog", log.id)
     return CommLogResponse.model_validate(log)
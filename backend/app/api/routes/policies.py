@@ -13,13 +13,24 @@ from app.core.auth import get_current_user
 from app.models.models import User, Policy, Installment, Carrier, Account
 from app.schemas.schemas import (
     PolicyCreate, PolicyUpdate, PolicyResponse, PolicyListResponse,
-    InstallmentCreate, InstallmentUpdate, InstallmentResponse,
+    InstallmentCreate, InstallmentUpdate, InstallmentResponse, InstallmentScheduleRequest,
 )
+from app.services.account_summaries import mark_summaries_stale
 from app.services.audit import audit_create, audit_update
+from app.services.entities import ids_condition, parse_ids
+from app.services.installments import ScheduleError, generate_schedule
+from app.services.ndjson import FORMATS, ndjson_response
 
 router = APIRouter(prefix="/policies", tags=["Policies"])
 
 
+def _policy_item(row) -> PolicyResponse:
+    item = PolicyResponse.model_validate(row[0])
+    item.carrier_name = row.carrier_name
+    item.account_name = row.account_name
+    return item
+
+
 @router.get("", response_model=PolicyListResponse)
 async def list_policies(
     page: int = Query(1, ge=1),
@@ -30,6 +41,8 @@ async def list_policies(
     status: Optional[str] = None,
     expiring_before: Optional[date] = None,
     expiring_after: Optional[date] = None,
+    ids: Optional[str] = Query(None, description="Comma-separated ids (batch fetch, max 100)"),
+    format: str = Query("json", pattern=FORMATS, description="ndjson streams every match, one policy per line"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -69,19 +82,22 @@ async def list_policies(
         count_base = count_base.where(Policy.expiration_date <= expiring_before)
     if expiring_after:
         count_base = count_base.where(Policy.expiration_date >= expiring_after)
+    if ids:
+        # Batch fetch: just these records, unpaginated
+        try:
+            id_list = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(ids_condition(Policy.id, id_list))
+        count_base = count_base.where(ids_condition(Policy.id, id_list))
+        page, page_size = 1, len(id_list)
+    if format == "ndjson":
+        return ndjson_response(query.order_by(Policy.expiration_date, Policy.id), _policy_item)
     total = (await db.execute(count_base)).scalar()
 
     query = query.order_by(Policy.expiration_date).offset((page - 1) * page_size).limit(page_size)
     result = await db.execute(query)
-    rows = result.all()
-
-    items = []
-    for row in rows:
-        policy = row[0]
-        item = PolicyResponse.model_validate(policy)
-        item.carrier_name = row.carrier_name
-        item.account_name = row.account_name
-        items.append(item)
+    items = [_policy_item(row) for row in result.all()]
 
     return PolicyListResponse(
         items=items,
@@ -102,6 +118,7 @@ async def create_policy(
     policy = Policy(**body.model_dump())
     db.add(policy)
     await db.flush()
+    mark_summaries_stale(db, [policy.account_id])
 
     await audit_create(db, current_user.id, "Policy", policy.id,
                        ip=request.client.host if request.client else None)
@@ -154,6 +171,8 @@ async def update_policy(
             setattr(policy, field, value)
 
     await db.flush()
+    if {"status", "premium"} & update_data.keys():
+        mark_summaries_stale(db, [policy.account_id])
     return PolicyResponse.model_validate(policy)
 
 
@@ -186,6 +205,42 @@ async def create_installment(
     return InstallmentResponse.model_validate(installment)
 
 
+@router.post("/{policy_id}/installments/schedule", response_model=list[InstallmentResponse], status_code=201)
+async def create_installment_schedule(
+    policy_id: uuid.UUID,
+    body: InstallmentScheduleRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Generate the policy's full installment schedule. Calling it again replaces the
+    unpaid installments (e.g. after an endorsement changes the premium).
+    """
+    result = await db.execute(select(Policy).where(Policy.id == policy_id))
+    policy = result.scalar_one_or_none()
+    if not policy:
+        raise HTTPException(status_code=404, detail="Policy not found")
+
+    plan = body.payment_plan or policy.payment_plan
+    premium = body.premium if body.premium is not None else policy.premium
+    effective_date = body.effective_date or policy.effective_date
+    expiration_date = body.expiration_date or policy.expiration_date
+    if not plan:
+        raise HTTPException(status_code=400, detail="Policy has no payment plan")
+    if not premium:
+        raise HTTPException(status_code=400, detail="Policy has no premium")
+    if expiration_date <= effective_date:
+        raise HTTPException(status_code=400, detail="Expiration date must be after effective date")
+    try:
+        installments = await generate_schedule(
+            db, policy.id, plan, premium, body.down_payment, effective_date, expiration_date,
+            body.payment_method, current_user.id,
+        )
+    except ScheduleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [InstallmentResponse.model_validate(i) for i in installments]
+
+
 @router.put("/installments/{installment_id}", response_model=InstallmentResponse)
 async def update_installment(
     installment_id: uuid.UUID,
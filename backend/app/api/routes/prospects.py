@@ -11,8 +11,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.core.auth import get_current_user
 from app.models.models import User, Prospect, Account
-from app.schemas.schemas import ProspectCreate, ProspectUpdate, ProspectResponse, AccountResponse
+from app.schemas.schemas import ProspectCreate, ProspectUpdate, ProspectResponse, ProspectFilter, AccountResponse
 from app.services.audit import audit_create, audit_update
+from app.services.duplicates import flag_duplicates
+from app.services.entities import ids_condition, parse_ids
+from app.services.filters import prospect_conditions
+from app.services.ndjson import FORMATS, ndjson_response
 
 router = APIRouter(prefix="/prospects", tags=["Prospects"])
 
@@ -25,31 +29,31 @@ async def list_prospects(
     source: Optional[str] = None,
     assigned_producer_id: Optional[uuid.UUID] = None,
     search: Optional[str] = None,
+    ids: Optional[str] = Query(None, description="Comma-separated ids (batch fetch, max 100)"),
+    format: str = Query("json", pattern=FORMATS, description="ndjson streams every match, one prospect per line"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = select(Prospect)
-
-    if pipeline_stage:
-        query = query.where(Prospect.pipeline_stage == pipeline_stage)
-    if source:
-        query = query.where(Prospect.source == source)
-    if assigned_producer_id:
-        query = query.where(Prospect.assigned_producer_id == assigned_producer_id)
-    if search:
-        from sqlalchemy import or_
-        query = query.where(
-            or_(
-                (Prospect.first_name + " " + Prospect.last_name).ilike(f"%{search}%"),
-                Prospect.business_name.ilike(f"%{search}%"),
-                Prospect.email.ilike(f"%{search}%"),
-            )
+    # Filters (shared with bulk operations; Producer sees only their own prospects)
+    filters = ProspectFilter(
+        pipeline_stage=pipeline_stage, source=source,
+        assigned_producer_id=assigned_producer_id, search=search,
+    )
+    query = select(Prospect).where(*prospect_conditions(filters, current_user))
+    if ids:
+        # Batch fetch: just these records, unpaginated
+        try:
+            id_list = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(ids_condition(Prospect.id, id_list))
+        page, page_size = 1, len(id_list)
+    if format == "ndjson":
+        return ndjson_response(
+            query.order_by(Prospect.updated_at.desc(), Prospect.id),
+            lambda row: ProspectResponse.model_validate(row[0]),
         )
 
-    # Producer sees only their own prospects
-    if current_user.role == "Producer":
-        query = query.where(Prospect.assigned_producer_id == current_user.id)
-
     count_q = select(func.count()).select_from(query.subquery())
     total = (await db.execute(count_q)).scalar()
 
@@ -104,6 +108,7 @@ async def create_prospect(
 
     await audit_create(db, current_user.id, "Prospect", prospect.id,
                        ip=request.client.host if request.client else None)
+    await flag_duplicates(db, "Prospect", prospect)
     return ProspectResponse.model_validate(prospect)
 
 
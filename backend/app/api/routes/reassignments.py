@@ -0,0 +1,44 @@
+"""
+Book reassignment endpoint: move a user's accounts, policies, open work and
+prospects to another user in one transaction.
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import require_role
+from app.models.models import User
+from app.schemas.schemas import BookReassignRequest, BookReassignResponse
+from app.services.reassignment import SCOPES, reassign_book
+
+router = APIRouter(prefix="/reassignments", tags=["Reassignments"])
+
+
+@router.post("", response_model=BookReassignResponse)
+async def reassign(
+    body: BookReassignRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("Admin")),
+):
+    """
+    Reassign everything from_user owns within the filters: account producer/CSR,
+    Active policies' servicing owner/producing agent, open tasks, open service
+    items and open prospects. `include` limits which of these move.
+    """
+    unknown = set(body.include) - set(SCOPES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown scope(s): {', '.join(sorted(unknown))}")
+    if body.from_user_id == body.to_user_id:
+        raise HTTPException(status_code=400, detail="Source and target user are the same")
+
+    target = (await db.execute(
+        select(User.id).where(User.id == body.to_user_id, User.is_active.is_(True))
+    )).scalar_one_or_none()
+    if not target:
+        raise HTTPException(status_code=404, detail="Target user not found or inactive")
+
+    return await reassign_book(
+        db, body.from_user_id, body.to_user_id, current_user,
+        include=tuple(body.include), accounts=body.accounts, prospects=body.prospects,
+    )
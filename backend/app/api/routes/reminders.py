@@ -0,0 +1,99 @@
+"""
+Reminder and notification endpoints.
+Reminders are polymorphic (linked to any entity) and delivered by the
+dispatcher job into the owner's in-app notification feed.
+"""
+import uuid
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import get_current_user
+from app.models.models import User, Reminder, Notification
+from app.schemas.schemas import (
+    ReminderCreate, ReminderResponse, NotificationResponse, MarkReadRequest,
+)
+from app.services.audit import audit_create, audit_update
+
+router = APIRouter(tags=["Reminders & Notifications"])
+
+
+# ========== REMINDERS ==========
+
+@router.post("/reminders", response_model=ReminderResponse, status_code=201)
+async def create_reminder(
+    body: ReminderCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot create reminders")
+
+    reminder = Reminder(**body.model_dump(), created_by=current_user.id)
+    db.add(reminder)
+    await db.flush()
+    await audit_create(db, current_user.id, "Reminder", reminder.id)
+    return ReminderResponse.model_validate(reminder)
+
+
+@router.put("/reminders/{reminder_id}/dismiss", response_model=ReminderResponse)
+async def dismiss_reminder(
+    reminder_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot dismiss reminders")
+
+    result = await db.execute(select(Reminder).where(Reminder.id == reminder_id))
+    reminder = result.scalar_one_or_none()
+    if not reminder:
+        raise HTTPException(status_code=404, detail="Reminder not found")
+    # Reminders are delivered to their creator; only they (or an Admin) may dismiss one
+    if reminder.created_by != current_user.id and current_user.role != "Admin":
+        raise HTTPException(status_code=403, detail="Only the reminder's owner or an Admin can dismiss it")
+
+    if not reminder.is_dismissed:
+        reminder.is_dismissed = True
+        reminder.dismissed_at = datetime.utcnow()
+        await audit_update(db, current_user.id, "Reminder", reminder.id, "is_dismissed", False, True)
+        await db.flush()
+    return ReminderResponse.model_validate(reminder)
+
+
+# ========== NOTIFICATIONS ==========
+
+@router.get("/notifications/unread", response_model=list[NotificationResponse])
+async def unread_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Current user's unread feed, newest first (served by idx_notifications_user_unread)."""
+    result = await db.execute(
+        select(Notification)
+        .where(and_(Notification.user_id == current_user.id, ~Notification.is_read))
+        .order_by(Notification.created_at.desc())
+        .limit(limit)
+    )
+    return [NotificationResponse.model_validate(n) for n in result.scalars().all()]
+
+
+@router.post("/notifications/read")
+async def mark_notifications_read(
+    body: MarkReadRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query = (
+        update(Notification)
+        .where(and_(Notification.user_id == current_user.id, ~Notification.is_read))
+        .values(is_read=True, read_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if body.ids is not None:
+        query = query.where(Notification.id.in_(body.ids))
+    result = await db.execute(query)
+    return {"marked_read": result.rowcount}
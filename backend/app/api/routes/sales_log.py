@@ -13,11 +13,21 @@ from app.db.session import get_db
 from app.core.auth import get_current_user
 from app.models.models import User, SalesLogEntry, Account, Carrier
 from app.schemas.schemas import SalesLogCreate, SalesLogResponse
+from app.services.account_summaries import mark_summaries_stale
 from app.services.audit import audit_create
+from app.services.ndjson import FORMATS, ndjson_response
 
 router = APIRouter(prefix="/sales-log", tags=["Sales Log"])
 
 
+def _sale_item(row) -> SalesLogResponse:
+    entry = SalesLogResponse.model_validate(row[0])
+    entry.account_name = row.account_name
+    entry.carrier_name = row.carrier_name
+    entry.producer_name = row.producer_name
+    return entry
+
+
 @router.get("")
 async def list_sales(
     page: int = Query(1, ge=1),
@@ -31,6 +41,7 @@ async def list_sales(
     county: Optional[str] = None,
     carrier_id: Optional[uuid.UUID] = None,
     producer_id: Optional[uuid.UUID] = None,
+    format: str = Query("json", pattern=FORMATS, description="ndjson streams every match, one entry per line"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -64,6 +75,8 @@ async def list_sales(
         query = query.where(SalesLogEntry.carrier_id == carrier_id)
     if producer_id:
         query = query.where(SalesLogEntry.producer_id == producer_id)
+    if format == "ndjson":
+        return ndjson_response(query.order_by(SalesLogEntry.date.desc(), SalesLogEntry.id), _sale_item)
 
     count_q = select(func.count()).select_from(
         select(SalesLogEntry.id).select_from(query.subquery()).subquery()
@@ -75,15 +88,7 @@ async def list_sales(
 
     query = query.order_by(SalesLogEntry.date.desc()).offset((page - 1) * page_size).limit(page_size)
     result = await db.execute(query)
-    rows = result.all()
-
-    items = []
-    for row in rows:
-        entry = SalesLogResponse.model_validate(row[0])
-        entry.account_name = row.account_name
-        entry.carrier_name = row.carrier_name
-        entry.producer_name = row.producer_name
-        items.append(entry)
+    items = [_sale_item(row) for row in result.all()]
 
     return {"items": items, "total": total, "page": page, "page_size": page_size}
 
@@ -101,6 +106,7 @@ async def create_sale(
     entry = SalesLogEntry(**body.model_dump(), producer_id=current_user.id)
     db.add(entry)
     await db.flush()
+    mark_summaries_stale(db, [entry.account_id])
 
     await audit_create(db, current_user.id, "SalesLogEntry", entry.id,
                        ip=request.client.host if request.client else None)
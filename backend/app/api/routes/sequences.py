@@ -0,0 +1,50 @@
+"""
+Nurture sequence endpoints: bulk enrollment of filtered prospects and accounts.
+"""
+import uuid
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.auth import get_current_user
+from app.models.models import User, NurtureSequence
+from app.schemas.schemas import BulkEnrollRequest, BulkEnrollResponse
+from app.services.filters import account_conditions, prospect_conditions
+from app.services.nurture import bulk_enroll
+
+router = APIRouter(prefix="/sequences", tags=["Nurture Sequences"])
+
+
+@router.post("/{sequence_id}/enroll", response_model=BulkEnrollResponse)
+async def enroll_audience(
+    sequence_id: uuid.UUID,
+    body: BulkEnrollRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Enroll every prospect/account matching a saved list filter in one statement.
+    Matches already actively enrolled in this sequence are skipped.
+    """
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot enroll contacts")
+
+    result = await db.execute(select(NurtureSequence).where(NurtureSequence.id == sequence_id))
+    sequence = result.scalar_one_or_none()
+    if not sequence:
+        raise HTTPException(status_code=404, detail="Sequence not found")
+    if not sequence.is_active:
+        raise HTTPException(status_code=400, detail="Sequence is not active")
+
+    if sequence.target_type == "Prospect":
+        if body.prospects is None:
+            raise HTTPException(status_code=400, detail="Prospect sequences need a prospects filter")
+        conditions = prospect_conditions(body.prospects, current_user)
+    else:
+        if body.accounts is None:
+            raise HTTPException(status_code=400, detail="Client sequences need an accounts filter")
+        conditions = account_conditions(body.accounts, current_user)
+
+    counts = await bulk_enroll(db, sequence, conditions, current_user.id)
+    return BulkEnrollResponse(**counts)
@@ -7,20 +7,33 @@ import uuid
 from typing import Optional
 from datetime import date, datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import select, func, case, and_, or_
+from sqlalchemy import select, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.core.auth import get_current_user
 from app.models.models import User, ServiceItem, Account, Policy
 from app.schemas.schemas import (
-    ServiceItemCreate, ServiceItemUpdate, ServiceItemResponse, ServiceBoardResponse
+    ServiceItemCreate, ServiceItemUpdate, ServiceItemResponse, ServiceBoardResponse,
+    ServiceItemFilter, ServiceItemBulkUpdate, BulkUpdateResponse,
 )
+from app.services.account_summaries import mark_summaries_stale
 from app.services.audit import audit_create, audit_update
+from app.services.bulk_updates import bulk_update
+from app.services.filters import service_item_conditions
+from app.services.ndjson import FORMATS, ndjson_response
 
 router = APIRouter(prefix="/service-board", tags=["Service Board"])
 
 
+def _service_item(row) -> ServiceItemResponse:
+    item = ServiceItemResponse.model_validate(row[0])
+    item.account_name = row.account_name
+    item.policy_lob = row.policy_lob
+    item.assignee_name = row.assignee_name
+    return item
+
+
 @router.get("", response_model=ServiceBoardResponse)
 async def get_service_board(
     type: Optional[str] = None,
@@ -32,6 +45,7 @@ async def get_service_board(
     account_id: Optional[uuid.UUID] = None,
     policy_id: Optional[uuid.UUID] = None,
     search: Optional[str] = None,
+    format: str = Query("json", pattern=FORMATS, description="ndjson streams the items, one per line, without counts"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -51,33 +65,12 @@ async def get_service_board(
         .outerjoin(User, ServiceItem.assigned_to == User.id)
     )
 
-    # Filters
-    if type:
-        query = query.where(ServiceItem.type == type)
-    if status:
-        query = query.where(ServiceItem.status == status)
-    else:
-        # Default: exclude completed/closed
-        query = query.where(ServiceItem.status.notin_(["Completed", "Closed"]))
-    if urgency:
-        query = query.where(ServiceItem.urgency == urgency)
-    if assigned_to:
-        query = query.where(ServiceItem.assigned_to == assigned_to)
-    if due_before:
-        query = query.where(ServiceItem.due_date <= due_before)
-    if due_after:
-        query = query.where(ServiceItem.due_date >= due_after)
-    if account_id:
-        query = query.where(ServiceItem.account_id == account_id)
-    if policy_id:
-        query = query.where(ServiceItem.policy_id == policy_id)
-    if search:
-        query = query.where(
-            or_(
-                Account.name.ilike(f"%{search}%"),
-                ServiceItem.description.ilike(f"%{search}%"),
-            )
-        )
+    # Filters (shared with bulk updates)
+    filters = ServiceItemFilter(
+        type=type, status=status, urgency=urgency, assigned_to=assigned_to, due_before=due_before,
+        due_after=due_after, account_id=account_id, policy_id=policy_id, search=search,
+    )
+    query = query.where(*service_item_conditions(filters))
 
     query = query.order_by(
         # Urgency ordering: Critical first, then High, Medium, Low
@@ -89,18 +82,11 @@ async def get_service_board(
         ),
         ServiceItem.due_date.asc().nullslast(),
     )
+    if format == "ndjson":
+        return ndjson_response(query.order_by(ServiceItem.id), _service_item)
 
     result = await db.execute(query)
-    rows = result.all()
-
-    items = []
-    for row in rows:
-        si = row[0]
-        item_data = ServiceItemResponse.model_validate(si)
-        item_data.account_name = row.account_name
-        item_data.policy_lob = row.policy_lob
-        item_data.assignee_name = row.assignee_name
-        items.append(item_data)
+    items = [_service_item(row) for row in result.all()]
 
     # Counts for board header
     count_query = select(
@@ -142,12 +128,46 @@ async def create_service_item(
     item = ServiceItem(**body.model_dump())
     db.add(item)
     await db.flush()
+    mark_summaries_stale(db, [item.account_id])
 
     await audit_create(db, current_user.id, "ServiceItem", item.id,
                        ip=request.client.host if request.client else None)
     return ServiceItemResponse.model_validate(item)
 
 
+@router.post("/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_service_items(
+    body: ServiceItemBulkUpdate,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply a status, assignee, urgency or due date change to the listed items, or to
+    every item matching a board filter, in one statement. Returns the ids that changed.
+    """
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot update service items")
+    if (body.ids is None) == (body.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+
+    changes = body.model_dump(exclude_unset=True, exclude={"ids", "filter"})
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    if any(changes.get(f, "") is None for f in ("status", "urgency")):
+        raise HTTPException(status_code=400, detail="status and urgency cannot be cleared")
+
+    conditions = [ServiceItem.id.in_(body.ids)] if body.ids is not None else service_item_conditions(body.filter)
+    ids = await bulk_update(
+        db, ServiceItem, "ServiceItem", conditions, changes, current_user.id,
+        done_statuses=("Completed", "Closed"),
+        ip=request.client.host if request.client else None,
+    )
+    if "status" in changes and ids:
+        mark_summaries_stale(db, select(ServiceItem.account_id).where(ServiceItem.id.in_(ids)))
+    return BulkUpdateResponse(updated=len(ids), ids=ids)
+
+
 @router.get("/{item_id}", response_model=ServiceItemResponse)
 async def get_service_item(
     item_id: uuid.UUID,
@@ -200,4 +220,6 @@ async def update_service_item(
             setattr(item, field, value)
 
     await db.flush()
+    if "status" in update_data:
+        mark_summaries_stale(db, [item.account_id])
     return ServiceItemResponse.model_validate(item)
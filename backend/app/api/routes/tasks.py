@@ -5,14 +5,19 @@ import uuid
 from typing import Optional
 from datetime import date, datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.core.auth import get_current_user
 from app.models.models import User, Task
-from app.schemas.schemas import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
+from app.schemas.schemas import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, TaskFilter, TaskBulkUpdate, BulkUpdateResponse,
+)
 from app.services.audit import audit_create, audit_update
+from app.services.bulk_updates import bulk_update
+from app.services.filters import task_conditions
+from app.services.ndjson import FORMATS, ndjson_response
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -25,27 +30,20 @@ async def list_tasks(
     due_before: Optional[date] = None,
     linked_entity_type: Optional[str] = None,
     linked_entity_id: Optional[uuid.UUID] = None,
+    format: str = Query("json", pattern=FORMATS, description="ndjson streams every match, one task per line"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = select(Task)
-
-    if assigned_to:
-        query = query.where(Task.assigned_to == assigned_to)
-    if status:
-        query = query.where(Task.status == status)
-    else:
-        query = query.where(Task.status.in_(["Open", "In Progress"]))
-    if priority:
-        query = query.where(Task.priority == priority)
-    if due_before:
-        query = query.where(Task.due_date <= due_before)
-    if linked_entity_type and linked_entity_id:
-        query = query.where(
-            and_(Task.linked_entity_type == linked_entity_type, Task.linked_entity_id == linked_entity_id)
-        )
+    # Filters (shared with bulk updates)
+    filters = TaskFilter(
+        assigned_to=assigned_to, status=status, priority=priority, due_before=due_before,
+        linked_entity_type=linked_entity_type, linked_entity_id=linked_entity_id,
+    )
+    query = select(Task).where(*task_conditions(filters))
 
     query = query.order_by(Task.due_date.asc().nullslast(), Task.priority.desc())
+    if format == "ndjson":
+        return ndjson_response(query.order_by(Task.id), lambda row: TaskResponse.model_validate(row[0]))
 
     count_q = select(func.count()).select_from(query.subquery())
     total = (await db.execute(count_q)).scalar()
@@ -108,6 +106,37 @@ async def create_task(
     return TaskResponse.model_validate(task)
 
 
+@router.post("/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_tasks(
+    body: TaskBulkUpdate,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply a status, assignee, priority or due date change to the listed tasks, or to
+    every task matching a list filter, in one statement. Returns the ids that changed.
+    """
+    if current_user.role == "ReadOnly":
+        raise HTTPException(status_code=403, detail="Read-only users cannot update tasks")
+    if (body.ids is None) == (body.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+
+    changes = body.model_dump(exclude_unset=True, exclude={"ids", "filter"})
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    if any(changes.get(f, "") is None for f in ("status", "priority")):
+        raise HTTPException(status_code=400, detail="status and priority cannot be cleared")
+
+    conditions = [Task.id.in_(body.ids)] if body.ids is not None else task_conditions(body.filter)
+    ids = await bulk_update(
+        db, Task, "Task", conditions, changes, current_user.id,
+        done_statuses=("Completed",),
+        ip=request.client.host if request.client else None,
+    )
+    return BulkUpdateResponse(updated=len(ids), ids=ids)
+
+
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: uuid.UUID,
@@ -27,6 +27,23 @@ class Settings(BaseSettings):
     MICROSOFT_CLIENT_SECRET: Optional[str] = None
     MICROSOFT_TENANT_ID: Optional[str] = None
     MICROSOFT_REDIRECT_URI: str = "http://localhost:8000/api/auth/microsoft/callback"
+    # Overridable so a local fake Graph server can stand in
+    MICROSOFT_GRAPH_URL: str = "https://graph.microsoft.com/v1.0"
+    MICROSOFT_LOGIN_URL: str = "https://login.microsoftonline.com"
+    GRAPH_MAX_CONNECTIONS: int = 20
+    # Mailbox outbound email is sent from via Graph sendMail (unset: log only)
+    MAIL_SENDER: Optional[str] = None
+    # Outlook sync: how far back the first sync of a mailbox reaches
+    MAIL_SYNC_INITIAL_DAYS: int = 30
+    
+    # Document storage: "local" (filesystem under DOCUMENT_STORAGE_PATH) or "onedrive"
+    DOCUMENT_STORAGE: str = "local"
+    DOCUMENT_STORAGE_PATH: str = "./storage/documents"
+    ONEDRIVE_DRIVE_ID: Optional[str] = None
+    ONEDRIVE_ROOT_FOLDER: str = "Sentinel"
+    # Transfer chunk size; OneDrive upload fragments must be multiples of 320 KiB
+    DOCUMENT_CHUNK_SIZE: int = 10 * 320 * 1024
+    DOCUMENT_MAX_SIZE: int = 250 * 1024 * 1024
     
     # Review URLs (configured by admin)
     GOOGLE_REVIEW_URL: Optional[str] = None
@@ -37,6 +54,24 @@ class Settings(BaseSettings):
     AGENCY_PHONE: str = ""
     AGENCY_EMAIL: str = ""
     
+    # Reminders: also email the reminder owner (in addition to the in-app feed)
+    REMINDER_EMAILS: bool = False
+    
+    # Renewal generator: days before expiration a Renewal item is opened, and how
+    # far ahead of a policy's mid-term date the MidTermReview item is opened (and
+    # how long after it one is still opened, covering missed runs)
+    RENEWAL_WINDOW_DAYS: int = 60
+    MIDTERM_REVIEW_LEAD_DAYS: int = 14
+    MIDTERM_REVIEW_GRACE_DAYS: int = 7
+    
+    # Installment job: days before the due date a Scheduled installment is reminded
+    INSTALLMENT_REMINDER_DAYS: int = 7
+    
+    # Duplicate detection: minimum match score (0-1) to flag a pair, and the largest
+    # blocking group compared pairwise (bigger groups, e.g. a shared office phone, are skipped)
+    DUPLICATE_MIN_SCORE: float = 0.6
+    DUPLICATE_MAX_BLOCK: int = 50
+    
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://localhost:3000"]
     
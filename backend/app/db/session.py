@@ -1,6 +1,8 @@
 """
 Database connection, session management, and base model.
 """
+from typing import Awaitable, Callable
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
@@ -20,17 +22,33 @@ async_session_factory = async_sessionmaker(
 )
 
 
+PRE_COMMIT = "pre_commit"
+
+
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
     pass
 
 
+def before_commit(session: AsyncSession, key: str, hook: Callable[[AsyncSession], Awaitable]):
+    """Run `await hook(session)` once, inside the transaction, when commit() next runs."""
+    session.info.setdefault(PRE_COMMIT, {})[key] = hook
+
+
+async def commit(session: AsyncSession):
+    """Commit after running the hooks registered with before_commit()."""
+    hooks = session.info.pop(PRE_COMMIT, {})
+    for hook in hooks.values():
+        await hook(session)
+    await session.commit()
+
+
 async def get_db() -> AsyncSession:
     """Dependency that provides a database session per request."""
     async with async_session_factory() as session:
         try:
             yield session
-            await session.commit()
+            await commit(session)
         except Exception:
             await session.rollback()
             raise
@@ -0,0 +1,33 @@
+"""
+Command-line Parquet export (same exports as GET /api/exports/{kind}).
+
+    python -m app.export policies policies.parquet [--since 2026-01-01T00:00:00+00:00]
+    python -m app.export sales sales-2026.parquet --from 2026-01-01 --to 2026-12-31
+"""
+import argparse
+import asyncio
+from datetime import date, datetime
+
+from app.db.session import async_session_factory
+from app.services.exports import EXPORTS, SINCE_OVERLAP, write_parquet
+
+
+async def main(args):
+    async with async_session_factory() as session:
+        with open(args.output, "wb") as sink:
+            result = await write_parquet(
+                session, args.kind, sink, date_from=args.date_from, date_to=args.date_to, since=args.since,
+            )
+    watermark = result["watermark"].isoformat() if result["watermark"] else "-"
+    print(f"🛡️  [{args.kind}] {result['rows']} rows -> {args.output} (watermark {watermark})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export sales, policies or commissions to Parquet")
+    parser.add_argument("kind", choices=sorted(EXPORTS))
+    parser.add_argument("output")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help=f"only records changed after this time, less a {SINCE_OVERLAP} overlap (dedup on id)")
+    asyncio.run(main(parser.parse_args()))
@@ -6,9 +6,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.services.graph import close_graph_client
 from app.api.routes import (
     auth, accounts, contacts, policies, service_board,
-    tasks, prospects, sales_log, carriers, notes_comms, dashboard,
+    tasks, prospects, sales_log, carriers, notes_comms, dashboard, jobs,
+    sequences, reminders, commissions, documents, imports, duplicates, reassignments,
+    entities, analytics, exports,
 )
 
 
@@ -19,6 +22,7 @@ async def lifespan(app: FastAPI):
     print(f"🛡️  {settings.APP_NAME} v{settings.APP_VERSION} starting...")
     yield
     # Shutdown
+    await close_graph_client()
     print("🛡️  Shutting down...")
 
 
@@ -50,8 +54,19 @@ app.include_router(service_board.router, prefix=API_PREFIX)
 app.include_router(tasks.router, prefix=API_PREFIX)
 app.include_router(prospects.router, prefix=API_PREFIX)
 app.include_router(sales_log.router, prefix=API_PREFIX)
+app.include_router(commissions.router, prefix=API_PREFIX)
 app.include_router(carriers.router, prefix=API_PREFIX)
 app.include_router(notes_comms.router, prefix=API_PREFIX)
+app.include_router(documents.router, prefix=API_PREFIX)
+app.include_router(sequences.router, prefix=API_PREFIX)
+app.include_router(reminders.router, prefix=API_PREFIX)
+app.include_router(imports.router, prefix=API_PREFIX)
+app.include_router(duplicates.router, prefix=API_PREFIX)
+app.include_router(reassignments.router, prefix=API_PREFIX)
+app.include_router(entities.router, prefix=API_PREFIX)
+app.include_router(analytics.router, prefix=API_PREFIX)
+app.include_router(exports.router, prefix=API_PREFIX)
+app.include_router(jobs.router, prefix=API_PREFIX)
 
 
 @app.get("/api/health")
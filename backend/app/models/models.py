@@ -8,9 +8,10 @@ from decimal import Decimal
 from typing import Optional, List
 from sqlalchemy import (
     String, Text, Boolean, Integer, Date, DateTime, Numeric, BigInteger,
-    ForeignKey, UniqueConstraint, Index, Enum as SAEnum, JSON
+    ForeignKey, UniqueConstraint, Index, Enum as SAEnum, JSON,
+    MetaData, Table, Column,
 )
-from sqlalchemy.dialects.postgresql import UUID, INET, JSONB
+from sqlalchemy.dialects.postgresql import UUID, INET, JSONB, ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.session import Base
 
@@ -61,6 +62,7 @@ class Account(Base):
     county: Mapped[Optional[str]] = mapped_column(String(100))
     phone: Mapped[Optional[str]] = mapped_column(String(20))
     email: Mapped[Optional[str]] = mapped_column(String(255))
+    external_id: Mapped[Optional[str]] = mapped_column(String(100))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -117,6 +119,8 @@ class Carrier(Base):
     portal_url: Mapped[Optional[str]] = mapped_column(String(500))
     appetite_notes: Mapped[Optional[str]] = mapped_column(Text)
     am_best_rating: Mapped[Optional[str]] = mapped_column(String(20))
+    new_business_commission_pct: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 2))
+    renewal_commission_pct: Mapped[Optional[Decimal]] = mapped_column(Numeric(5, 2))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -416,6 +420,31 @@ class Endorsement(Base):
 # DOCUMENTS, NOTES, TASKS, COMMUNICATIONS
 # ============================================================================
 
+class DocumentBlob(Base):
+    """A stored file, shared by every Document with the same content hash."""
+    __tablename__ = "document_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    storage: Mapped[str] = mapped_column(String(20), nullable=False)
+    ref: Mapped[str] = mapped_column(Text, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class BlobDeletion(Base):
+    """A stored object to remove after the transaction that queued it commits."""
+    __tablename__ = "blob_deletions"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    storage: Mapped[str] = mapped_column(String(20), nullable=False)
+    ref: Mapped[str] = mapped_column(Text, nullable=False)
+    not_before: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -431,6 +460,7 @@ class Document(Base):
     uploaded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     description: Mapped[Optional[str]] = mapped_column(Text)
     onedrive_file_id: Mapped[Optional[str]] = mapped_column(String(500))
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("document_blobs.sha256"))
 
 
 class Note(Base):
@@ -488,6 +518,16 @@ class CommunicationLog(Base):
     logged_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
+class CommunicationLogLink(Base):
+    """Additional entities a communication log is linked to."""
+    __tablename__ = "communication_log_links"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    comm_log_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("communication_logs.id", ondelete="CASCADE"), nullable=False)
+    linked_entity_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    linked_entity_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+
+
 # ============================================================================
 # EMAIL & PROPOSAL TEMPLATES
 # ============================================================================
@@ -573,6 +613,8 @@ class SequenceEnrollment(Base):
     status: Mapped[str] = mapped_column(String(20), default="Active")
     enrolled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    # When the next step is due; the scheduler claims through idx_enrollments_next_due
+    next_due_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
 class SequenceStepExecution(Base):
@@ -621,7 +663,7 @@ class AutomationExecution(Base):
 
 
 # ============================================================================
-# REMINDERS, TAGS, SALES, COMMISSIONS, REVIEWS, REFERRALS
+# REMINDERS, NOTIFICATIONS, TAGS, SALES, COMMISSIONS, REVIEWS, REFERRALS
 # ============================================================================
 
 class Reminder(Base):
@@ -636,6 +678,23 @@ class Reminder(Base):
     created_by: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     dismissed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class Notification(Base):
+    __tablename__ = "notifications"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    message: Mapped[Optional[str]] = mapped_column(Text)
+    linked_entity_type: Mapped[Optional[str]] = mapped_column(String(50))
+    linked_entity_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True))
+    source: Mapped[str] = mapped_column(String(30), nullable=False)  # Reminder, Nurture, Automation, Reassignment
+    source_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True))
+    is_read: Mapped[bool] = mapped_column(Boolean, default=False)
+    read_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
 class Tag(Base):
@@ -740,6 +799,105 @@ class Commission(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# ============================================================================
+# JOB STATE
+# ============================================================================
+
+class JobState(Base):
+    """Watermark / cursor storage for incremental batch jobs, one row per job."""
+    __tablename__ = "job_states"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    state_json: Mapped[Optional[dict]] = mapped_column(JSONB)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# ============================================================================
+# DATA QUALITY
+# ============================================================================
+
+class DuplicateCandidate(Base):
+    """A likely-duplicate pair of Accounts, Contacts or Prospects (entity_a_id < entity_b_id)."""
+    __tablename__ = "duplicate_candidates"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    entity_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    entity_a_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    entity_b_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    score: Mapped[Decimal] = mapped_column(Numeric(4, 3), nullable=False)
+    reasons: Mapped[List[str]] = mapped_column(ARRAY(Text), default=list)
+    status: Mapped[str] = mapped_column(String(20), default="Open")  # Open, Dismissed, Merged
+    detected_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    resolved_by: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
+    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+# ============================================================================
+# ACCOUNT SUMMARY
+# ============================================================================
+
+class AccountSummary(Base):
+    """Rollups per account for list filtering/sorting; kept current by the write paths."""
+    __tablename__ = "account_summaries"
+
+    account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True)
+    policy_count: Mapped[int] = mapped_column(Integer, default=0)  # Active policies
+    active_premium: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+    written_premium: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)  # Sales log
+    open_service_items: Mapped[int] = mapped_column(Integer, default=0)
+    last_contact_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+# ============================================================================
+# EMAIL OUTBOX
+# ============================================================================
+
+class EmailOutbox(Base):
+    """Outbound email queued in a transaction and sent after it commits."""
+    __tablename__ = "email_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    to_address: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(500), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    body_html: Mapped[Optional[str]] = mapped_column(Text)
+    comm_log_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("communication_logs.id", ondelete="SET NULL"))
+    source: Mapped[Optional[str]] = mapped_column(String(50))
+    status: Mapped[str] = mapped_column(String(20), default="Pending")  # Pending, Sending, Sent, Failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+# ============================================================================
+# BOOK OF BUSINESS CUBE
+# ============================================================================
+
+# Read-only materialized view (see schema.sql). Kept off Base.metadata so it is
+# not mistaken for a table by Alembic autogenerate or the merge FK discovery.
+views_metadata = MetaData()
+
+policy_book_cube = Table(
+    "policy_book_cube",
+    views_metadata,
+    Column("carrier_id", UUID(as_uuid=True)),
+    Column("line_of_business", String(100)),
+    Column("producer_id", UUID(as_uuid=True)),
+    Column("county", String(100)),
+    Column("account_type", String(20)),
+    Column("status", String(20)),
+    Column("effective_month", Date),
+    Column("expiration_month", Date),
+    Column("policy_count", BigInteger),
+    Column("premium", Numeric(14, 2)),
+    Column("renewed_count", BigInteger),
+)
+
+
 # ============================================================================
 # AUDIT LOG (IMMUTABLE)
 # ============================================================================
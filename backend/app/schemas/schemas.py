@@ -61,6 +61,7 @@ class AccountCreate(BaseModel):
     county: Optional[str] = None
     phone: Optional[str] = None
     email: Optional[str] = None
+    external_id: Optional[str] = Field(default=None, max_length=100)
 
 class AccountUpdate(BaseModel):
     name: Optional[str] = Field(default=None, min_length=1, max_length=255)
@@ -95,8 +96,15 @@ class AccountResponse(BaseModel):
     county: Optional[str] = None
     phone: Optional[str] = None
     email: Optional[str] = None
+    external_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    # Rollups from account_summaries (list endpoint)
+    policy_count: Optional[int] = None
+    active_premium: Optional[Decimal] = None
+    written_premium: Optional[Decimal] = None
+    open_service_items: Optional[int] = None
+    last_contact_at: Optional[datetime] = None
 
 class AccountListResponse(BaseModel):
     items: List[AccountResponse]
@@ -104,6 +112,37 @@ class AccountListResponse(BaseModel):
     page: int
     page_size: int
 
+class AccountFilter(BaseModel):
+    """Same filters as GET /accounts, plus tag names (any match)."""
+    search: Optional[str] = None
+    type: Optional[str] = None
+    status: Optional[str] = None
+    zip_code: Optional[str] = None
+    county: Optional[str] = None
+    tags: Optional[List[str]] = None
+    # Rollups (account_summaries)
+    min_policies: Optional[int] = None  # Active policies
+    max_policies: Optional[int] = None
+    min_premium: Optional[Decimal] = None  # Active policy premium
+    max_premium: Optional[Decimal] = None
+    min_written_premium: Optional[Decimal] = None  # Sales log premium
+    has_open_service_items: Optional[bool] = None
+    last_contact_before: Optional[datetime] = None
+    last_contact_after: Optional[datetime] = None
+
+class AccountMergePair(BaseModel):
+    survivor_id: uuid.UUID
+    merged_id: uuid.UUID
+
+class AccountMergeRequest(BaseModel):
+    pairs: List[AccountMergePair] = Field(min_length=1, max_length=500)
+
+class AccountMergeResponse(BaseModel):
+    merged: int
+    references: dict[str, int]  # "table.column" / polymorphic table -> rows re-pointed
+    tags_added: int
+    enrollments_cancelled: int
+
 
 # ============================================================================
 # CONTACT
@@ -160,6 +199,8 @@ class CarrierCreate(BaseModel):
     portal_url: Optional[str] = None
     appetite_notes: Optional[str] = None
     am_best_rating: Optional[str] = None
+    new_business_commission_pct: Optional[Decimal] = Field(default=None, ge=0, le=100)
+    renewal_commission_pct: Optional[Decimal] = Field(default=None, ge=0, le=100)
 
 class CarrierResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -171,9 +212,31 @@ class CarrierResponse(BaseModel):
     portal_url: Optional[str] = None
     appetite_notes: Optional[str] = None
     am_best_rating: Optional[str] = None
+    new_business_commission_pct: Optional[Decimal] = None
+    renewal_commission_pct: Optional[Decimal] = None
     created_at: datetime
 
 
+class DownloadLineIssue(BaseModel):
+    line: int
+    policy_number: Optional[str] = None
+    reason: Optional[str] = None
+    error: Optional[str] = None
+
+
+class CarrierDownloadResponse(BaseModel):
+    """Report lists are capped; the counts cover the whole file."""
+    lines: int
+    unchanged: int
+    policies_updated: int
+    installments_updated: int
+    installments_created: int
+    unmatched_count: int
+    unmatched: List[DownloadLineIssue]
+    error_count: int
+    errors: List[DownloadLineIssue]
+
+
 # ============================================================================
 # POLICY
 # ============================================================================
@@ -221,6 +284,9 @@ class PolicyResponse(BaseModel):
     producing_agent_id: Optional[uuid.UUID] = None
     created_at: datetime
     updated_at: datetime
+    # Joined fields for display
+    carrier_name: Optional[str] = None
+    account_name: Optional[str] = None
 
 class PolicyListResponse(BaseModel):
     items: List[PolicyResponse]
@@ -244,6 +310,15 @@ class InstallmentUpdate(BaseModel):
     paid_date: Optional[date] = None
     payment_method: Optional[str] = None
 
+class InstallmentScheduleRequest(BaseModel):
+    """Plan, premium and term default to the policy's own values."""
+    payment_plan: Optional[str] = Field(default=None, pattern="^(Annual|Semi-Annual|Quarterly|Monthly|EFT)$")
+    premium: Optional[Decimal] = Field(default=None, gt=0)
+    down_payment: Decimal = Field(default=Decimal("0"), ge=0)
+    effective_date: Optional[date] = None
+    expiration_date: Optional[date] = None
+    payment_method: Optional[str] = None
+
 class InstallmentResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: uuid.UUID
@@ -298,6 +373,28 @@ class TaskListResponse(BaseModel):
     items: List[TaskResponse]
     total: int
 
+class TaskFilter(BaseModel):
+    """Same filters as GET /tasks (open tasks unless a status is given)."""
+    assigned_to: Optional[uuid.UUID] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    due_before: Optional[date] = None
+    linked_entity_type: Optional[str] = None
+    linked_entity_id: Optional[uuid.UUID] = None
+
+class TaskBulkUpdate(BaseModel):
+    """Apply the same change to the tasks in `ids`, or to every task matching `filter`."""
+    ids: Optional[List[uuid.UUID]] = Field(default=None, min_length=1, max_length=5000)
+    filter: Optional[TaskFilter] = None
+    status: Optional[str] = Field(default=None, pattern="^(Open|In Progress|Completed|Cancelled)$")
+    assigned_to: Optional[uuid.UUID] = None
+    priority: Optional[str] = Field(default=None, pattern="^(Low|Medium|High|Urgent)$")
+    due_date: Optional[date] = None
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    ids: List[uuid.UUID]  # rows that actually changed
+
 
 # ============================================================================
 # SERVICE ITEM (Service Board)
@@ -345,6 +442,27 @@ class ServiceBoardResponse(BaseModel):
     counts_by_status: dict
     counts_by_type: dict
 
+class ServiceItemFilter(BaseModel):
+    """Same filters as GET /service-board (open items unless a status is given)."""
+    type: Optional[str] = None
+    status: Optional[str] = None
+    urgency: Optional[str] = None
+    assigned_to: Optional[uuid.UUID] = None
+    due_before: Optional[date] = None
+    due_after: Optional[date] = None
+    account_id: Optional[uuid.UUID] = None
+    policy_id: Optional[uuid.UUID] = None
+    search: Optional[str] = None
+
+class ServiceItemBulkUpdate(BaseModel):
+    """Apply the same change to the items in `ids`, or to every item matching `filter`."""
+    ids: Optional[List[uuid.UUID]] = Field(default=None, min_length=1, max_length=5000)
+    filter: Optional[ServiceItemFilter] = None
+    status: Optional[str] = Field(default=None, pattern="^(Not Started|In Progress|Awaiting Insured|Awaiting Carrier|Action Required|Completed|Closed|Escalated)$")
+    assigned_to: Optional[uuid.UUID] = None
+    urgency: Optional[str] = Field(default=None, pattern="^(Low|Medium|High|Critical)$")
+    due_date: Optional[date] = None
+
 
 # ============================================================================
 # PROSPECT
@@ -410,6 +528,68 @@ class ProspectResponse(BaseModel):
     close_reason: Optional[str] = None
     converted_account_id: Optional[uuid.UUID] = None
 
+class ProspectFilter(BaseModel):
+    """Same filters as GET /prospects, plus tag names (any match)."""
+    pipeline_stage: Optional[str] = None
+    source: Optional[str] = None
+    assigned_producer_id: Optional[uuid.UUID] = None
+    search: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+
+# ============================================================================
+# NURTURE SEQUENCES
+# ============================================================================
+
+class BulkEnrollRequest(BaseModel):
+    """Audience for a bulk enrollment; the filter matching the sequence's target_type is used."""
+    prospects: Optional[ProspectFilter] = None
+    accounts: Optional[AccountFilter] = None
+
+class BulkEnrollResponse(BaseModel):
+    matched: int
+    enrolled: int
+    skipped: int
+
+
+# ============================================================================
+# REASSIGNMENT
+# ============================================================================
+
+class BookReassignRequest(BaseModel):
+    """Move from_user's assignments to to_user; filters narrow the move (omit for everything)."""
+    from_user_id: uuid.UUID
+    to_user_id: uuid.UUID
+    include: List[str] = Field(
+        default=["accounts", "policies", "tasks", "service_items", "prospects"],
+        min_length=1,
+    )
+    accounts: Optional[AccountFilter] = None
+    prospects: Optional[ProspectFilter] = None
+
+class BookReassignResponse(BaseModel):
+    moved: dict[str, int]  # "table.column" -> rows moved
+    total: int
+
+
+# ============================================================================
+# ENTITY REFERENCES
+# ============================================================================
+
+class EntityRef(BaseModel):
+    type: str = Field(pattern="^(Account|Contact|Policy|Prospect)$")
+    id: uuid.UUID
+
+class EntityResolveRequest(BaseModel):
+    refs: List[EntityRef] = Field(min_length=1, max_length=1000)
+
+class ResolvedEntity(BaseModel):
+    type: str
+    id: uuid.UUID
+    name: str
+    subtitle: Optional[str] = None
+    link: str  # UI path
+
 
 # ============================================================================
 # SALES LOG
@@ -463,6 +643,73 @@ class SalesTrendResponse(BaseModel):
     by_county: Optional[dict] = None
 
 
+# ============================================================================
+# BOOK OF BUSINESS ANALYTICS
+# ============================================================================
+
+class BookCubeTotals(BaseModel):
+    policy_count: int
+    premium: Decimal
+    renewed_count: int
+    retention: Optional[float] = None
+
+class BookCubeRow(BookCubeTotals):
+    keys: dict  # dimension -> value, plus carrier_name / producer_name
+
+class BookCubeResponse(BaseModel):
+    group_by: List[str]
+    rows: List[BookCubeRow]
+    totals: BookCubeTotals
+    refreshed_at: Optional[datetime] = None
+
+
+# ============================================================================
+# COMMISSIONS
+# ============================================================================
+
+class StatementLineIssue(BaseModel):
+    line: int
+    policy_number: str
+    amount: Optional[Decimal] = None
+    period: Optional[str] = None
+    reason: str
+
+class CommissionVariance(BaseModel):
+    commission_id: uuid.UUID
+    policy_number: str
+    period: Optional[str] = None
+    expected_amount: Decimal
+    received_amount: Decimal
+    variance: Decimal
+
+class MissingCommission(BaseModel):
+    commission_id: uuid.UUID
+    policy_number: Optional[str] = None
+    period: Optional[str] = None
+    expected_amount: Optional[Decimal] = None
+
+class ExpectedCommissionRequest(BaseModel):
+    """period is 'YYYY-MM' (policy effective month); full recomputes instead of changes since the last run."""
+    period: Optional[str] = Field(default=None, pattern=r"^\d{4}-\d{2}$")
+    full: bool = False
+
+class ExpectedCommissionResponse(BaseModel):
+    created: int
+    updated: int
+    removed: int = 0  # Expected rows of policies no longer Active
+    since: Optional[datetime] = None
+
+class ReconcileResponse(BaseModel):
+    """Report lists are capped; the counts cover the whole statement."""
+    lines: int
+    matched_lines: int
+    updated: int
+    unmatched_count: int
+    unmatched: List[StatementLineIssue]
+    variances: List[CommissionVariance]
+    missing: List[MissingCommission]
+
+
 # ============================================================================
 # NOTE
 # ============================================================================
@@ -512,6 +759,92 @@ class CommLogResponse(BaseModel):
     logged_at: datetime
 
 
+# ============================================================================
+# ACCOUNT 360
+# ============================================================================
+
+class AccountOverviewSummary(BaseModel):
+    # Full counts; the lists in AccountOverviewResponse are capped
+    contacts: int
+    policies: int
+    active_policies: int
+    total_premium: Decimal  # Active policies
+    open_service_items: int
+    open_tasks: int
+    notes: int
+    comm_logs: int
+    last_contact_at: Optional[datetime] = None
+
+class AccountOverviewResponse(BaseModel):
+    account: AccountResponse
+    contacts: List[ContactResponse]
+    policies: List[PolicyResponse]
+    service_items: List[ServiceItemResponse]  # open items
+    tasks: List[TaskResponse]  # open tasks linked to the account
+    notes: List[NoteResponse]  # newest first
+    comm_logs: List[CommLogResponse]  # newest first
+    summary: AccountOverviewSummary
+
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportResponse(BaseModel):
+    """Error list is capped; error_count covers the whole file."""
+    rows: int
+    valid: int
+    inserted: int
+    skipped: int
+    error_count: int
+    errors: List[ImportRowError]
+
+
+# ============================================================================
+# DUPLICATES
+# ============================================================================
+
+class DuplicateCheckRequest(BaseModel):
+    """Values of a record being entered; accounts use name, contacts/prospects first/last name."""
+    entity_type: str = Field(pattern="^(Account|Contact|Prospect)$")
+    name: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    mobile_phone: Optional[str] = None
+    zip_code: Optional[str] = None
+    exclude_id: Optional[uuid.UUID] = None
+
+class DuplicateMatch(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: uuid.UUID
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    score: Decimal
+    reasons: List[str]
+
+class DuplicateCandidateResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: uuid.UUID
+    entity_type: str
+    entity_a_id: uuid.UUID
+    entity_b_id: uuid.UUID
+    score: Decimal
+    reasons: List[str]
+    status: str
+    detected_at: datetime
+    resolved_at: Optional[datetime] = None
+
+class DuplicateCandidateUpdate(BaseModel):
+    status: str = Field(pattern="^(Open|Dismissed)$")
+
+
 # ============================================================================
 # DOCUMENT
 # ============================================================================
@@ -529,6 +862,45 @@ class DocumentResponse(BaseModel):
     uploaded_at: datetime
 
 
+# ============================================================================
+# REMINDERS & NOTIFICATIONS
+# ============================================================================
+
+class ReminderCreate(BaseModel):
+    linked_entity_type: str
+    linked_entity_id: uuid.UUID
+    reminder_date: datetime
+    message: str = Field(min_length=1)
+
+class ReminderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: uuid.UUID
+    linked_entity_type: str
+    linked_entity_id: uuid.UUID
+    reminder_date: datetime
+    message: str
+    is_dismissed: bool
+    created_by: Optional[uuid.UUID] = None
+    created_at: datetime
+    dismissed_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
+
+class NotificationResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: uuid.UUID
+    title: str
+    message: Optional[str] = None
+    linked_entity_type: Optional[str] = None
+    linked_entity_id: Optional[uuid.UUID] = None
+    source: str
+    is_read: bool
+    created_at: datetime
+
+class MarkReadRequest(BaseModel):
+    """Notification ids to mark read; omit to mark all of the user's notifications."""
+    ids: Optional[List[uuid.UUID]] = None
+
+
 # ============================================================================
 # DASHBOARD
 # ============================================================================
@@ -0,0 +1,121 @@
+"""
+Account 360: the account plus bounded slices of everything attached to it, for
+the account detail page.
+
+Everything is read through the request's one session (an AsyncSession runs one
+statement at a time, so the slices are sequential rather than concurrent, but
+the page pays for one request, one auth check and one connection checkout
+instead of seven). The summary numbers and the full size of every slice come
+from a single SELECT of scalar subqueries, so a truncated slice can say
+"25 of 140".
+"""
+from sqlalchemy import select, func, and_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import (
+    User, Account, Contact, Policy, Carrier, ServiceItem, Task, Note, CommunicationLog,
+)
+from app.services.account_summaries import contact_time
+from app.services.service_items import OPEN_STATUSES_EXCLUDED, OPEN_TASK_STATUSES
+
+LIMITS = {
+    "contacts": 50,
+    "policies": 100,
+    "service_items": 50,
+    "tasks": 50,
+    "notes": 25,
+    "comm_logs": 25,
+}
+
+
+def _linked(model, account_id):
+    return and_(model.linked_entity_type == "Account", model.linked_entity_id == account_id)
+
+
+def _summary_query(account_id):
+    def scalar(query):
+        return query.scalar_subquery()
+
+    return select(
+        scalar(select(func.count(Contact.id)).where(Contact.account_id == account_id)).label("contacts"),
+        scalar(select(func.count(Policy.id)).where(Policy.account_id == account_id)).label("policies"),
+        scalar(
+            select(func.count(Policy.id)).where(and_(Policy.account_id == account_id, Policy.status == "Active"))
+        ).label("active_policies"),
+        scalar(
+            select(func.coalesce(func.sum(case((Policy.status == "Active", Policy.premium), else_=0)), 0))
+            .where(Policy.account_id == account_id)
+        ).label("total_premium"),
+        scalar(
+            select(func.count(ServiceItem.id))
+            .where(and_(ServiceItem.account_id == account_id, ServiceItem.status.notin_(OPEN_STATUSES_EXCLUDED)))
+        ).label("open_service_items"),
+        scalar(
+            select(func.count(Task.id)).where(and_(_linked(Task, account_id), Task.status.in_(OPEN_TASK_STATUSES)))
+        ).label("open_tasks"),
+        scalar(select(func.count(Note.id)).where(_linked(Note, account_id))).label("notes"),
+        scalar(select(func.count(CommunicationLog.id)).where(_linked(CommunicationLog, account_id))).label("comm_logs"),
+        scalar(
+            select(func.max(contact_time())).where(_linked(CommunicationLog, account_id))
+        ).label("last_contact_at"),
+    )
+
+
+async def load_account_overview(db: AsyncSession, account: Account) -> dict:
+    """Related slices and summary for an already loaded (and access-checked) account."""
+    account_id = account.id
+
+    contacts = (await db.execute(
+        select(Contact)
+        .where(Contact.account_id == account_id)
+        .order_by(Contact.is_primary.desc(), Contact.last_name)
+        .limit(LIMITS["contacts"])
+    )).scalars().all()
+
+    policies = (await db.execute(
+        select(Policy, Carrier.name.label("carrier_name"))
+        .outerjoin(Carrier, Policy.carrier_id == Carrier.id)
+        .where(Policy.account_id == account_id)
+        .order_by(Policy.expiration_date)
+        .limit(LIMITS["policies"])
+    )).all()
+
+    service_items = (await db.execute(
+        select(ServiceItem, Policy.line_of_business.label("policy_lob"), User.name.label("assignee_name"))
+        .outerjoin(Policy, ServiceItem.policy_id == Policy.id)
+        .outerjoin(User, ServiceItem.assigned_to == User.id)
+        .where(and_(ServiceItem.account_id == account_id, ServiceItem.status.notin_(OPEN_STATUSES_EXCLUDED)))
+        .order_by(ServiceItem.due_date.asc().nullslast())
+        .limit(LIMITS["service_items"])
+    )).all()
+
+    tasks = (await db.execute(
+        select(Task)
+        .where(and_(_linked(Task, account_id), Task.status.in_(OPEN_TASK_STATUSES)))
+        .order_by(Task.due_date.asc().nullslast(), Task.priority.desc())
+        .limit(LIMITS["tasks"])
+    )).scalars().all()
+
+    notes = (await db.execute(
+        select(Note).where(_linked(Note, account_id)).order_by(Note.created_at.desc()).limit(LIMITS["notes"])
+    )).scalars().all()
+
+    comm_logs = (await db.execute(
+        select(CommunicationLog)
+        .where(_linked(CommunicationLog, account_id))
+        .order_by(CommunicationLog.logged_at.desc())
+        .limit(LIMITS["comm_logs"])
+    )).scalars().all()
+
+    summary = (await db.execute(_summary_query(account_id))).one()._asdict()
+
+    return {
+        "account": account,
+        "contacts": contacts,
+        "policies": policies,
+        "service_items": service_items,
+        "tasks": tasks,
+        "notes": notes,
+        "comm_logs": comm_logs,
+        "summary": summary,
+    }
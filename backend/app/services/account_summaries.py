@@ -0,0 +1,192 @@
+"""
+Per-account summary rows (account_summaries) so the accounts list can filter
+and sort on rollups through plain indexes instead of per-row subqueries.
+
+  policy_count        Active policies
+  active_premium      premium on Active policies
+  written_premium     sales log premium
+  open_service_items  service items not Completed/Closed
+  last_contact_at     latest communication on the account (when it was sent or
+                      received, else when it was logged)
+
+Write paths that can move these numbers (policies, service items, comm logs,
+sales, imports, carrier downloads, merges and the batch generators) call
+mark_summaries_stale() for the accounts they touched. The ids collect on the
+session and are recomputed once, just before it commits (app.db.session
+commit(), used by get_db and the worker), with one INSERT ... SELECT ... ON
+CONFLICT DO UPDATE, so there are no running deltas to drift.
+run_account_summary_reconcile() recomputes every account and fixes anything a
+path missed.
+
+Under READ COMMITTED two transactions touching the same account would each
+compute from a snapshot missing the other's uncommitted rows, and the later
+upsert would win with stale numbers. The recompute therefore first locks the
+account rows (FOR NO KEY UPDATE, in id order, which leaves FK inserts such as
+new policies unblocked): a second transaction waits for the first to commit
+and then computes from a snapshot that includes it. Taking the locks once, at
+commit, keeps them short even in long jobs and means each transaction takes
+them in a single id-ordered statement.
+"""
+import uuid
+from typing import Iterable, Union
+
+from sqlalchemy import select, func, and_, or_, any_, bindparam, Select
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import before_commit, commit
+from app.models.models import Account, AccountSummary, Policy, ServiceItem, CommunicationLog, SalesLogEntry
+from app.services.service_items import OPEN_STATUSES_EXCLUDED
+
+SUMMARY_FIELDS = ("policy_count", "active_premium", "written_premium", "open_service_items", "last_contact_at")
+STALE_KEY = "stale_account_summaries"
+RECONCILE_CHUNK = 2000
+
+AccountIds = Union[Iterable[uuid.UUID], Select]
+
+
+def comm_log_accounts(rows: Iterable[dict]) -> set:
+    """Account ids that bulk-inserted communication log rows are linked to."""
+    return {r["linked_entity_id"] for r in rows if r.get("linked_entity_type") == "Account"}
+
+
+def contact_time():
+    """When a communication happened: sent/received time, else when it was logged."""
+    return func.coalesce(CommunicationLog.sent_at, CommunicationLog.logged_at)
+
+
+def summary_statement(account_ids: AccountIds = None):
+    """
+    Upsert of freshly computed summaries for account_ids (a list of ids or a
+    SELECT of ids), or for every account when None. Only rows whose values
+    changed are written; RETURNING gives their account ids.
+    """
+    if account_ids is None:
+        def scope(col):
+            return []
+    elif isinstance(account_ids, Select):
+        def scope(col):
+            return [col.in_(account_ids)]
+    else:
+        ids = bindparam("account_ids", list(account_ids), type_=ARRAY(UUID(as_uuid=True)))
+
+        def scope(col):
+            return [col == any_(ids)]
+
+    policies = (
+        select(
+            Policy.account_id,
+            func.count().label("policy_count"),
+            func.sum(Policy.premium).label("active_premium"),
+        )
+        .where(Policy.status == "Active", *scope(Policy.account_id))
+        .group_by(Policy.account_id)
+        .subquery("p")
+    )
+    sales = (
+        select(SalesLogEntry.account_id, func.sum(SalesLogEntry.premium).label("written_premium"))
+        .where(*scope(SalesLogEntry.account_id))
+        .group_by(SalesLogEntry.account_id)
+        .subquery("s")
+    )
+    items = (
+        select(ServiceItem.account_id, func.count().label("open_service_items"))
+        .where(ServiceItem.status.notin_(OPEN_STATUSES_EXCLUDED), *scope(ServiceItem.account_id))
+        .group_by(ServiceItem.account_id)
+        .subquery("si")
+    )
+    contacts = (
+        select(
+            CommunicationLog.linked_entity_id.label("account_id"),
+            func.max(contact_time()).label("last_contact_at"),
+        )
+        .where(CommunicationLog.linked_entity_type == "Account", *scope(CommunicationLog.linked_entity_id))
+        .group_by(CommunicationLog.linked_entity_id)
+        .subquery("c")
+    )
+    source = (
+        select(
+            Account.id,
+            func.coalesce(policies.c.policy_count, 0),
+            func.coalesce(policies.c.active_premium, 0),
+            func.coalesce(sales.c.written_premium, 0),
+            func.coalesce(items.c.open_service_items, 0),
+            contacts.c.last_contact_at,
+            func.now(),
+        )
+        .outerjoin(policies, policies.c.account_id == Account.id)
+        .outerjoin(sales, sales.c.account_id == Account.id)
+        .outerjoin(items, items.c.account_id == Account.id)
+        .outerjoin(contacts, contacts.c.account_id == Account.id)
+        .where(*scope(Account.id))
+    )
+
+    stmt = pg_insert(AccountSummary).from_select(["account_id", *SUMMARY_FIELDS, "updated_at"], source)
+    return stmt.on_conflict_do_update(
+        index_elements=[AccountSummary.account_id],
+        set_={**{f: stmt.excluded[f] for f in SUMMARY_FIELDS}, "updated_at": stmt.excluded.updated_at},
+        where=or_(*[getattr(AccountSummary, f).is_distinct_from(stmt.excluded[f]) for f in SUMMARY_FIELDS]),
+    ).returning(AccountSummary.account_id)
+
+
+async def _lock_accounts(db: AsyncSession, account_ids: AccountIds = None, skip_locked: bool = False) -> list:
+    """Lock the account rows being summarized until commit; returns the locked ids."""
+    query = select(Account.id).order_by(Account.id).with_for_update(key_share=True, skip_locked=skip_locked)
+    if isinstance(account_ids, Select):
+        query = query.where(Account.id.in_(account_ids))
+    elif account_ids is not None:
+        query = query.where(Account.id == any_(bindparam("account_ids", list(account_ids),
+                                                             type_=ARRAY(UUID(as_uuid=True)))))
+    return list((await db.execute(query)).scalars().all())
+
+
+def mark_summaries_stale(db: AsyncSession, account_ids: AccountIds):
+    """Recompute the given accounts' summaries when this session next commits."""
+    stale = db.info.setdefault(STALE_KEY, {"ids": set(), "queries": []})
+    if isinstance(account_ids, Select):
+        stale["queries"].append(account_ids)
+    else:
+        stale["ids"].update(a for a in account_ids if a is not None)
+    before_commit(db, STALE_KEY, refresh_stale_summaries)
+
+
+async def refresh_stale_summaries(db: AsyncSession) -> int:
+    """Lock and recompute the accounts marked stale on this session. Returns how many rows changed."""
+    stale = db.info.pop(STALE_KEY, None)
+    if not stale:
+        return 0
+    ids = set(stale["ids"])
+    for query in stale["queries"]:
+        ids.update((await db.execute(query)).scalars().all())
+    ids.discard(None)
+    if not ids:
+        return 0
+    locked = await _lock_accounts(db, ids)
+    if not locked:
+        return 0
+    return len((await db.execute(summary_statement(locked))).all())
+
+
+async def run_account_summary_reconcile(db: AsyncSession) -> dict:
+    """
+    Batch job: recompute every account's summary, RECONCILE_CHUNK accounts per
+    transaction in id order; reports rows that were stale or missing. Accounts
+    locked by an in-flight transaction are skipped rather than waited on; it
+    recomputes them itself before committing.
+    """
+    corrected, after = 0, None
+    while True:
+        query = select(Account.id).order_by(Account.id).limit(RECONCILE_CHUNK)
+        if after is not None:
+            query = query.where(Account.id > after)
+        chunk = (await db.execute(query)).scalars().all()
+        if not chunk:
+            break
+        locked = await _lock_accounts(db, chunk, skip_locked=True)
+        if locked:
+            corrected += len((await db.execute(summary_statement(locked))).all())
+        await commit(db)
+        after = chunk[-1]
+        if len(chunk) < RECONCILE_CHUNK:
+            break
+    return {"corrected": corrected}
@@ -3,7 +3,8 @@ Audit logging service. Every state-changing operation must call this.
 """
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.models import AuditLog
 
@@ -48,3 +49,48 @@ async def audit_update(db, user_id, entity_type, entity_id, field, old_val, new_
 
 async def audit_delete(db, user_id, entity_type, entity_id, ip=None, ua=None):
     await write_audit_log(db, user_id, "Delete", entity_type, entity_id, ip_address=ip, user_agent=ua)
+
+
+# ---------- Bulk ----------
+
+async def write_audit_logs_bulk(db: AsyncSession, entries: list[dict]):
+    """Write many audit entries with one multi-row INSERT (batch jobs, bulk endpoints)."""
+    if not entries:
+        return
+    await db.execute(insert(AuditLog), entries)
+
+
+def audit_entry(
+    user_id: Optional[uuid.UUID],
+    action: str,
+    entity_type: str,
+    entity_id: uuid.UUID,
+    field_changed: Optional[str] = None,
+    old_value=None,
+    new_value=None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    metadata: Optional[dict] = None,
+) -> dict:
+    """Build one row for write_audit_logs_bulk, stringifying values like write_audit_log."""
+    return {
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "field_changed": field_changed,
+        "old_value": str(old_value) if old_value is not None else None,
+        "new_value": str(new_value) if new_value is not None else None,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "metadata_json": metadata,
+    }
+
+
+async def audit_bulk(db, user_id, action, entity_type, entity_ids: Iterable[uuid.UUID],
+                     field=None, old_val=None, new_val=None, ip=None, ua=None, meta=None):
+    """Write the same audit entry for every id in entity_ids."""
+    await write_audit_logs_bulk(db, [
+        audit_entry(user_id, action, entity_type, eid, field, old_val, new_val, ip, ua, meta)
+        for eid in entity_ids
+    ])
@@ -0,0 +1,385 @@
+"""
+Automation rule engine.
+
+Rules are compiled once into SQL predicates and cached until their JSON changes.
+Date-based rules are evaluated set-wise: a batch of matching entities is claimed
+by inserting AutomationExecution rows straight from the predicate query, with
+duplicates dropped by the idx_auto_exec_unique partial index. The rule's actions
+are then applied to the claimed batch with multi-row statements. Each rule runs
+in its own savepoint, so one failing rule is logged and skipped without undoing
+the others.
+
+Rule JSON format:
+
+    trigger_config_json: {"entity": "Policy", "date_field": "expiration_date", "days_before": 60}
+                         ("days_after": N fires once the date is N days in the past)
+    conditions_json:     {"all": [{"field": "renewal_status", "op": "eq", "value": "Not Started"}]}
+                         ("any" groups may be nested; a bare list means "all")
+    actions_json:        {"actions": [
+                             {"type": "create_task", "title": "Call {policy_number}",
+                              "priority": "High", "due_in_days": 3, "assign_to": "servicing_owner_id"},
+                             {"type": "create_service_item", "service_type": "Renewal",
+                              "urgency": "Medium", "due_in_days": 30, "assign_to": "servicing_owner_id"},
+                             {"type": "set_field", "field": "renewal_status", "value": "Contacted"},
+                         ]}
+"""
+import json
+import logging
+import string
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, update, exists, and_, or_, not_, func, literal, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import (
+    AutomationRule, AutomationExecution, Account, Policy, Installment,
+    Prospect, ServiceItem, Task,
+)
+from app.services.account_summaries import mark_summaries_stale
+from app.services.audit import audit_bulk
+
+logger = logging.getLogger("sentinel.automation")
+
+BATCH_SIZE = 500
+
+# Entities a rule may target. Only these models' columns are addressable from rule JSON.
+ENTITY_MODELS = {
+    "Account": Account,
+    "Policy": Policy,
+    "Installment": Installment,
+    "Prospect": Prospect,
+    "ServiceItem": ServiceItem,
+    "Task": Task,
+}
+
+# Column holding the account a created service item should hang off.
+ACCOUNT_COLUMNS = {
+    "Account": "id",
+    "Policy": "account_id",
+    "ServiceItem": "account_id",
+}
+
+SETTABLE_FIELDS = {
+    "Account": {"status", "assigned_producer_id", "assigned_csr_id"},
+    "Policy": {"renewal_status", "status", "servicing_owner_id"},
+    "Installment": {"status"},
+    "Prospect": {"pipeline_stage", "assigned_producer_id"},
+    "ServiceItem": {"status", "urgency", "assigned_to"},
+    "Task": {"status", "priority", "assigned_to"},
+}
+
+
+class RuleCompileError(ValueError):
+    """Raised when a rule's JSON cannot be turned into a query."""
+
+
+@dataclass
+class CompiledRule:
+    rule_id: uuid.UUID
+    entity_type: str
+    model: type
+    predicate: object
+    actions: list
+    # Entity columns the actions read (templates, assignees, account links)
+    columns: list = field(default_factory=list)
+
+
+_compiled_cache: dict[uuid.UUID, tuple[str, CompiledRule]] = {}
+
+
+# ---------- Compilation ----------
+
+def _column(model, name: str):
+    col = model.__table__.columns.get(name)
+    if col is None:
+        raise RuleCompileError(f"Unknown field '{name}' on {model.__name__}")
+    return getattr(model, name)
+
+
+def _compile_condition(model, cond):
+    if isinstance(cond, list):
+        cond = {"all": cond}
+    if "all" in cond:
+        return and_(*[_compile_condition(model, c) for c in cond["all"]])
+    if "any" in cond:
+        return or_(*[_compile_condition(model, c) for c in cond["any"]])
+    if "not" in cond:
+        return not_(_compile_condition(model, cond["not"]))
+
+    col = _column(model, cond.get("field", ""))
+    op = cond.get("op", "eq")
+    value = cond.get("value")
+    if op == "eq":
+        return col == value
+    if op == "ne":
+        return col != value
+    if op == "in":
+        return col.in_(value)
+    if op == "not_in":
+        return col.notin_(value)
+    if op == "lt":
+        return col < value
+    if op == "lte":
+        return col <= value
+    if op == "gt":
+        return col > value
+    if op == "gte":
+        return col >= value
+    if op == "is_null":
+        return col.is_(None)
+    if op == "not_null":
+        return col.isnot(None)
+    if op == "contains":
+        return col.ilike(f"%{value}%")
+    raise RuleCompileError(f"Unknown operator '{op}'")
+
+
+def _compile_trigger(model, config: dict):
+    """Date window predicate. Uses CURRENT_DATE so the compiled form stays valid across days."""
+    date_col = _column(model, config.get("date_field", ""))
+    if "days_before" in config:
+        days = int(config["days_before"])
+        return and_(date_col >= func.current_date(), date_col <= func.current_date() + days)
+    if "days_after" in config:
+        days = int(config["days_after"])
+        return date_col <= func.current_date() - days
+    raise RuleCompileError("Date-based trigger needs days_before or days_after")
+
+
+def _template_fields(template: Optional[str]) -> list[str]:
+    if not template:
+        return []
+    return [name for _, name, _, _ in string.Formatter().parse(template) if name]
+
+
+def compile_rule(rule: AutomationRule) -> CompiledRule:
+    """Compile a rule into a predicate + action plan, reusing the cached form if unchanged."""
+    # Keyed on the rule definition rather than updated_at, which moves on every trigger
+    version = json.dumps(
+        [rule.trigger_type, rule.trigger_config_json, rule.conditions_json, rule.actions_json],
+        sort_keys=True, default=str,
+    )
+    cached = _compiled_cache.get(rule.id)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    config = rule.trigger_config_json or {}
+    entity_type = config.get("entity")
+    model = ENTITY_MODELS.get(entity_type)
+    if model is None:
+        raise RuleCompileError(f"Unsupported entity '{entity_type}'")
+
+    clauses = []
+    if rule.trigger_type == "Date-based":
+        clauses.append(_compile_trigger(model, config))
+    if rule.conditions_json:
+        clauses.append(_compile_condition(model, rule.conditions_json))
+
+    actions = rule.actions_json or {}
+    if isinstance(actions, dict):
+        actions = actions.get("actions", [])
+    if not actions:
+        raise RuleCompileError("Rule has no actions")
+
+    columns = set()
+    for action in actions:
+        kind = action.get("type")
+        if kind in ("create_task", "create_service_item"):
+            for name in _template_fields(action.get("title")) + _template_fields(action.get("description")):
+                _column(model, name)
+                columns.add(name)
+            assign_to = action.get("assign_to")
+            if assign_to and assign_to in model.__table__.columns:
+                columns.add(assign_to)
+            elif assign_to:
+                try:
+                    uuid.UUID(str(assign_to))
+                except ValueError:
+                    raise RuleCompileError(f"assign_to must be a {entity_type} field or a user id, not '{assign_to}'")
+            if kind == "create_service_item":
+                account_col = ACCOUNT_COLUMNS.get(entity_type)
+                if not account_col:
+                    raise RuleCompileError(f"{entity_type} rules cannot create service items")
+                columns.add(account_col)
+        elif kind == "set_field":
+            if action.get("field") not in SETTABLE_FIELDS[entity_type]:
+                raise RuleCompileError(f"Field '{action.get('field')}' cannot be set by automation")
+        else:
+            raise RuleCompileError(f"Unknown action '{kind}'")
+
+    compiled = CompiledRule(
+        rule_id=rule.id,
+        entity_type=entity_type,
+        model=model,
+        predicate=and_(*clauses) if clauses else literal(True),
+        actions=actions,
+        columns=sorted(columns - {"id"}),
+    )
+    _compiled_cache[rule.id] = (version, compiled)
+    return compiled
+
+
+# ---------- Execution ----------
+
+async def _claim_batch(db: AsyncSession, compiled: CompiledRule, entity_ids=None, limit: int = BATCH_SIZE) -> list:
+    """Insert Success executions for the next batch of matches; returns the ids actually claimed."""
+    model = compiled.model
+    already_run = exists().where(
+        and_(
+            AutomationExecution.rule_id == compiled.rule_id,
+            AutomationExecution.target_entity_type == compiled.entity_type,
+            AutomationExecution.target_entity_id == model.id,
+            AutomationExecution.status == "Success",
+        )
+    )
+    candidates = select(
+        func.uuid_generate_v4(),
+        literal(compiled.rule_id, UUID(as_uuid=True)),
+        literal(compiled.entity_type),
+        model.id,
+        literal("Success"),
+        literal({"actions": [a["type"] for a in compiled.actions]}, JSONB),
+        func.now(),
+    ).where(compiled.predicate, ~already_run)
+    if entity_ids is not None:
+        candidates = candidates.where(model.id.in_(entity_ids))
+    candidates = candidates.limit(limit)
+
+    stmt = (
+        pg_insert(AutomationExecution)
+        .from_select(
+            ["id", "rule_id", "target_entity_type", "target_entity_id", "status", "actions_taken_json", "triggered_at"],
+            candidates,
+            include_defaults=False,
+        )
+        .on_conflict_do_nothing(
+            index_elements=["rule_id", "target_entity_type", "target_entity_id"],
+            index_where=text("status = 'Success'"),
+        )
+        .returning(AutomationExecution.target_entity_id)
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+def _assignee(action: dict, row: dict):
+    assign_to = action.get("assign_to")
+    if not assign_to:
+        return None
+    if assign_to in row:
+        return row[assign_to]
+    return uuid.UUID(str(assign_to))  # checked by compile_rule
+
+
+async def _apply_actions(db: AsyncSession, compiled: CompiledRule, ids: list):
+    model = compiled.model
+    rows = [{"id": i} for i in ids]
+    if compiled.columns:
+        result = await db.execute(
+            select(model.id, *[getattr(model, c) for c in compiled.columns]).where(model.id.in_(ids))
+        )
+        rows = [dict(r._mapping) for r in result.all()]
+
+    audit_meta = {"automation_rule_id": str(compiled.rule_id)}
+    today = date.today()
+
+    for action in compiled.actions:
+        kind = action["type"]
+        due = today + timedelta(days=action["due_in_days"]) if "due_in_days" in action else None
+
+        if kind == "create_task":
+            tasks = [
+                {
+                    "id": uuid.uuid4(),
+                    "title": action.get("title", "Automated task").format_map(row),
+                    "description": (action.get("description") or "").format_map(row) or None,
+                    "linked_entity_type": compiled.entity_type,
+                    "linked_entity_id": row["id"],
+                    "assigned_to": _assignee(action, row),
+                    "due_date": due,
+                    "priority": action.get("priority", "Medium"),
+                    "source": "Automation",
+                }
+                for row in rows
+            ]
+            await db.execute(pg_insert(Task), tasks)
+            await audit_bulk(db, None, "Create", "Task", [t["id"] for t in tasks], meta=audit_meta)
+
+        elif kind == "create_service_item":
+            account_col = ACCOUNT_COLUMNS[compiled.entity_type]
+            items = [
+                {
+                    "id": uuid.uuid4(),
+                    "type": action.get("service_type", "General"),
+                    "account_id": row[account_col],
+                    "policy_id": row["id"] if compiled.entity_type == "Policy" else None,
+                    "description": (action.get("description") or action.get("title") or "").format_map(row) or None,
+                    "assigned_to": _assignee(action, row),
+                    "due_date": due,
+                    "urgency": action.get("urgency", "Medium"),
+                }
+                for row in rows
+            ]
+            await db.execute(pg_insert(ServiceItem), items)
+            mark_summaries_stale(db, {i["account_id"] for i in items})
+            await audit_bulk(db, None, "Create", "ServiceItem", [i["id"] for i in items], meta=audit_meta)
+
+        elif kind == "set_field":
+            await db.execute(
+                update(model)
+                .where(model.id.in_(ids))
+                .values({action["field"]: action["value"]})
+                .execution_options(synchronize_session=False)
+            )
+            await audit_bulk(db, None, "Update", compiled.entity_type, ids,
+                             field=action["field"], new_val=action["value"], meta=audit_meta)
+
+
+async def evaluate_rule(db: AsyncSession, rule: AutomationRule, entity_ids=None) -> int:
+    """
+    Run one rule to completion in batches. Pass entity_ids to restrict evaluation
+    to specific records (event-based triggers). Returns the number of entities acted on.
+    """
+    compiled = compile_rule(rule)
+    total = 0
+    while True:
+        ids = await _claim_batch(db, compiled, entity_ids)
+        if not ids:
+            break
+        await _apply_actions(db, compiled, ids)
+        total += len(ids)
+        if len(ids) < BATCH_SIZE:
+            break
+
+    if total:
+        rule.last_triggered_at = datetime.utcnow()
+    return total
+
+
+async def run_date_based_rules(db: AsyncSession) -> dict:
+    """Evaluate every active Date-based rule. Used by the worker and the jobs endpoint."""
+    result = await db.execute(
+        select(AutomationRule).where(
+            and_(AutomationRule.is_active.is_(True), AutomationRule.trigger_type == "Date-based")
+        )
+    )
+    summary = {"rules": 0, "entities": 0, "errors": {}}
+    for rule in result.scalars().all():
+        rule_id = str(rule.id)  # read up front: a rolled-back savepoint expires the rule
+        try:
+            async with db.begin_nested():
+                entities = await evaluate_rule(db, rule)
+        except RuleCompileError as e:
+            summary["errors"][rule_id] = str(e)
+            continue
+        except Exception as e:
+            logger.exception("Automation rule %s failed", rule_id)
+            summary["errors"][rule_id] = f"{type(e).__name__}: {e}"[:500]
+            continue
+        summary["entities"] += entities
+        summary["rules"] += 1
+    await db.flush()
+    return summary
@@ -0,0 +1,140 @@
+"""
+Content-addressed document blobs.
+
+Every distinct file (by SHA-256) is stored once and recorded in document_blobs;
+documents point at it through content_hash and ref_count tracks how many do.
+Uploading a file that is already stored just links the existing blob: the hash
+is computed while streaming and the redundant copy is dropped afterwards. The
+transfer is never skipped on a client-supplied hash, which would let anyone
+who learns a digest attach that file.
+A blob is removed from storage when its last document is deleted.
+
+Stored objects are never deleted inside a request transaction: deletions are
+queued in blob_deletions in the same transaction and the blob_sweep job removes
+them once that has committed (a rollback drops the queued row with everything
+else). Each upload is guarded by a deletion queued UPLOAD_GRACE ahead and
+committed before the transfer starts; registering the blob cancels it, so an
+upload whose request fails or rolls back is swept instead of leaking.
+"""
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+import httpx
+from sqlalchemy import select, update, delete, and_, func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import DocumentBlob, BlobDeletion
+from app.services.storage import (
+    StorageBackend, StorageError, OneDriveStorage, get_local_storage, get_onedrive_storage,
+)
+
+# Longer than any upload can take: the guard must not fire while the transfer runs
+UPLOAD_GRACE = timedelta(days=1)
+SWEEP_BATCH_SIZE = 200
+
+
+def storage_name(storage: StorageBackend) -> str:
+    return "onedrive" if isinstance(storage, OneDriveStorage) else "local"
+
+
+def backend(name: str) -> StorageBackend:
+    return get_onedrive_storage() if name == "onedrive" else get_local_storage()
+
+
+async def hashing(chunks: AsyncIterator[bytes], digest) -> AsyncIterator[bytes]:
+    """Pass chunks through while feeding them to digest."""
+    async for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def new_digest():
+    return hashlib.sha256()
+
+
+async def queue_deletion(db: AsyncSession, storage: str, ref: str, delay: timedelta = timedelta(0)) -> uuid.UUID:
+    """Queue a stored object for removal once the current transaction commits."""
+    deletion_id = uuid.uuid4()
+    await db.execute(pg_insert(BlobDeletion).values(
+        id=deletion_id, storage=storage, ref=ref, not_before=datetime.now(timezone.utc) + delay,
+    ))
+    return deletion_id
+
+
+async def guard_upload(db: AsyncSession, storage: StorageBackend, key: str) -> uuid.UUID:
+    """Queue the upload's removal UPLOAD_GRACE ahead; the caller commits before transferring."""
+    return await queue_deletion(db, storage_name(storage), key, delay=UPLOAD_GRACE)
+
+
+async def register(
+    db: AsyncSession, sha256: str, size: int, storage: StorageBackend, ref: str, guard_id: uuid.UUID,
+) -> DocumentBlob:
+    """
+    Record a freshly stored blob with one reference and cancel its upload guard.
+    If the same content is already registered, link to that one and let the
+    guard remove the copy just stored (after commit).
+    """
+    stmt = pg_insert(DocumentBlob).values(
+        sha256=sha256, size=size, storage=storage_name(storage), ref=ref, ref_count=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DocumentBlob.sha256],
+        set_={"ref_count": DocumentBlob.ref_count + 1},
+    ).returning(DocumentBlob, literal_column("xmax = 0").label("inserted"))
+    blob, inserted = (await db.execute(stmt)).one()
+    if inserted:
+        await db.execute(delete(BlobDeletion).where(BlobDeletion.id == guard_id))
+    else:
+        await db.execute(
+            update(BlobDeletion)
+            .where(BlobDeletion.id == guard_id)
+            .values(not_before=func.now())
+            .execution_options(synchronize_session=False)
+        )
+    return blob
+
+
+async def release(db: AsyncSession, sha256: str):
+    """Drop one reference; queue the stored object's removal when none remain."""
+    await db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.sha256 == sha256)
+        .values(ref_count=DocumentBlob.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(
+        delete(DocumentBlob)
+        .where(and_(DocumentBlob.sha256 == sha256, DocumentBlob.ref_count <= 0))
+        .returning(DocumentBlob.storage, DocumentBlob.ref)
+    )
+    orphan = result.one_or_none()
+    if orphan:
+        await queue_deletion(db, orphan.storage, orphan.ref)
+
+
+async def run_blob_sweep(db: AsyncSession) -> dict:
+    """Batch job: remove queued objects from storage. Deletes are idempotent, so a retry is harmless."""
+    due = (await db.execute(
+        select(BlobDeletion)
+        .where(BlobDeletion.not_before <= func.now())
+        .order_by(BlobDeletion.not_before)
+        .limit(SWEEP_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )).scalars().all()
+
+    deleted, failed = [], 0
+    for d in due:
+        try:
+            await backend(d.storage).delete(d.ref)
+            deleted.append(d.id)
+        except (StorageError, OSError, httpx.HTTPError) as e:
+            failed += 1
+            d.attempts += 1
+            d.last_error = str(e)[:1000]
+            d.not_before = datetime.now(timezone.utc) + timedelta(minutes=5 * 2 ** min(d.attempts, 8))
+    if deleted:
+        await db.execute(delete(BlobDeletion).where(BlobDeletion.id.in_(deleted)))
+    return {"deleted": len(deleted), "failed": failed}
@@ -0,0 +1,155 @@
+"""
+Book-of-business analytics over the policy_book_cube materialized view.
+
+The cube holds policies pre-aggregated by carrier, line of business, producer,
+county, account type, status and effective / expiration month, with policy
+count, premium and renewed count per cell. Report questions (in-force premium
+by carrier x LOB x producer, retention by carrier, the expiring premium curve)
+regroup those cells instead of scanning policies joined to accounts.
+
+run_book_cube_refresh() rebuilds it with REFRESH MATERIALIZED VIEW CONCURRENTLY,
+so reports keep reading the previous contents while the refresh runs. The time
+of the last refresh is kept in job_states and returned with every report.
+"""
+import uuid
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import User, Carrier, policy_book_cube as cube
+from app.services.job_state import get_last_run, set_last_run
+
+JOB_NAME = "book_cube"
+
+DIMENSIONS = {
+    "carrier": cube.c.carrier_id,
+    "lob": cube.c.line_of_business,
+    "producer": cube.c.producer_id,
+    "county": cube.c.county,
+    "account_type": cube.c.account_type,
+    "status": cube.c.status,
+    "effective_month": cube.c.effective_month,
+    "expiration_month": cube.c.expiration_month,
+}
+
+# Dimensions that hold ids, and the name shown next to them
+LABELS = {
+    "carrier": (Carrier, Carrier.name),
+    "producer": (User, User.name),
+}
+
+
+def _month(d: date) -> date:
+    return d.replace(day=1)
+
+
+def cube_conditions(
+    carrier_id: Optional[uuid.UUID] = None,
+    line_of_business: Optional[str] = None,
+    producer_id: Optional[uuid.UUID] = None,
+    county: Optional[str] = None,
+    account_type: Optional[str] = None,
+    status: Optional[str] = None,
+    effective_from: Optional[date] = None,
+    effective_to: Optional[date] = None,
+    expiration_from: Optional[date] = None,
+    expiration_to: Optional[date] = None,
+) -> list:
+    """WHERE conditions on the cube. Date bounds are inclusive, at month granularity."""
+    conditions = []
+    for column, value in (
+        (cube.c.carrier_id, carrier_id),
+        (cube.c.line_of_business, line_of_business),
+        (cube.c.producer_id, producer_id),
+        (cube.c.county, county),
+        (cube.c.account_type, account_type),
+        (cube.c.status, status),
+    ):
+        if value is not None:
+            conditions.append(column == value)
+    if effective_from:
+        conditions.append(cube.c.effective_month >= _month(effective_from))
+    if effective_to:
+        conditions.append(cube.c.effective_month <= _month(effective_to))
+    if expiration_from:
+        conditions.append(cube.c.expiration_month >= _month(expiration_from))
+    if expiration_to:
+        conditions.append(cube.c.expiration_month <= _month(expiration_to))
+    return conditions
+
+
+def _retention(renewed: int, count: int) -> Optional[float]:
+    return round(renewed / count, 4) if count else None
+
+
+async def query_book_cube(
+    db: AsyncSession,
+    group_by: list[str],
+    conditions: list,
+    limit: int = 1000,
+) -> dict:
+    """
+    Cube cells regrouped by `group_by` (keys of DIMENSIONS) and filtered by
+    `conditions`, largest premium first, plus totals over every matching cell.
+    Retention is renewed / policies; it is meaningful when the filter selects
+    policies that have reached expiration (e.g. an expiration month range).
+    """
+    columns = [DIMENSIONS[d].label(d) for d in group_by]
+    measures = [
+        func.coalesce(func.sum(cube.c.policy_count), 0).label("policy_count"),
+        func.coalesce(func.sum(cube.c.premium), 0).label("premium"),
+        func.coalesce(func.sum(cube.c.renewed_count), 0).label("renewed_count"),
+    ]
+    grouped = (
+        select(*columns, *measures)
+        .where(*conditions)
+        .group_by(*columns)
+        .subquery("g")
+    )
+
+    # Names for id dimensions, joined onto the (small) grouped result
+    query = select(grouped)
+    for dim in group_by:
+        if dim in LABELS:
+            model, name = LABELS[dim]
+            query = query.add_columns(name.label(f"{dim}_name")).outerjoin(model, model.id == grouped.c[dim])
+    query = query.order_by(grouped.c.premium.desc(), *[grouped.c[d] for d in group_by]).limit(limit)
+
+    rows = []
+    for row in (await db.execute(query)).all():
+        m = row._mapping
+        keys = {}
+        for dim in group_by:
+            keys[dim] = m[dim]
+            if dim in LABELS:
+                keys[f"{dim}_name"] = m[f"{dim}_name"]
+        rows.append({
+            "keys": keys,
+            "policy_count": m["policy_count"],
+            "premium": m["premium"],
+            "renewed_count": m["renewed_count"],
+            "retention": _retention(m["renewed_count"], m["policy_count"]),
+        })
+
+    totals = (await db.execute(select(*measures).where(*conditions))).one()
+    return {
+        "group_by": group_by,
+        "rows": rows,
+        "totals": {
+            "policy_count": totals.policy_count,
+            "premium": totals.premium,
+            "renewed_count": totals.renewed_count,
+            "retention": _retention(totals.renewed_count, totals.policy_count),
+        },
+        "refreshed_at": await get_last_run(db, JOB_NAME),
+    }
+
+
+async def run_book_cube_refresh(db: AsyncSession) -> dict:
+    """Batch job: rebuild the cube from policies without blocking readers."""
+    started = datetime.now(timezone.utc)
+    await db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {cube.name}"))
+    await set_last_run(db, JOB_NAME, started)
+    return {"refreshed_at": started.isoformat()}
@@ -0,0 +1,68 @@
+"""
+Bulk field changes on service items and tasks (service board and task list actions).
+
+A change (status, assignee, urgency/priority, due date) is applied to rows picked
+by id or by the list filter with one UPDATE ... FROM a locked snapshot of the
+matched rows. Rows that already hold the new values are left untouched, so
+RETURNING yields exactly the rows that changed, along with their old values.
+Those feed one bulk audit insert with an entry per changed field, the same
+entries the single-item update endpoints write.
+"""
+import uuid
+from typing import Optional
+
+from sqlalchemy import select, update, and_, or_, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.audit import audit_entry, write_audit_logs_bulk
+
+
+async def bulk_update(
+    db: AsyncSession,
+    model,
+    entity_type: str,
+    conditions: list,
+    changes: dict,
+    user_id: Optional[uuid.UUID],
+    done_statuses: tuple[str, ...] = (),
+    ip: Optional[str] = None,
+) -> list[uuid.UUID]:
+    """Apply `changes` to the rows matching `conditions`; returns the ids that changed."""
+    if not changes:
+        return []
+    fields = list(changes)
+    old = (
+        select(model.id, *[getattr(model, f).label(f"old_{f}") for f in fields])
+        .where(*conditions)
+        .with_for_update()
+        .subquery("old")
+    )
+    values = dict(changes)
+    if changes.get("status") in done_statuses:
+        # Track completion, only for rows moving into the status
+        values["completed_at"] = case(
+            (model.status != changes["status"], func.now()), else_=model.completed_at
+        )
+    result = await db.execute(
+        update(model)
+        .where(and_(
+            model.id == old.c.id,
+            or_(*[getattr(model, f).is_distinct_from(v) for f, v in changes.items()]),
+        ))
+        .values(values)
+        .returning(model.id, *[old.c[f"old_{f}"] for f in fields])
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+
+    entries = []
+    for row in rows:
+        for f, new_value in changes.items():
+            old_value = row._mapping[f"old_{f}"]
+            if old_value != new_value:
+                entries.append(audit_entry(
+                    user_id, "Update", entity_type, row.id, f, old_value, new_value,
+                    ip_address=ip, metadata={"bulk": True},
+                ))
+    await write_audit_logs_bulk(db, entries)
+    return [row.id for row in rows]
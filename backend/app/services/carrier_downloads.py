@@ -0,0 +1,423 @@
+"""
+Carrier download ingestion: policy and billing files applied as diffs.
+
+A download (CSV with a header row, or fixed-width with a column layout) is read
+as a stream and processed in batches. For each batch the tracked fields of every
+line are normalized and hashed in Python, and one query joins the batch (passed
+as arrays and unnested) to the current Policy/Installment rows, comparing that
+hash with md5() of the same fields computed by Postgres. Only lines whose hash
+differs come back, so unchanged rows cost nothing beyond the comparison.
+
+Changed rows are written with executemany UPDATEs by primary key (new billing
+installments with one multi-row INSERT), and each touched policy gets a single
+audit entry holding all of its field changes as one change set.
+
+Blank cells mean "not provided": they are hashed like any other value, but never
+overwrite the current value.
+"""
+import csv
+import hashlib
+import io
+import re
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, Optional
+
+from dateutil import parser as date_parser
+from sqlalchemy import select, update, and_, or_, func, cast, column, literal_column, true, bindparam, Text, Integer, Date, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Policy, Installment
+from app.services.account_summaries import mark_summaries_stale
+from app.services.audit import audit_entry, write_audit_logs_bulk
+from app.services.commissions import normalize_header, normalize_policy_number, parse_amount
+
+BATCH_SIZE = 2000
+REPORT_LIMIT = 1000
+
+POLICY_STATUSES = {
+    "active": "Active", "inforce": "Active", "a": "Active",
+    "cancelled": "Cancelled", "canceled": "Cancelled", "cancel": "Cancelled", "c": "Cancelled",
+    "expired": "Expired", "e": "Expired",
+    "nonrenewed": "Non-Renewed", "nonrenewal": "Non-Renewed", "nr": "Non-Renewed",
+    "rewritten": "Rewritten",
+}
+INSTALLMENT_STATUSES = {
+    "scheduled": "Scheduled", "due": "Scheduled", "billed": "Scheduled", "open": "Scheduled",
+    "paid": "Paid", "p": "Paid",
+    "pastdue": "Past Due", "late": "Past Due", "overdue": "Past Due",
+    "cancelled": "Cancelled", "canceled": "Cancelled", "void": "Cancelled",
+}
+PAYMENT_PLANS = {
+    "annual": "Annual", "paidinfull": "Annual", "pif": "Annual",
+    "semiannual": "Semi-Annual", "quarterly": "Quarterly", "monthly": "Monthly", "eft": "EFT",
+}
+
+
+def _lookup(table: dict, label: str):
+    def parse(value: str) -> str:
+        found = table.get(re.sub(r"[^a-z0-9]", "", value.lower()))
+        if found is None:
+            raise ValueError(f"Unknown {label}: {value}")
+        return found
+    return parse
+
+
+def _parse_date(value: str) -> date:
+    return date_parser.parse(value).date()
+
+
+@dataclass
+class DownloadKind:
+    """What a download updates: key columns, tracked fields and their parsers."""
+    model: type
+    aliases: dict[str, set[str]]
+    fields: dict[str, callable]
+    required: set[str]
+
+
+KINDS = {
+    "policies": DownloadKind(
+        model=Policy,
+        aliases={
+            "policy_number": {"policy_number", "policy_no", "policy", "pol_no"},
+            "effective_date": {"effective_date", "eff_date", "effective", "term_effective_date"},
+            "expiration_date": {"expiration_date", "exp_date", "expiration", "term_expiration_date"},
+            "premium": {"premium", "written_premium", "annual_premium", "term_premium"},
+            "status": {"status", "policy_status"},
+            "payment_plan": {"payment_plan", "pay_plan", "billing_plan"},
+        },
+        fields={
+            "expiration_date": _parse_date,
+            "premium": parse_amount,
+            "status": _lookup(POLICY_STATUSES, "policy status"),
+            "payment_plan": _lookup(PAYMENT_PLANS, "payment plan"),
+        },
+        required={"policy_number"},
+    ),
+    "billing": DownloadKind(
+        model=Installment,
+        aliases={
+            "policy_number": {"policy_number", "policy_no", "policy", "pol_no"},
+            "due_date": {"due_date", "installment_due_date", "bill_due_date"},
+            "amount": {"amount", "installment_amount", "amount_due", "bill_amount"},
+            "status": {"status", "installment_status", "bill_status"},
+            "paid_date": {"paid_date", "payment_date", "date_paid"},
+        },
+        fields={
+            "amount": parse_amount,
+            "status": _lookup(INSTALLMENT_STATUSES, "installment status"),
+            "paid_date": _parse_date,
+        },
+        required={"policy_number", "due_date"},
+    ),
+}
+
+
+@dataclass
+class DownloadResult:
+    lines: int = 0
+    unchanged: int = 0
+    policies_updated: int = 0
+    installments_updated: int = 0
+    installments_created: int = 0
+    unmatched_count: int = 0
+    unmatched: list = field(default_factory=list)
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_unmatched(self, line: int, policy_number: str, reason: str):
+        self.unmatched_count += 1
+        if len(self.unmatched) < REPORT_LIMIT:
+            self.unmatched.append({"line": line, "policy_number": policy_number, "reason": reason})
+
+    def add_error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < REPORT_LIMIT:
+            self.errors.append({"line": line, "error": message})
+
+
+# ---------- Readers ----------
+
+def iter_csv(stream: BinaryIO, kind: DownloadKind) -> Iterator[tuple[int, dict]]:
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = [normalize_header(h) for h in next(reader, [])]
+    columns = {}
+    for key, aliases in kind.aliases.items():
+        index = next((i for i, name in enumerate(header) if name in aliases), None)
+        if index is not None:
+            columns[key] = index
+    missing = kind.required - columns.keys()
+    if missing:
+        raise ValueError(f"Download is missing column(s): {', '.join(sorted(missing))}")
+    for line_no, row in enumerate(reader, start=2):
+        if any(cell.strip() for cell in row):
+            yield line_no, {key: row[i] if i < len(row) else "" for key, i in columns.items()}
+
+
+def iter_fixed_width(stream: BinaryIO, kind: DownloadKind, layout: dict[str, list[int]]) -> Iterator[tuple[int, dict]]:
+    """layout maps field -> [start, end] (0-based, end exclusive) within each record."""
+    if not isinstance(layout, dict):
+        raise ValueError("Layout must be an object of field -> [start, end]")
+    unknown = layout.keys() - kind.aliases.keys()
+    if unknown:
+        raise ValueError(f"Unknown layout field(s): {', '.join(sorted(unknown))}")
+    missing = kind.required - layout.keys()
+    if missing:
+        raise ValueError(f"Layout is missing field(s): {', '.join(sorted(missing))}")
+    for line_no, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""), start=1):
+        line = line.rstrip("\r\n")
+        if line.strip():
+            yield line_no, {key: line[start:end] for key, (start, end) in layout.items()}
+
+
+# ---------- Hashing ----------
+
+def _canonical(value) -> str:
+    """Text form matching Postgres' ::text for the tracked column types."""
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        return str(value.quantize(Decimal("0.01")))
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def row_hash(values: dict, fields: list[str]) -> str:
+    return hashlib.md5("|".join(_canonical(values.get(f)) for f in fields).encode()).hexdigest()
+
+
+def _sql_hash(source, fields: list[str]):
+    return func.md5(func.concat_ws("|", *[func.coalesce(cast(source.c[f], Text), "") for f in fields]))
+
+
+def _normalized_number(col):
+    """SQL twin of normalize_policy_number; literal arguments so idx_policies_carrier_number_norm applies."""
+    return func.upper(func.regexp_replace(
+        col, literal_column("'[^A-Za-z0-9]'"), literal_column("''"), literal_column("'g'"),
+    ))
+
+
+# ---------- Diff queries ----------
+
+def _incoming(key_column: str, key_type):
+    return func.unnest(
+        bindparam("lines", type_=ARRAY(Integer)),
+        bindparam("numbers", type_=ARRAY(String)),
+        bindparam("keys", type_=ARRAY(key_type)),
+        bindparam("hashes", type_=ARRAY(String)),
+    ).table_valued(
+        column("line", Integer), column("number", String), column(key_column, key_type), column("hash", String),
+    ).render_derived(name="incoming")
+
+
+def policy_diff_query(carrier_id: uuid.UUID, fields: list[str]):
+    """
+    Lines whose policy is missing or differs. A line with an effective date
+    matches that term; without one, the latest term with the policy number.
+    """
+    incoming = _incoming("effective_date", Date)
+    current = (
+        select(Policy.id, *[getattr(Policy, f) for f in fields])
+        .where(and_(
+            Policy.carrier_id == carrier_id,
+            _normalized_number(Policy.policy_number) == incoming.c.number,
+            or_(incoming.c.effective_date.is_(None), Policy.effective_date == incoming.c.effective_date),
+        ))
+        .order_by(Policy.effective_date.desc())
+        .limit(1)
+        .lateral("current")
+    )
+    return (
+        select(incoming.c.line, current)
+        .select_from(incoming.outerjoin(current, true()))
+        .where(or_(current.c.id.is_(None), _sql_hash(current, fields) != incoming.c.hash))
+    )
+
+
+def billing_diff_query(carrier_id: uuid.UUID, fields: list[str]):
+    """Lines whose policy is missing, whose installment is missing, or whose installment differs."""
+    incoming = _incoming("due_date", Date)
+    current = (
+        select(Policy.id.label("policy_id"), Installment.id, *[getattr(Installment, f) for f in fields])
+        .outerjoin(Installment, and_(
+            Installment.policy_id == Policy.id, Installment.due_date == incoming.c.due_date,
+        ))
+        .where(and_(
+            Policy.carrier_id == carrier_id,
+            _normalized_number(Policy.policy_number) == incoming.c.number,
+        ))
+        # Prefer the term that already has this installment, else the latest term
+        .order_by(Installment.id.is_(None), Policy.effective_date.desc())
+        .limit(1)
+        .lateral("current")
+    )
+    return (
+        select(incoming.c.line, current)
+        .select_from(incoming.outerjoin(current, true()))
+        .where(or_(current.c.id.is_(None), _sql_hash(current, fields) != incoming.c.hash))
+    )
+
+
+# ---------- Pipeline ----------
+
+def _changes(line: dict, current, fields: list[str]) -> dict:
+    changes = {}
+    for f in fields:
+        new = line.get(f)
+        old = getattr(current, f)
+        if new is None or new == old:
+            continue
+        if f == "status" and new == "Scheduled" and old == "Reminded":
+            continue  # our own reminder state, not a carrier change
+        changes[f] = (old, new)
+    return changes
+
+
+def _parse_line(kind: DownloadKind, raw: dict, fields: list[str]) -> dict:
+    line = {"policy_number": raw["policy_number"].strip()}
+    for key in ("effective_date", "due_date"):
+        if key in kind.aliases and (raw.get(key) or "").strip():
+            line[key] = _parse_date(raw[key].strip())
+    for f in fields:
+        value = (raw.get(f) or "").strip()
+        line[f] = kind.fields[f](value) if value else None
+    return line
+
+
+async def ingest_download(
+    db: AsyncSession,
+    stream: BinaryIO,
+    carrier_id: uuid.UUID,
+    kind_name: str,
+    filename: str,
+    user_id,
+    layout: Optional[dict] = None,
+    apply: bool = True,
+) -> DownloadResult:
+    kind = KINDS[kind_name]
+    key_column = "effective_date" if kind_name == "policies" else "due_date"
+    rows = iter_fixed_width(stream, kind, layout) if layout else iter_csv(stream, kind)
+    result = DownloadResult()
+    now = datetime.now(timezone.utc)
+    meta = {"source": "carrier_download", "carrier_id": str(carrier_id), "file": filename}
+
+    fields: Optional[list[str]] = None
+    query = None
+    batch: dict[tuple, tuple[int, dict]] = {}
+    change_sets = defaultdict(list)  # policy id -> changes, audited once at the end
+
+    async def flush():
+        lines = list(batch.values())
+        batch.clear()
+        params = {
+            "lines": [n for n, _ in lines],
+            "numbers": [normalize_policy_number(l["policy_number"]) for _, l in lines],
+            "keys": [l.get(key_column) for _, l in lines],
+            "hashes": [row_hash(l, fields) for _, l in lines],
+        }
+        differing = {r.line: r for r in (await db.execute(query, params)).all()}
+        result.unchanged += len(lines) - len(differing)
+
+        updates, inserts = defaultdict(list), []
+        for line_no, line in lines:
+            current = differing.get(line_no)
+            if current is None:
+                continue
+            if kind_name == "policies":
+                if current.id is None:
+                    result.add_unmatched(line_no, line["policy_number"], "No matching policy")
+                    continue
+                changes = _changes(line, current, fields)
+                if changes:
+                    updates[tuple(sorted(changes))].append(
+                        {"id": current.id, "updated_at": now, **{f: new for f, (_, new) in changes.items()}}
+                    )
+                    change_sets[current.id].append({f: [_canonical(o), _canonical(n)] for f, (o, n) in changes.items()})
+                else:
+                    result.unchanged += 1
+                continue
+
+            if current.policy_id is None:
+                result.add_unmatched(line_no, line["policy_number"], "No matching policy")
+            elif current.id is None:
+                if line.get("amount") is None:
+                    result.add_error(line_no, "New installment has no amount")
+                    continue
+                installment_id = uuid.uuid4()
+                inserts.append({
+                    "id": installment_id, "policy_id": current.policy_id, "due_date": line["due_date"],
+                    "amount": line["amount"], "status": line.get("status") or "Scheduled",
+                    "paid_date": line.get("paid_date"),
+                })
+                change_sets[current.policy_id].append(
+                    {"installment_id": str(installment_id), "due_date": line["due_date"].isoformat(), "created": True}
+                )
+            else:
+                changes = _changes(line, current, fields)
+                if changes:
+                    updates[tuple(sorted(changes))].append(
+                        {"id": current.id, "updated_at": now, **{f: new for f, (_, new) in changes.items()}}
+                    )
+                    change_sets[current.policy_id].append({
+                        "installment_id": str(current.id), "due_date": line["due_date"].isoformat(),
+                        **{f: [_canonical(o), _canonical(n)] for f, (o, n) in changes.items()},
+                    })
+                else:
+                    result.unchanged += 1
+
+        updated = sum(len(r) for r in updates.values())
+        if kind_name == "policies":
+            result.policies_updated += updated
+        else:
+            result.installments_updated += updated
+            result.installments_created += len(inserts)
+        if not apply:
+            return
+
+        # Group by changed-field set so each executemany has uniform parameters
+        for rows_ in updates.values():
+            await db.execute(update(kind.model), rows_)
+        if inserts:
+            await db.execute(pg_insert(Installment), inserts)
+
+    for line_no, raw in rows:
+        result.lines += 1
+        if fields is None:
+            fields = [f for f in kind.fields if f in raw]
+            query = (policy_diff_query if kind_name == "policies" else billing_diff_query)(carrier_id, fields)
+        if not raw["policy_number"].strip():
+            result.add_error(line_no, "Missing policy number")
+            continue
+        try:
+            line = _parse_line(kind, raw, fields)
+        except (ValueError, OverflowError, InvalidOperation) as e:
+            result.add_error(line_no, str(e) or "Invalid value")
+            continue
+        if kind_name == "billing" and "due_date" not in line:
+            result.add_error(line_no, "Missing due date")
+            continue
+        # A later line for the same key supersedes an earlier one
+        batch[(normalize_policy_number(line["policy_number"]), line.get(key_column))] = (line_no, line)
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    if apply and kind_name == "policies" and change_sets:
+        mark_summaries_stale(
+            db, select(Policy.account_id).where(Policy.id.in_(list(change_sets)))
+        )
+    if apply:
+        await write_audit_logs_bulk(db, [
+            audit_entry(user_id, "Update", "Policy", policy_id,
+                        "policy" if kind_name == "policies" else "installments",
+                        metadata={**meta, "changes": changes})
+            for policy_id, changes in change_sets.items()
+        ])
+    return result
@@ -0,0 +1,303 @@
+"""
+Expected commission generation and statement reconciliation.
+
+Generation is one INSERT ... SELECT over the policy book: expected_amount is
+premium x the carrier's new business or renewal rate (a policy with a
+prior_policy_id is a renewal), computed by Postgres for the whole set, and
+upserted on uq_commissions_policy_period. Runs are incremental: only policies or
+carriers changed since the previous run's watermark are recomputed. updated_at
+is stamped at transaction start, so the window reaches SINCE_OVERLAP before the
+watermark to catch changes that committed after the previous run read; the
+upsert is idempotent, so re-reading them is harmless. Rows that have already
+been reconciled (status other than Expected) are left alone; Expected rows of
+policies that are no longer Active (cancelled, rewritten, ...) are deleted.
+
+Reconciliation: a carrier statement CSV is read as a stream (one row at a time
+from the upload's spooled file) and matched to expected Commission rows with an
+in-memory hash join: the carrier's expected commissions for a period are loaded once into a
+dict keyed by normalized policy number, and each statement line is a dict probe.
+Lines for the same policy are summed (adjustments, chargebacks). Matched
+commissions are written with one executemany UPDATE and one bulk audit insert.
+"""
+import csv
+import io
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Optional
+
+from sqlalchemy import select, update, and_, or_, func, case, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Commission, Policy, Carrier
+from app.services.audit import audit_bulk, audit_entry, write_audit_logs_bulk
+from app.services.job_state import get_last_run, set_last_run
+
+EXPECTED_JOB = "expected_commissions"
+SINCE_OVERLAP = timedelta(minutes=10)
+
+# ---------- Expected commissions ----------
+
+def commission_period(effective_date_col):
+    """Accounting period of a policy's commission: its effective month, 'YYYY-MM'."""
+    return func.to_char(effective_date_col, "YYYY-MM")
+
+
+async def generate_expected_commissions(db: AsyncSession, period: Optional[str] = None, full: bool = False) -> dict:
+    """
+    Upsert expected commissions for active policies (optionally one period).
+    Without full, only policies/carriers updated since the last run are included.
+    """
+    run_started = (await db.execute(select(func.now()))).scalar()
+    since = None if full else await get_last_run(db, EXPECTED_JOB)
+
+    rate = case(
+        (Policy.prior_policy_id.is_(None), Carrier.new_business_commission_pct),
+        else_=Carrier.renewal_commission_pct,
+    )
+    conditions = [
+        Policy.status == "Active",
+        Policy.premium.is_not(None),
+        rate.is_not(None),
+    ]
+    if period:
+        start = date.fromisoformat(f"{period}-01")
+        end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        conditions += [Policy.effective_date >= start, Policy.effective_date < end]
+    if since is not None:
+        window = since - SINCE_OVERLAP
+        conditions.append(or_(Policy.updated_at > window, Carrier.updated_at > window))
+
+    source = (
+        select(
+            func.uuid_generate_v4(),
+            Policy.id,
+            Policy.carrier_id,
+            func.round(Policy.premium * rate / 100, 2),
+            rate,
+            commission_period(Policy.effective_date),
+            literal_column("'Expected'"),
+            func.now(),
+            func.now(),
+        )
+        .join(Carrier, Carrier.id == Policy.carrier_id)
+        .where(and_(*conditions))
+    )
+    stmt = pg_insert(Commission).from_select(
+        ["id", "policy_id", "carrier_id", "expected_amount", "expected_pct", "period", "status",
+         "created_at", "updated_at"],
+        source,
+        include_defaults=False,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Commission.policy_id, Commission.period],
+        set_={
+            "carrier_id": stmt.excluded.carrier_id,
+            "expected_amount": stmt.excluded.expected_amount,
+            "expected_pct": stmt.excluded.expected_pct,
+            "updated_at": func.now(),
+        },
+        # Reconciled rows keep their figures; unchanged rows are not rewritten
+        where=and_(
+            Commission.status == "Expected",
+            or_(
+                Commission.expected_amount.is_distinct_from(stmt.excluded.expected_amount),
+                Commission.expected_pct.is_distinct_from(stmt.excluded.expected_pct),
+                Commission.carrier_id.is_distinct_from(stmt.excluded.carrier_id),
+            ),
+        ),
+    ).returning(Commission.id, literal_column("xmax = 0").label("inserted"))
+
+    rows = (await db.execute(stmt)).all()
+    created = [r.id for r in rows if r.inserted]
+    updated = [r.id for r in rows if not r.inserted]
+
+    # Policies that left Active no longer earn what was expected
+    lapsed = [Policy.id == Commission.policy_id, Policy.status != "Active"]
+    if since is not None:
+        lapsed.append(Policy.updated_at > since - SINCE_OVERLAP)
+    removed = (await db.execute(
+        Commission.__table__.delete()
+        .where(and_(Commission.status == "Expected", *([Commission.period == period] if period else [])))
+        .where(select(Policy.id).where(*lapsed).exists())
+        .returning(Commission.id)
+    )).scalars().all()
+
+    meta = {"source": EXPECTED_JOB, "period": period}
+    await audit_bulk(db, None, "Create", "Commission", created, meta=meta)
+    await audit_bulk(db, None, "Update", "Commission", updated, meta=meta)
+    await audit_bulk(db, None, "Delete", "Commission", removed, meta=meta)
+
+    if period is None:
+        await set_last_run(db, EXPECTED_JOB, run_started)
+    return {"created": len(created), "updated": len(updated), "removed": len(removed), "since": since}
+
+
+# ---------- Statement reconciliation ----------
+
+# Statement header aliases (after normalize_header) for each field we read
+HEADER_ALIASES = {
+    "policy_number": {"policy_number", "policy_no", "policy", "policy_num", "pol_no", "policy_id"},
+    "amount": {"commission", "commission_amount", "amount", "comm_amount", "commission_paid", "net_commission"},
+    "period": {"period", "statement_period", "accounting_period", "month"},
+}
+
+REPORT_LIMIT = 1000
+
+
+def normalize_header(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.strip().lower().replace("#", "no")).strip("_")
+
+
+def normalize_policy_number(value: Optional[str]) -> str:
+    """Carriers format policy numbers inconsistently; compare on letters and digits only."""
+    return re.sub(r"[^A-Z0-9]", "", (value or "").upper())
+
+
+def parse_amount(value: str) -> Decimal:
+    """Parse '1,234.56', '$1234.56' or accounting negatives like '(12.00)'."""
+    text = value.strip().replace("$", "").replace(",", "")
+    if text.startswith("(") and text.endswith(")"):
+        text = "-" + text[1:-1]
+    return Decimal(text).quantize(Decimal("0.01"))
+
+
+@dataclass
+class ReconcileResult:
+    lines: int = 0
+    matched_lines: int = 0
+    unmatched_count: int = 0
+    unmatched: list = field(default_factory=list)
+    variances: list = field(default_factory=list)
+    missing: list = field(default_factory=list)
+    updated: int = 0
+
+    def add_unmatched(self, line: int, policy_number: str, amount, period, reason: str):
+        self.unmatched_count += 1
+        if len(self.unmatched) < REPORT_LIMIT:
+            self.unmatched.append({
+                "line": line, "policy_number": policy_number, "amount": amount,
+                "period": period, "reason": reason,
+            })
+
+
+def _resolve_columns(header: list[str]) -> dict[str, int]:
+    normalized = [normalize_header(h) for h in header]
+    columns = {}
+    for key, aliases in HEADER_ALIASES.items():
+        for i, name in enumerate(normalized):
+            if name in aliases:
+                columns[key] = i
+                break
+    missing = {"policy_number", "amount"} - columns.keys()
+    if missing:
+        raise ValueError(f"Statement is missing column(s): {', '.join(sorted(missing))}")
+    return columns
+
+
+async def _load_expected(db: AsyncSession, carrier_id: uuid.UUID, period: str) -> dict[str, list]:
+    """Expected commissions for carrier + period, keyed by normalized policy number."""
+    result = await db.execute(
+        select(Commission.id, Commission.expected_amount, Commission.received_amount,
+               Commission.status, Policy.policy_number)
+        .join(Policy, Policy.id == Commission.policy_id)
+        .where(and_(Commission.carrier_id == carrier_id, Commission.period == period))
+    )
+    index = {}
+    for row in result.all():
+        index.setdefault(normalize_policy_number(row.policy_number), []).append(row)
+    return index
+
+
+async def reconcile_statement(
+    db: AsyncSession,
+    stream: BinaryIO,
+    carrier_id: uuid.UUID,
+    period: str,
+    received_date: date,
+    tolerance: Decimal,
+    user_id,
+    apply: bool = True,
+) -> ReconcileResult:
+    """
+    Match a statement to expected commissions. period is the default for lines
+    without a period column. With apply=False nothing is written (preview).
+    """
+    result = ReconcileResult()
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("Statement is empty")
+    columns = _resolve_columns(header)
+
+    expected_by_period: dict[str, dict] = {}
+    received: dict[uuid.UUID, Decimal] = {}
+    commissions: dict[uuid.UUID, tuple] = {}
+
+    for line_no, row in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        result.lines += 1
+        policy_number = row[columns["policy_number"]].strip() if len(row) > columns["policy_number"] else ""
+        line_period = period
+        if "period" in columns and len(row) > columns["period"] and row[columns["period"]].strip():
+            line_period = row[columns["period"]].strip()
+
+        try:
+            amount = parse_amount(row[columns["amount"]])
+        except (IndexError, InvalidOperation):
+            result.add_unmatched(line_no, policy_number, None, line_period, "Invalid amount")
+            continue
+
+        if line_period not in expected_by_period:
+            expected_by_period[line_period] = await _load_expected(db, carrier_id, line_period)
+        candidates = expected_by_period[line_period].get(normalize_policy_number(policy_number))
+        if not candidates:
+            result.add_unmatched(line_no, policy_number, amount, line_period, "No expected commission")
+            continue
+
+        # Several expected rows for one policy/period: the first still-open one takes the line
+        commission = next((c for c in candidates if c.status != "Received"), candidates[0])
+        commissions[commission.id] = (commission, policy_number, line_period)
+        received[commission.id] = received.get(commission.id, Decimal("0")) + amount
+        result.matched_lines += 1
+
+    updates, audits = [], []
+    for commission_id, amount in received.items():
+        commission, policy_number, line_period = commissions[commission_id]
+        expected = commission.expected_amount or Decimal("0")
+        variance = amount - expected
+        status = "Received" if abs(variance) <= tolerance else "Discrepancy"
+        if status == "Discrepancy" and len(result.variances) < REPORT_LIMIT:
+            result.variances.append({
+                "commission_id": commission_id, "policy_number": policy_number, "period": line_period,
+                "expected_amount": expected, "received_amount": amount, "variance": variance,
+            })
+        updates.append({
+            "id": commission_id, "received_amount": amount,
+            "received_date": received_date, "status": status,
+        })
+        audits.append(audit_entry(
+            user_id, "Update", "Commission", commission_id, "received_amount",
+            commission.received_amount, amount,
+            metadata={"source": "commission_statement", "status": status},
+        ))
+
+    matched_ids = set(received)
+    for line_period, index in expected_by_period.items():
+        for rows in index.values():
+            for c in rows:
+                if c.id not in matched_ids and c.status == "Expected" and len(result.missing) < REPORT_LIMIT:
+                    result.missing.append({
+                        "commission_id": c.id, "policy_number": c.policy_number,
+                        "period": line_period, "expected_amount": c.expected_amount,
+                    })
+
+    if apply and updates:
+        await db.execute(update(Commission), updates)
+        await write_audit_logs_bulk(db, audits)
+        result.updated = len(updates)
+    return result
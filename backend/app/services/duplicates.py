@@ -0,0 +1,280 @@
+"""
+Fuzzy duplicate detection for accounts, contacts and prospects.
+
+Records are never compared all-pairs. Candidates come from blocking keys, each
+backed by an index:
+  - phone: last 10 digits (idx_*_phone_digits, contacts also match mobile)
+  - email: lower(email) (idx_*_email_lower)
+  - name sound: zip + soundex of the name (idx_*_zip_soundex; contacts, which
+    have no address, use soundex(last name) + first initial)
+  - name text: the trigram % operator (idx_*_name_trgm), on-create check only
+Every candidate pair is then scored by one SQL expression evaluated for the whole
+candidate set (trigram similarity of the names plus phone/email/zip agreement).
+
+check_duplicates() probes one record's values (before or after it is saved);
+scan_duplicates() runs over a whole table as a single INSERT ... SELECT: blocking
+keys are unioned, blocks larger than DUPLICATE_MAX_BLOCK are skipped, pairs are
+scored and upserted into duplicate_candidates. Dismissed pairs stay dismissed.
+"""
+import re
+import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from sqlalchemy import (
+    select, delete, and_, or_, func, case, cast, literal, literal_column, union_all, Numeric, String, Text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert, array, ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.models.models import Account, Contact, Prospect, DuplicateCandidate
+
+CHECK_LIMIT = 10
+
+
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"[^0-9]", "", value or "")[-10:]
+    return digits or None
+
+
+def phone_digits(col):
+    """SQL twin of normalize_phone; literal arguments so the idx_*_phone_digits indexes apply."""
+    return func.nullif(
+        func.right(
+            func.regexp_replace(col, literal_column("'[^0-9]'"), literal_column("''"), literal_column("'g'")),
+            literal_column("10"),
+        ),
+        literal_column("''"),
+    )
+
+
+def _person_name(row):
+    # Same expression as the idx_*_name_trgm indexes
+    return row.first_name.op("||")(literal_column("' '")).op("||")(row.last_name)
+
+
+@dataclass
+class DuplicateSpec:
+    """Column expressions per entity; each takes the model (or an alias, or a probe of literals)."""
+    model: type
+    name: Callable
+    phones: Callable
+    block: Callable
+    has_zip: bool
+
+
+SPECS = {
+    "Account": DuplicateSpec(
+        model=Account,
+        name=lambda r: r.name,
+        phones=lambda r: [phone_digits(r.phone)],
+        block=lambda r: (r.zip_code, func.soundex(r.name)),
+        has_zip=True,
+    ),
+    "Contact": DuplicateSpec(
+        model=Contact,
+        name=_person_name,
+        phones=lambda r: [phone_digits(r.phone), phone_digits(r.mobile_phone)],
+        block=lambda r: (func.soundex(r.last_name), func.lower(func.left(r.first_name, literal_column("1")))),
+        has_zip=False,
+    ),
+    "Prospect": DuplicateSpec(
+        model=Prospect,
+        name=_person_name,
+        phones=lambda r: [phone_digits(r.phone)],
+        block=lambda r: (r.zip_code, func.soundex(r.last_name)),
+        has_zip=True,
+    ),
+}
+
+PROBE_FIELDS = ("name", "first_name", "last_name", "email", "phone", "mobile_phone", "zip_code")
+
+
+def _score(spec: DuplicateSpec, a, b):
+    """
+    (score, reasons) for rows a and b: name similarity 0.5, email 0.3, phone 0.3,
+    zip 0.25, capped at 1. A (near-)exact name at the same zip clears the default
+    DUPLICATE_MIN_SCORE on its own, as does a shared email or phone with a
+    similar name; a name alone does not.
+    """
+    phone_match = or_(*[pa == pb for pa in spec.phones(a) for pb in spec.phones(b)])
+    email_match = func.lower(a.email) == func.lower(b.email)
+    zip_match = a.zip_code == b.zip_code if spec.has_zip else literal(False)
+    name_similarity = func.similarity(spec.name(a), spec.name(b))
+
+    def flag(condition, weight):
+        return case((condition, weight), else_=0)
+
+    score = func.least(
+        1,
+        name_similarity * 0.5 + flag(email_match, 0.3) + flag(phone_match, 0.3) + flag(zip_match, 0.25),
+    )
+    reasons = func.array_remove(array([
+        case((name_similarity >= 0.6, "name")),
+        case((phone_match, "phone")),
+        case((email_match, "email")),
+        case((zip_match, "zip")),
+    ]), None)
+    return cast(score, Numeric(4, 3)), reasons
+
+
+def _probe(entity_type: str, values: dict):
+    """Literal stand-in for a row, so the spec expressions can be evaluated for unsaved values."""
+    row = {f: literal(values.get(f), String) for f in PROBE_FIELDS}
+    if entity_type != "Account" and not values.get("name"):
+        row["name"] = literal(f"{values.get('first_name') or ''} {values.get('last_name') or ''}".strip(), String)
+    return SimpleNamespace(**row)
+
+
+# ---------- On-create check ----------
+
+async def check_duplicates(
+    db: AsyncSession,
+    entity_type: str,
+    values: dict,
+    exclude_id: Optional[uuid.UUID] = None,
+    min_score: Optional[float] = None,
+    limit: int = CHECK_LIMIT,
+) -> list:
+    """Likely duplicates of a record with `values`, best first. Every probe is an index lookup."""
+    spec = SPECS[entity_type]
+    m = spec.model
+    probe = _probe(entity_type, values)
+
+    blocking = []
+    phones = {normalize_phone(values.get(f)) for f in ("phone", "mobile_phone")} - {None}
+    if phones:
+        blocking += [col.in_(phones) for col in spec.phones(m)]
+    if values.get("email"):
+        blocking.append(func.lower(m.email) == values["email"].strip().lower())
+    if (values.get("last_name") or values.get("name")) and (values.get("zip_code") or not spec.has_zip):
+        blocking.append(and_(*[col == value for col, value in zip(spec.block(m), spec.block(probe))]))
+    name_value = values.get("name") or f"{values.get('first_name') or ''} {values.get('last_name') or ''}".strip()
+    if name_value:
+        blocking.append(spec.name(m).op("%")(name_value))
+    if not blocking:
+        return []
+
+    score, reasons = _score(spec, m, probe)
+    query = (
+        select(m.id, spec.name(m).label("name"), m.email, m.phone, score.label("score"), reasons.label("reasons"))
+        .where(or_(*blocking))
+        .where(score >= (min_score if min_score is not None else settings.DUPLICATE_MIN_SCORE))
+        .order_by(score.desc())
+        .limit(limit)
+    )
+    if exclude_id is not None:
+        query = query.where(m.id != exclude_id)
+    return (await db.execute(query)).all()
+
+
+async def flag_duplicates(db: AsyncSession, entity_type: str, entity) -> int:
+    """Record open candidate pairs for a just-saved record; returns how many were found."""
+    values = {f: getattr(entity, f, None) for f in PROBE_FIELDS}
+    matches = await check_duplicates(db, entity_type, values, exclude_id=entity.id)
+    if not matches:
+        return 0
+    rows = []
+    for match in matches:
+        a, b = sorted([entity.id, match.id])
+        rows.append({
+            "id": uuid.uuid4(), "entity_type": entity_type, "entity_a_id": a, "entity_b_id": b,
+            "score": match.score, "reasons": list(match.reasons),
+        })
+    await db.execute(pg_insert(DuplicateCandidate).values(rows).on_conflict_do_nothing())
+    return len(rows)
+
+
+# ---------- Batch scan ----------
+
+def _keyed(spec: DuplicateSpec):
+    """(id, key) for every blocking key of every row, prefixed by key kind."""
+    m = spec.model
+    selects = [
+        select(m.id, (literal_column("'p:'", String) + phone).label("key")).where(phone.is_not(None))
+        for phone in spec.phones(m)
+    ]
+    selects.append(
+        select(m.id, (literal_column("'e:'", String) + func.lower(m.email)).label("key"))
+        .where(func.nullif(m.email, literal_column("''")).is_not(None))
+    )
+    block = spec.block(m)
+    selects.append(
+        select(m.id, func.concat_ws(literal_column("':'"), literal_column("'s'"), *block).label("key"))
+        .where(and_(*[col.is_not(None) for col in block]))
+    )
+    return union_all(*selects).cte("keyed")
+
+
+def scan_statement(entity_type: str, min_score: float, max_block: int):
+    spec = SPECS[entity_type]
+    keyed = _keyed(spec)
+    blocks = (
+        select(keyed.c.key)
+        .group_by(keyed.c.key)
+        .having(func.count().between(2, max_block))
+        .cte("blocks")
+    )
+    k1, k2 = keyed.alias("k1"), keyed.alias("k2")
+    pairs = (
+        select(k1.c.id.label("a_id"), k2.c.id.label("b_id"))
+        .join(k2, and_(k2.c.key == k1.c.key, k1.c.id < k2.c.id))
+        .where(k1.c.key.in_(select(blocks.c.key)))
+        .distinct()
+        .cte("pairs")
+    )
+    a, b = aliased(spec.model, name="a"), aliased(spec.model, name="b")
+    score, reasons = _score(spec, a, b)
+    scored = (
+        select(pairs.c.a_id, pairs.c.b_id, score.label("score"), reasons.label("reasons"))
+        .join(a, a.id == pairs.c.a_id)
+        .join(b, b.id == pairs.c.b_id)
+        .subquery("scored")
+    )
+    source = select(
+        func.uuid_generate_v4(),
+        literal(entity_type, String),
+        scored.c.a_id,
+        scored.c.b_id,
+        scored.c.score,
+        cast(scored.c.reasons, ARRAY(Text)),
+        literal_column("'Open'"),
+        func.now(),
+    ).where(scored.c.score >= min_score)
+
+    stmt = pg_insert(DuplicateCandidate).from_select(
+        ["id", "entity_type", "entity_a_id", "entity_b_id", "score", "reasons", "status", "detected_at"],
+        source,
+        include_defaults=False,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DuplicateCandidate.entity_type, DuplicateCandidate.entity_a_id, DuplicateCandidate.entity_b_id],
+        set_={"score": stmt.excluded.score, "reasons": stmt.excluded.reasons, "detected_at": stmt.excluded.detected_at},
+        where=DuplicateCandidate.status == "Open",
+    ).returning(DuplicateCandidate.id)
+
+
+async def scan_duplicates(db: AsyncSession, entity_type: str) -> dict:
+    """Rescan one table. Open pairs that no longer match (records edited or deleted) are cleared."""
+    started = (await db.execute(select(func.now()))).scalar()
+    found = (await db.execute(
+        scan_statement(entity_type, settings.DUPLICATE_MIN_SCORE, settings.DUPLICATE_MAX_BLOCK)
+    )).scalars().all()
+    cleared = (await db.execute(
+        delete(DuplicateCandidate)
+        .where(and_(
+            DuplicateCandidate.entity_type == entity_type,
+            DuplicateCandidate.status == "Open",
+            DuplicateCandidate.detected_at < started,
+        ))
+        .returning(DuplicateCandidate.id)
+    )).scalars().all()
+    return {"found": len(found), "cleared": len(cleared)}
+
+
+async def run_duplicate_scan(db: AsyncSession) -> dict:
+    """Batch scan of accounts, contacts and prospects."""
+    return {entity_type.lower(): await scan_duplicates(db, entity_type) for entity_type in SPECS}
@@ -0,0 +1,131 @@
+"""
+Transactional email outbox.
+
+queue_emails() inserts messages into email_outbox in the caller's transaction,
+so they exist only if that transaction commits. run_email_outbox() sends them:
+
+  1. claim a batch of Pending rows (FOR UPDATE SKIP LOCKED, so workers never
+     share a row) by moving them to Sending, and commit the claim,
+  2. hand them to the mailer,
+  3. mark accepted rows Sent (and stamp sent_at on their communication logs);
+     rejected rows go back to Pending until MAX_ATTEMPTS, then Failed.
+
+A row is never sent twice: if the process dies after the claim commits, or the
+transport fails part way through a batch, whether the message went out is
+unknown, so the row stays Sending and is marked Failed once STALE_AFTER has
+passed instead of being retried.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update, and_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import commit
+from app.models.models import EmailOutbox, CommunicationLog
+from app.services.account_summaries import comm_log_accounts, mark_summaries_stale
+from app.services.mailer import EmailMessage, send_emails
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(hours=1)
+
+
+async def queue_emails(
+    db: AsyncSession,
+    messages: Iterable[EmailMessage],
+    comm_log_ids: Optional[Iterable[Optional[uuid.UUID]]] = None,
+    source: Optional[str] = None,
+) -> int:
+    """Queue messages for delivery after commit; comm_log_ids pairs each with its log row."""
+    messages = list(messages)
+    log_ids = list(comm_log_ids) if comm_log_ids is not None else [None] * len(messages)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "to_address": m.to,
+            "subject": m.subject[:500],
+            "body": m.body,
+            "body_html": m.html,
+            "comm_log_id": log_id,
+            "source": source,
+        }
+        for m, log_id in zip(messages, log_ids)
+    ]
+    if rows:
+        await db.execute(pg_insert(EmailOutbox), rows)
+    return len(rows)
+
+
+async def run_email_outbox(db: AsyncSession) -> dict:
+    """Batch job: send queued email. Commits the claim before anything is sent."""
+    now = datetime.now(timezone.utc)
+
+    stale = (await db.execute(
+        update(EmailOutbox)
+        .where(and_(EmailOutbox.status == "Sending", EmailOutbox.claimed_at < now - STALE_AFTER))
+        .values(status="Failed", last_error="Interrupted while sending; delivery unknown")
+        .returning(EmailOutbox.id)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+    batch = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status == "Pending")
+        .order_by(EmailOutbox.created_at)
+        .limit(BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = (await db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(batch.scalar_subquery()))
+        .values(status="Sending", claimed_at=now, attempts=EmailOutbox.attempts + 1)
+        .returning(
+            EmailOutbox.id, EmailOutbox.to_address, EmailOutbox.subject, EmailOutbox.body,
+            EmailOutbox.body_html, EmailOutbox.comm_log_id, EmailOutbox.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )).all()
+    await commit(db)
+    if not claimed:
+        return {"sent": 0, "retrying": 0, "failed": 0, "stale": len(stale)}
+
+    errors = await send_emails([
+        EmailMessage(to=r.to_address, subject=r.subject, body=r.body, html=r.body_html) for r in claimed
+    ])
+    sent_at = datetime.now(timezone.utc)
+    sent = [r for r, error in zip(claimed, errors) if error is None]
+    rejected = [(r, error) for r, error in zip(claimed, errors) if error is not None]
+
+    if sent:
+        await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_([r.id for r in sent]))
+            .values(status="Sent", sent_at=sent_at, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        log_ids = [r.comm_log_id for r in sent if r.comm_log_id]
+        if log_ids:
+            logs = (await db.execute(
+                update(CommunicationLog)
+                .where(CommunicationLog.id.in_(log_ids))
+                .values(sent_at=sent_at)
+                .returning(CommunicationLog.linked_entity_type, CommunicationLog.linked_entity_id)
+                .execution_options(synchronize_session=False)
+            )).all()
+            # last_contact_at follows sent_at
+            mark_summaries_stale(db, comm_log_accounts(row._asdict() for row in logs))
+    for r, error in rejected:
+        await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == r.id)
+            .values(
+                status=case((EmailOutbox.attempts >= MAX_ATTEMPTS, "Failed"), else_="Pending"),
+                last_error=error,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    failed = sum(1 for r, _ in rejected if r.attempts >= MAX_ATTEMPTS)
+    return {"sent": len(sent), "retrying": len(rejected) - failed, "failed": failed, "stale": len(stale)}
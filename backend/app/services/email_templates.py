@@ -0,0 +1,43 @@
+"""
+Email template rendering: {{merge_field}} substitution for EmailTemplate subject/body.
+"""
+import re
+import uuid
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import EmailTemplate
+
+MERGE_FIELD = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def agency_context() -> dict:
+    """Merge fields available to every template."""
+    return {
+        "agency_name": settings.AGENCY_NAME,
+        "agency_phone": settings.AGENCY_PHONE,
+        "agency_email": settings.AGENCY_EMAIL,
+        "google_review_url": settings.GOOGLE_REVIEW_URL or "",
+        "allstate_review_url": settings.ALLSTATE_REVIEW_URL or "",
+    }
+
+
+def render(text: str, context: dict) -> str:
+    """Replace {{field}} with context values; unknown fields render empty."""
+    if not text:
+        return text
+    return MERGE_FIELD.sub(lambda m: str(context.get(m.group(1)) or ""), text)
+
+
+async def load_templates(db: AsyncSession, template_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, EmailTemplate]:
+    """Fetch several active templates in one query, keyed by id."""
+    ids = {t for t in template_ids if t}
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(EmailTemplate).where(EmailTemplate.id.in_(ids), EmailTemplate.is_active.is_(True))
+    )
+    return {t.id: t for t in result.scalars().all()}
@@ -0,0 +1,126 @@
+"""
+Polymorphic entity resolver.
+
+Tasks, notes, communication logs, documents and reminders point at records with
+linked_entity_type + linked_entity_id. resolve_entities() turns any number of
+those (type, id) pairs into display names and UI links: the pairs are grouped by
+type and each group is loaded with one `WHERE id = ANY(:ids)` query, so a list
+page costs one query per entity type instead of one request per row.
+
+ids_condition() is the same single-parameter ANY filter, used by the ?ids=
+batch-fetch variants of the account, policy and prospect list routes.
+"""
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from sqlalchemy import select, func, any_, bindparam, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import User, Account, Contact, Policy, Prospect
+
+MAX_IDS = 100
+
+
+def ids_condition(column, ids: list[uuid.UUID]):
+    """column = ANY(:ids), one array parameter however many ids are given."""
+    return column == any_(bindparam(f"{column.key}_ids", ids, type_=ARRAY(UUID(as_uuid=True))))
+
+
+def parse_ids(value: str, limit: int = MAX_IDS) -> list[uuid.UUID]:
+    """Comma-separated ids from a query string. Raises ValueError on bad input."""
+    ids = list(dict.fromkeys(uuid.UUID(part.strip()) for part in value.split(",") if part.strip()))
+    if not ids:
+        raise ValueError("ids is empty")
+    if len(ids) > limit:
+        raise ValueError(f"At most {limit} ids per request")
+    return ids
+
+
+@dataclass
+class EntitySpec:
+    model: type
+    name: Callable
+    subtitle: Callable
+    link: Callable  # row -> UI path
+    join_account: bool = False
+    # Producers only resolve records whose producer column is theirs
+    producer: Callable = lambda m: Account.assigned_producer_id
+
+
+def _person_name(m):
+    return m.first_name.op("||")(literal_column("' '")).op("||")(m.last_name)
+
+
+ENTITY_SPECS = {
+    "Account": EntitySpec(
+        model=Account,
+        name=lambda m: m.name,
+        subtitle=lambda m: m.type,
+        link=lambda row: f"/accounts/{row.id}",
+    ),
+    "Contact": EntitySpec(
+        model=Contact,
+        name=_person_name,
+        subtitle=lambda m: Account.name,
+        link=lambda row: f"/accounts/{row.account_id}",
+        join_account=True,
+    ),
+    "Policy": EntitySpec(
+        model=Policy,
+        name=lambda m: func.concat_ws(literal_column("' '"), m.line_of_business, m.policy_number),
+        subtitle=lambda m: Account.name,
+        link=lambda row: f"/policies/{row.id}",
+        join_account=True,
+    ),
+    "Prospect": EntitySpec(
+        model=Prospect,
+        name=lambda m: func.coalesce(func.nullif(m.business_name, literal_column("''")), _person_name(m)),
+        subtitle=lambda m: m.pipeline_stage,
+        link=lambda row: f"/prospects/{row.id}",
+        producer=lambda m: m.assigned_producer_id,
+    ),
+}
+
+
+async def resolve_entities(
+    db: AsyncSession,
+    refs: Iterable[tuple[str, uuid.UUID]],
+    current_user: User,
+) -> dict[tuple[str, uuid.UUID], dict]:
+    """
+    {(type, id): {type, id, name, subtitle, link}} for every ref that exists and
+    the user may see. Unknown types and missing records are simply absent.
+    """
+    by_type = defaultdict(set)
+    for entity_type, entity_id in refs:
+        if entity_type in ENTITY_SPECS and entity_id is not None:
+            by_type[entity_type].add(entity_id)
+
+    resolved = {}
+    for entity_type, ids in by_type.items():
+        spec = ENTITY_SPECS[entity_type]
+        m = spec.model
+        query = select(
+            m.id,
+            spec.name(m).label("name"),
+            spec.subtitle(m).label("subtitle"),
+            *([m.account_id] if spec.join_account else []),
+        ).where(ids_condition(m.id, list(ids)))
+        if spec.join_account:
+            query = query.join(Account, Account.id == m.account_id)
+        # Same rules as the account and prospect routes: Producers only see their
+        # assigned accounts (and those accounts' contacts and policies) and prospects
+        if current_user.role == "Producer":
+            query = query.where(spec.producer(m) == current_user.id)
+        for row in (await db.execute(query)).all():
+            resolved[(entity_type, row.id)] = {
+                "type": entity_type,
+                "id": row.id,
+                "name": row.name,
+                "subtitle": row.subtitle,
+                "link": spec.link(row),
+            }
+    return resolved
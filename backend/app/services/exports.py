@@ -0,0 +1,213 @@
+"""
+Columnar (Parquet) export of sales, policies and commissions for analysts.
+
+Each export is one SELECT of the table plus its joined names (account, carrier,
+producer / owner, policy number), read through a server-side cursor
+(AsyncSession.stream with yield_per) and written BATCH_SIZE rows at a time as
+Arrow record batches into a Parquet file, so memory stays at one batch however
+large the table is.
+
+Filters: a date range on the record's business date, and an incremental
+`since` on its change timestamp (updated_at; created_at for the insert-only
+sales log). Rows are ordered by that timestamp and write_parquet() returns the
+latest one seen, which the caller can pass as the next `since`.
+
+Change timestamps are taken at transaction start, so a row can commit after a
+later-stamped one has already been exported. `since` therefore re-reads
+SINCE_OVERLAP before the watermark: incremental exports overlap and consumers
+dedup on id (keeping the latest change timestamp). Transactions that stay open
+longer than the overlap can still be missed; periodic full exports cover them.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import BinaryIO, Callable, Optional
+
+from sqlalchemy import select, Select, Numeric, Float, Date, DateTime, Integer, Boolean
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.models import User, Account, Carrier, Policy, SalesLogEntry, Commission
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+BATCH_SIZE = 10_000
+SINCE_OVERLAP = timedelta(minutes=10)
+
+
+class ExportError(RuntimeError):
+    pass
+
+
+@dataclass
+class ExportSpec:
+    query: Callable[[], Select]
+    date_column: object  # business date the date range applies to
+    since_column: object  # change timestamp for incremental exports
+
+
+def _sales_query() -> Select:
+    producer = aliased(User)
+    return (
+        select(
+            SalesLogEntry.id,
+            SalesLogEntry.date,
+            SalesLogEntry.account_id,
+            Account.name.label("account_name"),
+            SalesLogEntry.policy_id,
+            Policy.policy_number,
+            SalesLogEntry.line_of_business,
+            SalesLogEntry.premium,
+            SalesLogEntry.carrier_id,
+            Carrier.name.label("carrier_name"),
+            SalesLogEntry.producer_id,
+            producer.name.label("producer_name"),
+            SalesLogEntry.source,
+            SalesLogEntry.source_detail,
+            SalesLogEntry.zip_code,
+            SalesLogEntry.county,
+            SalesLogEntry.sale_type,
+            SalesLogEntry.created_at,
+        )
+        .join(Account, Account.id == SalesLogEntry.account_id)
+        .outerjoin(Policy, Policy.id == SalesLogEntry.policy_id)
+        .outerjoin(Carrier, Carrier.id == SalesLogEntry.carrier_id)
+        .outerjoin(producer, producer.id == SalesLogEntry.producer_id)
+    )
+
+
+def _policies_query() -> Select:
+    agent = aliased(User)
+    owner = aliased(User)
+    return (
+        select(
+            Policy.id,
+            Policy.policy_number,
+            Policy.account_id,
+            Account.name.label("account_name"),
+            Account.type.label("account_type"),
+            Account.county,
+            Policy.carrier_id,
+            Carrier.name.label("carrier_name"),
+            Policy.line_of_business,
+            Policy.effective_date,
+            Policy.expiration_date,
+            Policy.premium,
+            Policy.payment_plan,
+            Policy.status,
+            Policy.renewal_status,
+            Policy.producing_agent_id,
+            agent.name.label("producing_agent_name"),
+            Policy.servicing_owner_id,
+            owner.name.label("servicing_owner_name"),
+            Policy.prior_policy_id,
+            Policy.created_at,
+            Policy.updated_at,
+        )
+        .join(Account, Account.id == Policy.account_id)
+        .outerjoin(Carrier, Carrier.id == Policy.carrier_id)
+        .outerjoin(agent, agent.id == Policy.producing_agent_id)
+        .outerjoin(owner, owner.id == Policy.servicing_owner_id)
+    )
+
+
+def _commissions_query() -> Select:
+    return (
+        select(
+            Commission.id,
+            Commission.policy_id,
+            Policy.policy_number,
+            Policy.line_of_business,
+            Policy.account_id,
+            Account.name.label("account_name"),
+            Commission.carrier_id,
+            Carrier.name.label("carrier_name"),
+            Commission.period,
+            Commission.status,
+            Commission.expected_pct,
+            Commission.expected_amount,
+            Commission.received_amount,
+            Commission.received_date,
+            Commission.created_at,
+            Commission.updated_at,
+        )
+        .join(Policy, Policy.id == Commission.policy_id)
+        .join(Account, Account.id == Policy.account_id)
+        .outerjoin(Carrier, Carrier.id == Commission.carrier_id)
+    )
+
+
+EXPORTS = {
+    "sales": ExportSpec(_sales_query, SalesLogEntry.date, SalesLogEntry.created_at),
+    "policies": ExportSpec(_policies_query, Policy.effective_date, Policy.updated_at),
+    "commissions": ExportSpec(_commissions_query, Commission.received_date, Commission.updated_at),
+}
+
+
+def _arrow_type(sa_type):
+    if isinstance(sa_type, UUID):
+        return pa.string()
+    if isinstance(sa_type, Numeric) and not isinstance(sa_type, Float):
+        return pa.decimal128(sa_type.precision or 38, sa_type.scale or 0)
+    if isinstance(sa_type, DateTime):
+        return pa.timestamp("us", tz="UTC" if sa_type.timezone else None)
+    if isinstance(sa_type, Date):
+        return pa.date32()
+    if isinstance(sa_type, Integer):
+        return pa.int64()
+    if isinstance(sa_type, Boolean):
+        return pa.bool_()
+    return pa.string()
+
+
+def export_query(
+    kind: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    since: Optional[datetime] = None,
+) -> Select:
+    spec = EXPORTS[kind]
+    query = spec.query()
+    if date_from:
+        query = query.where(spec.date_column >= date_from)
+    if date_to:
+        query = query.where(spec.date_column <= date_to)
+    if since:
+        query = query.where(spec.since_column >= since - SINCE_OVERLAP)
+    return query.order_by(spec.since_column, query.selected_columns.id)
+
+
+async def write_parquet(
+    db: AsyncSession,
+    kind: str,
+    sink: BinaryIO,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    since: Optional[datetime] = None,
+) -> dict:
+    """Write the export to `sink` as Parquet. Returns {rows, watermark}."""
+    if pa is None:
+        raise ExportError("Parquet export requires pyarrow")
+    query = export_query(kind, date_from, date_to, since)
+    columns = list(query.selected_columns)
+    schema = pa.schema([(c.key, _arrow_type(c.type)) for c in columns])
+    uuid_columns = {c.key for c in columns if isinstance(c.type, UUID)}
+    since_key = EXPORTS[kind].since_column.key
+
+    rows = 0
+    watermark = None
+    result = await db.stream(query.execution_options(yield_per=BATCH_SIZE))
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        async for partition in result.partitions():
+            data = {c.key: [] for c in columns}
+            for row in partition:
+                for key, value in row._mapping.items():
+                    data[key].append(str(value) if key in uuid_columns and value is not None else value)
+            writer.write_batch(pa.RecordBatch.from_pydict(data, schema=schema))
+            rows += len(partition)
+            watermark = partition[-1]._mapping[since_key] or watermark
+    return {"rows": rows, "watermark": watermark}
@@ -0,0 +1,155 @@
+"""
+Shared list filters. The list endpoints and the bulk operations build their
+WHERE clauses here so a saved filter selects exactly what the list page shows.
+"""
+from sqlalchemy import select, or_, exists, and_
+
+from app.models.models import (
+    User, Account, AccountSummary, Prospect, Task, ServiceItem, Tag, account_tags, prospect_tags,
+)
+from app.schemas.schemas import AccountFilter, ProspectFilter, ServiceItemFilter, TaskFilter
+
+
+def account_conditions(f: AccountFilter, current_user: User) -> list:
+    conditions = []
+    if f.search:
+        conditions.append(
+            or_(
+                Account.name.ilike(f"%{f.search}%"),
+                Account.email.ilike(f"%{f.search}%"),
+                Account.phone.ilike(f"%{f.search}%"),
+            )
+        )
+    if f.type:
+        conditions.append(Account.type == f.type)
+    if f.status:
+        conditions.append(Account.status == f.status)
+    if f.zip_code:
+        conditions.append(Account.zip_code == f.zip_code)
+    if f.county:
+        conditions.append(Account.county.ilike(f"%{f.county}%"))
+    if f.tags:
+        conditions.append(
+            exists().where(
+                and_(
+                    account_tags.c.account_id == Account.id,
+                    account_tags.c.tag_id == Tag.id,
+                    Tag.name.in_(f.tags),
+                )
+            )
+        )
+
+    summary = summary_conditions(f)
+    if summary:
+        conditions.append(Account.id.in_(select(AccountSummary.account_id).where(*summary)))
+
+    # Role-based filtering: Producers see only assigned accounts
+    if current_user.role == "Producer":
+        conditions.append(Account.assigned_producer_id == current_user.id)
+    return conditions
+
+
+def summary_conditions(f: AccountFilter) -> list:
+    """Rollup filters, each served by an idx_account_summaries_* index."""
+    s = AccountSummary
+    conditions = []
+    if f.min_policies is not None:
+        conditions.append(s.policy_count >= f.min_policies)
+    if f.max_policies is not None:
+        conditions.append(s.policy_count <= f.max_policies)
+    if f.min_premium is not None:
+        conditions.append(s.active_premium >= f.min_premium)
+    if f.max_premium is not None:
+        conditions.append(s.active_premium <= f.max_premium)
+    if f.min_written_premium is not None:
+        conditions.append(s.written_premium >= f.min_written_premium)
+    if f.has_open_service_items is not None:
+        conditions.append(s.open_service_items > 0 if f.has_open_service_items else s.open_service_items == 0)
+    if f.last_contact_before is not None:
+        conditions.append(s.last_contact_at < f.last_contact_before)
+    if f.last_contact_after is not None:
+        conditions.append(s.last_contact_at >= f.last_contact_after)
+    return conditions
+
+
+def prospect_conditions(f: ProspectFilter, current_user: User) -> list:
+    conditions = []
+    if f.pipeline_stage:
+        conditions.append(Prospect.pipeline_stage == f.pipeline_stage)
+    if f.source:
+        conditions.append(Prospect.source == f.source)
+    if f.assigned_producer_id:
+        conditions.append(Prospect.assigned_producer_id == f.assigned_producer_id)
+    if f.search:
+        conditions.append(
+            or_(
+                (Prospect.first_name + " " + Prospect.last_name).ilike(f"%{f.search}%"),
+                Prospect.business_name.ilike(f"%{f.search}%"),
+                Prospect.email.ilike(f"%{f.search}%"),
+            )
+        )
+    if f.tags:
+        conditions.append(
+            exists().where(
+                and_(
+                    prospect_tags.c.prospect_id == Prospect.id,
+                    prospect_tags.c.tag_id == Tag.id,
+                    Tag.name.in_(f.tags),
+                )
+            )
+        )
+
+    # Producer sees only their own prospects
+    if current_user.role == "Producer":
+        conditions.append(Prospect.assigned_producer_id == current_user.id)
+    return conditions
+
+
+def service_item_conditions(f: ServiceItemFilter) -> list:
+    conditions = []
+    if f.type:
+        conditions.append(ServiceItem.type == f.type)
+    if f.status:
+        conditions.append(ServiceItem.status == f.status)
+    else:
+        # Default: exclude completed/closed
+        conditions.append(ServiceItem.status.notin_(["Completed", "Closed"]))
+    if f.urgency:
+        conditions.append(ServiceItem.urgency == f.urgency)
+    if f.assigned_to:
+        conditions.append(ServiceItem.assigned_to == f.assigned_to)
+    if f.due_before:
+        conditions.append(ServiceItem.due_date <= f.due_before)
+    if f.due_after:
+        conditions.append(ServiceItem.due_date >= f.due_after)
+    if f.account_id:
+        conditions.append(ServiceItem.account_id == f.account_id)
+    if f.policy_id:
+        conditions.append(ServiceItem.policy_id == f.policy_id)
+    if f.search:
+        conditions.append(
+            or_(
+                ServiceItem.account_id.in_(select(Account.id).where(Account.name.ilike(f"%{f.search}%"))),
+                ServiceItem.description.ilike(f"%{f.search}%"),
+            )
+        )
+    return conditions
+
+
+def task_conditions(f: TaskFilter) -> list:
+    conditions = []
+    if f.assigned_to:
+        conditions.append(Task.assigned_to == f.assigned_to)
+    if f.status:
+        conditions.append(Task.status == f.status)
+    else:
+        conditions.append(Task.status.in_(["Open", "In Progress"]))
+    if f.priority:
+        conditions.append(Task.priority == f.priority)
+    if f.due_before:
+        conditions.append(Task.due_date <= f.due_before)
+    if f.linked_entity_type and f.linked_entity_id:
+        conditions.append(
+            and_(Task.linked_entity_type == f.linked_entity_type, Task.linked_entity_id == f.linked_entity_id)
+        )
+    return conditions
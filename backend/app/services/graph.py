@@ -0,0 +1,251 @@
+"""
+Process-wide Microsoft Graph client (app-only auth).
+
+One GraphClient per process holds:
+  - a pooled httpx.AsyncClient (keep-alive connections reused across calls),
+  - the client-credentials token, refreshed TOKEN_REFRESH_MARGIN seconds before
+    expiry; concurrent callers share a single refresh,
+  - request coalescing: identical concurrent GETs share one round trip,
+  - throttling: a 429 (or a 503 on an idempotent request) makes every caller
+    wait out Retry-After before the request is retried, and concurrency is
+    capped by a semaphore,
+  - JSON $batch packing, up to 20 requests per round trip.
+
+OneDrive storage, the mailer and mail sync all go through get_graph_client().
+Base URLs come from settings so a local fake Graph server can stand in; tests
+pass an httpx.MockTransport instead (see tests/conftest.py).
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+import httpx
+
+from app.core.config import settings
+
+BATCH_LIMIT = 20
+TOKEN_REFRESH_MARGIN = 300
+MAX_RETRIES = 5
+DEFAULT_RETRY_AFTER = 5
+# A 503 on these is safe to retry; on a POST (e.g. sendMail) the request may
+# already have taken effect
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class GraphError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Graph {status_code}: {message}")
+        self.status_code = status_code
+
+
+def _retryable(status_code: int, method: str) -> bool:
+    return status_code == 429 or (status_code == 503 and method.upper() in IDEMPOTENT_METHODS)
+
+
+def _retry_after(response_headers, attempt: int) -> float:
+    value = response_headers.get("Retry-After") or response_headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return float(min(DEFAULT_RETRY_AFTER * 2 ** attempt, 60))
+
+
+class GraphClient:
+    def __init__(
+        self,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        base_url: str = settings.MICROSOFT_GRAPH_URL,
+        login_url: str = settings.MICROSOFT_LOGIN_URL,
+        max_connections: int = settings.GRAPH_MAX_CONNECTIONS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.tenant_id = tenant_id
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip("/")
+        self.login_url = login_url.rstrip("/")
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(60, connect=10),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self._slots = asyncio.Semaphore(max_connections)
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_refresh: Optional[asyncio.Task] = None
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._blocked_until = 0.0
+
+    # ---------- Auth ----------
+
+    async def _fetch_token(self) -> str:
+        response = await self._http.post(
+            f"{self.login_url}/{self.tenant_id}/oauth2/v2.0/token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "scope": "https://graph.microsoft.com/.default",
+            },
+        )
+        if response.status_code != 200:
+            raise GraphError(response.status_code, response.text[:200])
+        payload = response.json()
+        self._token = payload["access_token"]
+        self._token_expires = time.monotonic() + int(payload.get("expires_in", 3600)) - TOKEN_REFRESH_MARGIN
+        return self._token
+
+    async def token(self) -> str:
+        if self._token and time.monotonic() < self._token_expires:
+            return self._token
+        # Everyone arriving during a refresh awaits the same request
+        if self._token_refresh is None or self._token_refresh.done():
+            self._token_refresh = asyncio.ensure_future(self._fetch_token())
+        return await asyncio.shield(self._token_refresh)
+
+    # ---------- Requests ----------
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+
+    async def _wait_if_throttled(self):
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _throttle(self, seconds: float):
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    async def request(self, method: str, path: str, auth: bool = True, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying throttled (429, and 503 when idempotent) and
+        expired-token (401) responses. Absolute URLs (upload sessions, nextLink)
+        pass through; use auth=False for pre-authenticated URLs.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        for attempt in range(MAX_RETRIES + 1):
+            await self._wait_if_throttled()
+            if auth:
+                headers["Authorization"] = f"Bearer {await self.token()}"
+            async with self._slots:
+                response = await self._http.request(method, self._url(path), headers=headers, **kwargs)
+            if _retryable(response.status_code, method) and attempt < MAX_RETRIES:
+                self._throttle(_retry_after(response.headers, attempt))
+                continue
+            if response.status_code == 401 and auth and attempt == 0:
+                self._token = None
+                continue
+            return response
+        return response
+
+    async def request_json(self, method: str, path: str, **kwargs) -> Any:
+        response = await self.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            raise GraphError(response.status_code, response.text[:500])
+        return response.json() if response.content else None
+
+    async def get_json(self, path: str, params: Optional[dict] = None) -> Any:
+        """GET with coalescing: identical concurrent calls share one request."""
+        key = (self._url(path), tuple(sorted((params or {}).items())))
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.ensure_future(self.request_json("GET", path, params=params))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, headers: Optional[dict] = None, **kwargs):
+        """
+        Streaming response (downloads). Redirects to pre-authenticated URLs are
+        followed. The concurrency slot covers the request up to the response
+        headers only, so a slow reader doesn't hold it for the whole body.
+        """
+        await self._wait_if_throttled()
+        headers = {**(headers or {}), "Authorization": f"Bearer {await self.token()}"}
+        request = self._http.build_request(method, self._url(path), headers=headers, **kwargs)
+        async with self._slots:
+            response = await self._http.send(request, stream=True, follow_redirects=True)
+        try:
+            if response.status_code >= 400:
+                if response.status_code == 429:
+                    self._throttle(_retry_after(response.headers, 0))
+                await response.aread()
+                raise GraphError(response.status_code, response.text[:500])
+            yield response
+        finally:
+            await response.aclose()
+
+    # ---------- $batch ----------
+
+    async def batch(self, requests: list[dict]) -> list[dict]:
+        """
+        Run requests ({"method", "url", optional "body"/"headers"}) through $batch,
+        20 per round trip. Returns one {"status", "headers", "body"} per request,
+        in order. Throttled items (429, and 503 when idempotent) are retried
+        after their Retry-After.
+        """
+        results: list[Optional[dict]] = [None] * len(requests)
+        pending = list(range(len(requests)))
+        for attempt in range(MAX_RETRIES + 1):
+            retry, wait = [], 0.0
+            for start in range(0, len(pending), BATCH_LIMIT):
+                group = pending[start:start + BATCH_LIMIT]
+                payload = {"requests": [self._batch_item(i, requests[i]) for i in group]}
+                body = await self.request_json("POST", "$batch", json=payload)
+                for item in body.get("responses", []):
+                    i = int(item["id"])
+                    method = requests[i].get("method", "GET")
+                    if _retryable(item.get("status"), method) and attempt < MAX_RETRIES:
+                        retry.append(i)
+                        wait = max(wait, _retry_after(item.get("headers") or {}, attempt))
+                    else:
+                        results[i] = {"status": item.get("status"), "headers": item.get("headers") or {},
+                                      "body": item.get("body")}
+            if not retry:
+                break
+            self._throttle(wait)
+            pending = sorted(retry)
+        return results
+
+    @staticmethod
+    def _batch_item(i: int, request: dict) -> dict:
+        item = {"id": str(i), "method": request.get("method", "GET"), "url": "/" + request["url"].lstrip("/")}
+        if request.get("body") is not None:
+            item["body"] = request["body"]
+            item["headers"] = {"Content-Type": "application/json", **(request.get("headers") or {})}
+        elif request.get("headers"):
+            item["headers"] = request["headers"]
+        return item
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+_client: Optional[GraphClient] = None
+
+
+def graph_configured() -> bool:
+    return bool(settings.MICROSOFT_TENANT_ID and settings.MICROSOFT_CLIENT_ID and settings.MICROSOFT_CLIENT_SECRET)
+
+
+def get_graph_client() -> GraphClient:
+    """The shared client, created on first use."""
+    global _client
+    if _client is None:
+        if not graph_configured():
+            raise GraphError(0, "Microsoft 365 credentials are not configured")
+        _client = GraphClient(settings.MICROSOFT_TENANT_ID, settings.MICROSOFT_CLIENT_ID,
+                              settings.MICROSOFT_CLIENT_SECRET)
+    return _client
+
+
+async def close_graph_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
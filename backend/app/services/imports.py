@@ -0,0 +1,346 @@
+"""
+Bulk import of accounts, contacts and policies (book migration).
+
+Pipeline per file:
+  1. Rows stream from CSV (csv.reader over the upload) or XLSX (openpyxl
+     read-only mode), so the file is never loaded whole.
+  2. Rows are validated in batches against the same Pydantic schemas the CRUD
+     endpoints use. Carrier and user (producer/CSR/owner) references resolve
+     from maps loaded once; account references (external_id) resolve with one
+     query per batch.
+  3. Valid rows are COPY'd into a temp staging table shaped LIKE the target.
+  4. One INSERT ... SELECT merges staging into the real table, skipping rows
+     that already exist, and the inserted ids get one bulk audit insert.
+
+Imports are re-runnable: accounts are keyed by external_id, contacts by
+account + name + email, policies by carrier + policy number + effective date.
+Rows missing their key (an account without external_id, a policy without a
+policy number) are reported as errors, since a re-run could not match them.
+"""
+import csv
+import io
+import re
+import uuid
+import zipfile
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, Optional
+
+import openpyxl
+from dateutil import parser as date_parser
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import (
+    MetaData, Table, Column, select, update, and_, func, exists, text, bindparam,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Account, Contact, Policy, Carrier, User
+from app.schemas.schemas import AccountCreate, ContactCreate, PolicyCreate
+from app.services.account_summaries import mark_summaries_stale
+from app.services.audit import audit_bulk
+
+BATCH_SIZE = 5000
+ERROR_LIMIT = 1000
+
+DATE_FIELDS = {"effective_date", "expiration_date", "date_of_birth"}
+MONEY_FIELDS = {"premium"}
+US_DATE = re.compile(r"^\d{1,2}/\d{1,2}/\d{2,4}$")
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    valid: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row: int, messages: list[str]):
+        self.error_count += 1
+        if len(self.errors) < ERROR_LIMIT:
+            self.errors.append({"row": row, "errors": messages})
+
+
+# ---------- Readers ----------
+
+def _header_key(name) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(name or "").strip().lower()).strip("_")
+
+
+def iter_csv(stream: BinaryIO) -> Iterator[dict]:
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = [_header_key(h) for h in next(reader, [])]
+    for row in reader:
+        yield dict(zip(header, row))
+
+
+def iter_xlsx(stream: BinaryIO) -> Iterator[dict]:
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile) as e:
+        raise ImportFileError(f"Not a readable XLSX file: {e}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_header_key(h) for h in next(rows, ())]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(stream: BinaryIO, filename: str) -> Iterator[dict]:
+    return iter_xlsx(stream) if filename.lower().endswith((".xlsx", ".xlsm")) else iter_csv(stream)
+
+
+# ---------- Cleaning & references ----------
+
+def _clean(raw: dict) -> dict:
+    """Blank cells -> None, US dates -> ISO, '$1,234.50' -> Decimal."""
+    row = {}
+    for key, value in raw.items():
+        if isinstance(value, str):
+            value = value.strip() or None
+        if value is None:
+            row[key] = None
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key not in MONEY_FIELDS:
+            # XLSX numeric cells (zip codes, phone numbers, policy numbers)
+            row[key] = str(int(value)) if float(value).is_integer() else str(value)
+        elif key in DATE_FIELDS and isinstance(value, str) and US_DATE.match(value):
+            row[key] = date_parser.parse(value).date()
+        elif key in DATE_FIELDS and hasattr(value, "date"):
+            row[key] = value.date()  # XLSX datetime cells
+        elif key in MONEY_FIELDS and isinstance(value, str):
+            try:
+                row[key] = Decimal(value.replace("$", "").replace(",", ""))
+            except InvalidOperation:
+                row[key] = value  # let the schema report it
+        else:
+            row[key] = value
+    return row
+
+
+class ReferenceMaps:
+    """Carrier and user lookups, loaded once per import."""
+
+    def __init__(self, carriers: dict[str, uuid.UUID], users: dict[str, uuid.UUID]):
+        self.carriers = carriers
+        self.users = users
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "ReferenceMaps":
+        carriers = {name.lower(): cid for cid, name in (await db.execute(select(Carrier.id, Carrier.name))).all()}
+        users = {}
+        for uid, email, name in (await db.execute(select(User.id, User.email, User.name))).all():
+            users[name.lower()] = uid
+            users[email.lower()] = uid
+        return cls(carriers, users)
+
+    def resolve(self, row: dict, column: str, id_field: str, table: dict, label: str, errors: list):
+        """Fill row[id_field] from a name/email column unless an id was given directly."""
+        ref = row.pop(column, None)
+        if row.get(id_field) or not ref:
+            return
+        found = table.get(str(ref).strip().lower())
+        if found:
+            row[id_field] = found
+        else:
+            errors.append(f"Unknown {label}: {ref}")
+
+
+def _format_errors(e: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+
+
+# ---------- Entity definitions ----------
+
+@dataclass
+class EntitySpec:
+    model: type
+    schema: type[BaseModel]
+    label: str
+    needs_account: bool
+    key_field: Optional[str] = None  # optional in the schema, required to import
+
+
+ENTITIES = {
+    "accounts": EntitySpec(Account, AccountCreate, "Account", needs_account=False, key_field="external_id"),
+    "contacts": EntitySpec(Contact, ContactCreate, "Contact", needs_account=True),
+    "policies": EntitySpec(Policy, PolicyCreate, "Policy", needs_account=True, key_field="policy_number"),
+}
+
+
+def _resolve_users_and_carriers(entity: str, row: dict, refs: ReferenceMaps, errors: list):
+    if entity == "accounts":
+        refs.resolve(row, "producer", "assigned_producer_id", refs.users, "producer", errors)
+        refs.resolve(row, "csr", "assigned_csr_id", refs.users, "CSR", errors)
+    elif entity == "policies":
+        refs.resolve(row, "carrier", "carrier_id", refs.carriers, "carrier", errors)
+        refs.resolve(row, "servicing_owner", "servicing_owner_id", refs.users, "servicing owner", errors)
+        refs.resolve(row, "producing_agent", "producing_agent_id", refs.users, "producing agent", errors)
+
+
+async def _account_ids(db: AsyncSession, external_ids: set[str]) -> dict[str, uuid.UUID]:
+    if not external_ids:
+        return {}
+    result = await db.execute(select(Account.external_id, Account.id).where(Account.external_id.in_(external_ids)))
+    return dict(result.all())
+
+
+# ---------- Staging & merge ----------
+
+def _staging_table(spec: EntitySpec, name: str) -> Table:
+    """Core mirror of the temp table (created LIKE the target) for building statements."""
+    return Table(name, MetaData(), *[Column(c.name, c.type) for c in spec.model.__table__.columns])
+
+
+async def _create_staging(db: AsyncSession, spec: EntitySpec, name: str):
+    await db.execute(text(
+        f"CREATE TEMP TABLE {name} (LIKE {spec.model.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+
+
+async def _copy(db: AsyncSession, table_name: str, columns: list[str], records: list[tuple]):
+    """COPY records into the staging table through the session's asyncpg connection."""
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table_name, records=records, columns=columns)
+
+
+def _merge_statement(entity: str, stage: Table, columns: list[str]):
+    c = stage.c
+    if entity == "accounts":
+        source = select(*[c[name] for name in columns])
+        return (
+            pg_insert(Account)
+            .from_select(columns, source)
+            .on_conflict_do_nothing(
+                index_elements=[Account.external_id],
+                index_where=Account.external_id.is_not(None),
+            )
+            .returning(Account.id)
+        )
+    if entity == "contacts":
+        key = (c.account_id, func.lower(c.first_name), func.lower(c.last_name), func.lower(c.email))
+        source = (
+            select(*[c[name] for name in columns])
+            .distinct(*key)
+            .where(~exists().where(and_(
+                Contact.account_id == c.account_id,
+                func.lower(Contact.first_name) == func.lower(c.first_name),
+                func.lower(Contact.last_name) == func.lower(c.last_name),
+                func.lower(Contact.email).is_not_distinct_from(func.lower(c.email)),
+            )))
+            .order_by(*key)
+        )
+        return pg_insert(Contact).from_select(columns, source).returning(Contact.id, Contact.account_id, Contact.is_primary)
+    key = (c.carrier_id, c.policy_number, c.effective_date)
+    source = (
+        select(*[c[name] for name in columns])
+        .distinct(*key)
+        .where(~exists().where(and_(
+            Policy.carrier_id.is_not_distinct_from(c.carrier_id),
+            Policy.policy_number == c.policy_number,
+            Policy.effective_date == c.effective_date,
+        )))
+        .order_by(*key)
+    )
+    return pg_insert(Policy).from_select(columns, source).returning(Policy.id, Policy.account_id)
+
+
+# ---------- Pipeline ----------
+
+async def import_file(
+    db: AsyncSession,
+    entity: str,
+    stream: BinaryIO,
+    filename: str,
+    user_id,
+    dry_run: bool = False,
+) -> ImportResult:
+    spec = ENTITIES[entity]
+    result = ImportResult()
+    refs = await ReferenceMaps.load(db)
+    columns = ["id", *spec.schema.model_fields]
+    stage_name = f"import_stage_{entity}"
+    stage = _staging_table(spec, stage_name)
+    if not dry_run:
+        await _create_staging(db, spec, stage_name)
+
+    async def flush(batch: list[tuple[int, dict]]):
+        account_refs = {}
+        if spec.needs_account:
+            account_refs = await _account_ids(
+                db, {str(r["account_external_id"]) for _, r in batch if r.get("account_external_id")}
+            )
+        records = []
+        for row_no, row in batch:
+            errors = []
+            _resolve_users_and_carriers(entity, row, refs, errors)
+            if spec.needs_account:
+                ref = row.pop("account_external_id", None)
+                if not row.get("account_id") and ref:
+                    if str(ref) in account_refs:
+                        row["account_id"] = account_refs[str(ref)]
+                    else:
+                        errors.append(f"Unknown account external_id: {ref}")
+            if spec.key_field and not row.get(spec.key_field):
+                errors.append(f"{spec.key_field}: required to import (re-imports match on it)")
+            try:
+                model = spec.schema.model_validate(row)
+            except ValidationError as e:
+                errors.extend(_format_errors(e))
+            if errors:
+                result.add_error(row_no, errors)
+                continue
+            values = model.model_dump()
+            records.append((uuid.uuid4(), *[values[name] for name in columns[1:]]))
+        result.valid += len(records)
+        if records and not dry_run:
+            await _copy(db, stage_name, columns, records)
+
+    batch = []
+    for row_no, raw in enumerate(iter_rows(stream, filename), start=2):
+        if not any(v not in (None, "") for v in raw.values()):
+            continue
+        result.rows += 1
+        batch.append((row_no, _clean(raw)))
+        if len(batch) >= BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    if dry_run or not result.valid:
+        return result
+
+    inserted = (await db.execute(_merge_statement(entity, stage, columns))).all()
+    result.inserted = len(inserted)
+    result.skipped = result.valid - result.inserted
+
+    if entity == "contacts":
+        # Imported primary contacts fill in accounts that have none yet
+        primaries = {row.account_id: row.id for row in inserted if row.is_primary}
+        if primaries:
+            accounts = Account.__table__
+            await db.execute(
+                update(accounts)
+                .where(and_(accounts.c.id == bindparam("account_id"), accounts.c.primary_contact_id.is_(None)))
+                .values(primary_contact_id=bindparam("contact_id")),
+                [{"account_id": a, "contact_id": c} for a, c in primaries.items()],
+            )
+
+    if entity == "accounts":
+        mark_summaries_stale(db, [row.id for row in inserted])
+    elif entity == "policies":
+        mark_summaries_stale(db, {row.account_id for row in inserted})
+
+    await audit_bulk(db, user_id, "Create", spec.label, [row.id for row in inserted],
+                     meta={"source": "import", "file": filename})
+    return result
@@ -0,0 +1,320 @@
+"""
+Installment schedules and the installment reminder / past-due job.
+
+Schedules: compute a policy term's installments from its payment plan and write
+them as one multi-row INSERT. Regenerating (e.g. after an endorsement changes the
+premium) keeps Paid and Cancelled rows, deletes the unpaid ones in one statement,
+and spreads the unpaid balance over the remaining due dates.
+
+Job: a few set-based UPDATEs driven by idx_installments_due_date/status move
+Scheduled installments entering the reminder window to Reminded (recording the
+customer reminder and queuing its email in the outbox, so it goes out only once
+the job commits), move overdue ones to Past Due, and open one
+PaymentIssue service item per policy that went past due.
+"""
+import calendar
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, ROUND_DOWN
+from typing import Optional
+
+from sqlalchemy import select, update, delete, and_, func, literal, any_, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Installment, Policy, Account, EmailTemplate, CommunicationLog
+from app.services.account_summaries import comm_log_accounts, mark_summaries_stale
+from app.services.audit import audit_bulk
+from app.services.email_templates import agency_context, render
+from app.services.email_outbox import queue_emails
+from app.services.mailer import EmailMessage
+from app.services.service_items import insert_service_items_from, open_item_exists
+
+# Months between installments for each payment_plan value
+PLAN_INTERVAL_MONTHS = {
+    "Annual": 12,
+    "Semi-Annual": 6,
+    "Quarterly": 3,
+    "Monthly": 1,
+    "EFT": 1,
+}
+
+UNPAID_STATUSES = ["Scheduled", "Reminded", "Past Due"]
+CENT = Decimal("0.01")
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+def add_months(start: date, months: int) -> date:
+    """Same day-of-month `months` later, clamped to the end of shorter months."""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def due_dates(plan: str, effective_date: date, expiration_date: date) -> list[date]:
+    """Every installment due date in the term, starting on the effective date."""
+    interval = PLAN_INTERVAL_MONTHS[plan]
+    dates, n = [], 0
+    while True:
+        due = add_months(effective_date, interval * n)
+        if due >= expiration_date and dates:
+            return dates
+        dates.append(due)
+        n += 1
+
+
+def split_amount(total: Decimal, count: int) -> list[Decimal]:
+    """Split total into count cent amounts; the rounding remainder goes on the first."""
+    each = (total / count).quantize(CENT, rounding=ROUND_DOWN)
+    amounts = [each] * count
+    amounts[0] += total - each * count
+    return amounts
+
+
+def compute_schedule(
+    plan: str,
+    premium: Decimal,
+    down_payment: Decimal,
+    effective_date: date,
+    expiration_date: date,
+) -> list[tuple[date, Decimal]]:
+    """
+    (due_date, amount) pairs for a full term. With a down payment, the first
+    installment is the down payment and the balance is spread over the rest, so
+    it must leave a balance; a single-installment term (e.g. Annual) takes no
+    down payment. Raises ScheduleError otherwise.
+    """
+    dates = due_dates(plan, effective_date, expiration_date)
+    if not down_payment:
+        return list(zip(dates, split_amount(premium, len(dates))))
+    if len(dates) == 1:
+        raise ScheduleError(f"A {plan} term has a single installment; omit the down payment")
+    if down_payment >= premium:
+        raise ScheduleError("Down payment must be less than the premium")
+    return [(dates[0], down_payment)] + list(zip(dates[1:], split_amount(premium - down_payment, len(dates) - 1)))
+
+
+async def generate_schedule(
+    db: AsyncSession,
+    policy_id: uuid.UUID,
+    plan: str,
+    premium: Decimal,
+    down_payment: Decimal,
+    effective_date: date,
+    expiration_date: date,
+    payment_method: Optional[str],
+    user_id,
+) -> list[Installment]:
+    """Replace the policy's unpaid installments with a freshly computed schedule."""
+    schedule = compute_schedule(plan, premium, down_payment, effective_date, expiration_date)
+
+    paid = (await db.execute(
+        select(func.coalesce(func.sum(Installment.amount), 0), func.max(Installment.due_date))
+        .where(and_(Installment.policy_id == policy_id, Installment.status == "Paid"))
+    )).one()
+    paid_total, last_paid_due = Decimal(paid[0]), paid[1]
+
+    if last_paid_due is not None:
+        # Payments already collected count against the premium; the balance is
+        # spread over the due dates still ahead of the last paid installment.
+        balance = premium - paid_total
+        remaining = [d for d, _ in schedule if d > last_paid_due]
+        if balance <= 0:
+            schedule = []
+        elif remaining:
+            schedule = list(zip(remaining, split_amount(balance, len(remaining))))
+        else:
+            schedule = [(max(date.today(), last_paid_due), balance)]
+
+    removed = (await db.execute(
+        delete(Installment)
+        .where(and_(Installment.policy_id == policy_id, Installment.status.in_(UNPAID_STATUSES)))
+        .returning(Installment.id)
+    )).scalars().all()
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "policy_id": policy_id,
+            "due_date": due,
+            "amount": amount,
+            "status": "Scheduled",
+            "payment_method": payment_method,
+        }
+        for due, amount in schedule
+        if amount > 0  # a balance of a few cents spread thin leaves empty installments
+    ]
+    installments = []
+    if rows:
+        result = await db.execute(pg_insert(Installment).returning(Installment), rows)
+        installments = list(result.scalars().all())
+
+    meta = {"source": "installment_schedule", "policy_id": str(policy_id)}
+    await audit_bulk(db, user_id, "Delete", "Installment", removed, meta=meta)
+    await audit_bulk(db, user_id, "Create", "Installment", [r["id"] for r in rows], meta=meta)
+
+    return sorted(installments, key=lambda i: i.due_date)
+
+
+# ---------- Reminder / past-due job ----------
+
+DEFAULT_REMINDER_SUBJECT = "Payment reminder: {{policy_number}} due {{due_date}}"
+DEFAULT_REMINDER_BODY = (
+    "Hi {{account_name}},\n\nThis is a reminder that your {{line_of_business}} installment of "
+    "${{amount}} is due on {{due_date}}.\n\n{{agency_name}}\n{{agency_phone}}"
+)
+
+
+async def _reminder_template(db: AsyncSession) -> Optional[EmailTemplate]:
+    result = await db.execute(
+        select(EmailTemplate)
+        .where(and_(EmailTemplate.category == "Installment", EmailTemplate.is_active.is_(True)))
+        .order_by(EmailTemplate.name)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def mark_reminded(db: AsyncSession, now: datetime) -> list:
+    """Scheduled -> Reminded for installments due within the reminder window."""
+    today = now.date()
+    result = await db.execute(
+        update(Installment)
+        .where(and_(
+            Installment.status == "Scheduled",
+            Installment.due_date >= today,
+            Installment.due_date <= today + timedelta(days=settings.INSTALLMENT_REMINDER_DAYS),
+            Installment.policy_id == Policy.id,
+            Policy.status == "Active",
+            Policy.account_id == Account.id,
+        ))
+        .values(status="Reminded", reminder_sent_at=now, updated_at=now)
+        .returning(
+            Installment.id, Installment.amount, Installment.due_date,
+            Policy.id.label("policy_id"), Policy.policy_number, Policy.line_of_business,
+            Policy.servicing_owner_id, Account.id.label("account_id"), Account.name, Account.email,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.all()
+
+
+async def queue_reminders(db: AsyncSession, reminded: list, now: datetime) -> list:
+    """Record an outbound CommunicationLog per reminder and queue its email (sent_at is set on delivery)."""
+    template = await _reminder_template(db)
+    subject = template.subject if template else DEFAULT_REMINDER_SUBJECT
+    body = (template.body_text or template.body_html) if template else DEFAULT_REMINDER_BODY
+    base_context = agency_context()
+
+    comm_logs, messages = [], []
+    for r in reminded:
+        if not r.email:
+            continue
+        context = {
+            **base_context,
+            "account_name": r.name,
+            "policy_number": r.policy_number or "",
+            "line_of_business": r.line_of_business,
+            "amount": f"{r.amount:,.2f}",
+            "due_date": r.due_date.strftime("%m/%d/%Y"),
+        }
+        message = EmailMessage(to=r.email, subject=render(subject, context), body=render(body, context))
+        messages.append(message)
+        comm_logs.append({
+            "id": uuid.uuid4(),
+            "direction": "Outbound",
+            "channel": "Email",
+            "subject": message.subject[:500],
+            "body_preview": message.body[:500],
+            "linked_entity_type": "Account",
+            "linked_entity_id": r.account_id,
+            "user_id": r.servicing_owner_id,
+            "template_id": template.id if template else None,
+            "logged_at": now,
+        })
+
+    if comm_logs:
+        await db.execute(pg_insert(CommunicationLog), comm_logs)
+        mark_summaries_stale(db, comm_log_accounts(comm_logs))
+        await queue_emails(db, messages, [c["id"] for c in comm_logs], source="installment_reminder")
+    return [c["id"] for c in comm_logs]
+
+
+async def mark_past_due(db: AsyncSession, today: date) -> list:
+    """Scheduled/Reminded -> Past Due once the due date has passed. Returns (id, old status) rows."""
+    before = (
+        select(Installment.id, Installment.status.label("old_status"))
+        .where(and_(Installment.status.in_(["Scheduled", "Reminded"]), Installment.due_date < today))
+        .subquery()
+    )
+    result = await db.execute(
+        update(Installment)
+        .where(Installment.id == before.c.id)
+        .values(status="Past Due", updated_at=func.now())
+        .returning(Installment.id, before.c.old_status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.all()
+
+
+async def open_payment_issues(db: AsyncSession, installment_ids: list) -> list:
+    """One PaymentIssue item per policy among these installments, unless one is already open."""
+    ids = bindparam("installment_ids", installment_ids, type_=ARRAY(UUID(as_uuid=True)))
+    source = (
+        select(
+            literal("PaymentIssue"),
+            Policy.account_id,
+            Policy.id,
+            func.concat(
+                "Past due installment: ", Policy.line_of_business, " ",
+                func.coalesce(Policy.policy_number, ""), " $", func.sum(Installment.amount),
+                " (due ", func.min(Installment.due_date), ")",
+            ),
+            func.coalesce(Policy.servicing_owner_id, Account.assigned_csr_id),
+            func.current_date(),
+            literal("High"),
+        )
+        .select_from(Installment)
+        .join(Policy, Policy.id == Installment.policy_id)
+        .join(Account, Account.id == Policy.account_id)
+        .where(and_(
+            Installment.id == any_(ids),
+            ~open_item_exists("PaymentIssue", Policy.id),
+        ))
+        .group_by(Policy.id, Account.assigned_csr_id)
+    )
+    return await insert_service_items_from(db, source)
+
+
+async def run_installment_job(db: AsyncSession) -> dict:
+    now = datetime.now(timezone.utc)
+    meta = {"source": "installment_job"}
+
+    reminded = await mark_reminded(db, now)
+    await audit_bulk(db, None, "StatusChange", "Installment", [r.id for r in reminded],
+                     field="status", old_val="Scheduled", new_val="Reminded", meta=meta)
+    comm_log_ids = await queue_reminders(db, reminded, now)
+    await audit_bulk(db, None, "EmailSent", "CommunicationLog", comm_log_ids, meta=meta)
+
+    past_due = await mark_past_due(db, now.date())
+    by_old = {}
+    for installment_id, old in past_due:
+        by_old.setdefault(old, []).append(installment_id)
+    for old, ids in by_old.items():
+        await audit_bulk(db, None, "StatusChange", "Installment", ids,
+                         field="status", old_val=old, new_val="Past Due", meta=meta)
+
+    issues = await open_payment_issues(db, [r.id for r in past_due]) if past_due else []
+    await audit_bulk(db, None, "Create", "ServiceItem", [r.id for r in issues], meta=meta)
+    mark_summaries_stale(db, {r.account_id for r in issues})
+
+    return {
+        "reminded": len(reminded),
+        "reminder_emails": len(comm_log_ids),
+        "past_due": len(past_due),
+        "payment_issues": len(issues),
+    }
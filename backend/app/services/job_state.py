@@ -0,0 +1,24 @@
+"""
+Watermarks for incremental batch jobs (job_states table, one row per job).
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import JobState
+
+
+async def get_last_run(db: AsyncSession, name: str) -> Optional[datetime]:
+    return (await db.execute(select(JobState.last_run_at).where(JobState.name == name))).scalar()
+
+
+async def set_last_run(db: AsyncSession, name: str, when: datetime, state: Optional[dict] = None):
+    values = {"name": name, "last_run_at": when, "state_json": state, "updated_at": func.now()}
+    await db.execute(
+        pg_insert(JobState)
+        .values(**values)
+        .on_conflict_do_update(index_elements=[JobState.name], set_={k: v for k, v in values.items() if k != "name"})
+    )
@@ -0,0 +1,175 @@
+"""
+Incremental Outlook mail sync into CommunicationLog.
+
+Each active user's Inbox and Sent Items are read with Graph delta queries; the
+deltaLink returned at the end of a round is stored in job_states and the next
+cycle resumes from it, so only messages added since the previous cycle are
+fetched. A mailbox's first sync reaches back MAIL_SYNC_INITIAL_DAYS.
+
+Per page of messages, the counterpart addresses (sender for Inbox, recipients
+for Sent Items) are normalized and matched to contacts, then accounts, with one
+query each; matched messages are bulk-inserted. outlook_message_id holds the
+Internet Message-ID, which is the same in every mailbox, so a message seen by
+several users (or re-delivered after a token reset) is logged once through
+uq_comm_logs_outlook_message.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import httpx
+from sqlalchemy import select, func, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import User, Contact, Account, CommunicationLog, JobState
+from app.services.account_summaries import comm_log_accounts, mark_summaries_stale
+from app.services.graph import GraphError, get_graph_client, graph_configured
+from app.services.job_state import set_last_run
+
+FOLDERS = {"inbox": "Inbound", "sentitems": "Outbound"}
+SELECT_FIELDS = "internetMessageId,subject,bodyPreview,from,toRecipients,ccRecipients,sentDateTime,receivedDateTime"
+PAGE_SIZE = 100
+
+
+def normalize_email(address: Optional[str]) -> Optional[str]:
+    return address.strip().lower() if address else None
+
+
+def _job_name(user_id: uuid.UUID, folder: str) -> str:
+    return f"mail_sync:{user_id}:{folder}"
+
+
+def _counterparts(message: dict, direction: str) -> list[str]:
+    if direction == "Inbound":
+        addresses = [((message.get("from") or {}).get("emailAddress") or {}).get("address")]
+    else:
+        addresses = [
+            (r.get("emailAddress") or {}).get("address")
+            for r in (message.get("toRecipients") or []) + (message.get("ccRecipients") or [])
+        ]
+    return [a for a in (normalize_email(x) for x in addresses) if a]
+
+
+async def _match(db: AsyncSession, addresses: set[str]) -> dict[str, tuple]:
+    """Normalized address -> (entity_type, entity_id, contact_id); contacts win over accounts."""
+    if not addresses:
+        return {}
+    matches = {}
+    result = await db.execute(
+        select(func.lower(Account.email), Account.id).where(func.lower(Account.email).in_(addresses))
+    )
+    for email, account_id in result.all():
+        matches[email] = ("Account", account_id, None)
+    result = await db.execute(
+        select(func.lower(Contact.email), Contact.account_id, Contact.id)
+        .where(func.lower(Contact.email).in_(addresses))
+        .order_by(Contact.is_primary)
+    )
+    for email, account_id, contact_id in result.all():
+        matches[email] = ("Account", account_id, contact_id)
+    return matches
+
+
+async def _store_page(db: AsyncSession, user_id: uuid.UUID, direction: str, messages: list[dict]) -> int:
+    messages = [m for m in messages if "@removed" not in m and m.get("internetMessageId")]
+    counterparts = {m["internetMessageId"]: _counterparts(m, direction) for m in messages}
+    matches = await _match(db, {a for addresses in counterparts.values() for a in addresses})
+
+    rows = {}
+    for m in messages:
+        match = next((matches[a] for a in counterparts[m["internetMessageId"]] if a in matches), None)
+        if match is None:
+            continue
+        entity_type, entity_id, contact_id = match
+        timestamp = m.get("receivedDateTime") if direction == "Inbound" else m.get("sentDateTime")
+        rows[m["internetMessageId"]] = {
+            "id": uuid.uuid4(),
+            "direction": direction,
+            "channel": "Email",
+            "subject": (m.get("subject") or "")[:500],
+            "body_preview": m.get("bodyPreview"),
+            "linked_entity_type": entity_type,
+            "linked_entity_id": entity_id,
+            "contact_id": contact_id,
+            "user_id": user_id,
+            "outlook_message_id": m["internetMessageId"][:500],
+            "sent_at": datetime.fromisoformat(timestamp.replace("Z", "+00:00")) if timestamp else None,
+        }
+    if not rows:
+        return 0
+    result = await db.execute(
+        pg_insert(CommunicationLog)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(
+            index_elements=[CommunicationLog.outlook_message_id],
+            index_where=CommunicationLog.outlook_message_id.is_not(None),
+        )
+        .returning(CommunicationLog.id, CommunicationLog.linked_entity_type, CommunicationLog.linked_entity_id)
+    )
+    stored = result.all()
+    mark_summaries_stale(db, comm_log_accounts(row._asdict() for row in stored))
+    return len(stored)
+
+
+async def sync_folder(db: AsyncSession, user: User, folder: str, delta_link: Optional[str]) -> tuple[int, str]:
+    """Process one delta round for a mailbox folder. Returns (logged, new delta link)."""
+    graph = get_graph_client()
+    direction = FOLDERS[folder]
+    if delta_link:
+        url, params = delta_link, None
+    else:
+        since = (datetime.now(timezone.utc) - timedelta(days=settings.MAIL_SYNC_INITIAL_DAYS)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        url = f"users/{user.email}/mailFolders/{folder}/messages/delta"
+        params = {"$select": SELECT_FIELDS, "$filter": f"receivedDateTime ge {since}"}
+
+    logged = 0
+    while True:
+        response = await graph.request("GET", url, params=params,
+                                       headers={"Prefer": f"odata.maxpagesize={PAGE_SIZE}"})
+        if response.status_code >= 400:
+            raise GraphError(response.status_code, response.text[:500])
+        page = response.json()
+        logged += await _store_page(db, user.id, direction, page.get("value", []))
+        if "@odata.nextLink" in page:
+            url, params = page["@odata.nextLink"], None
+            continue
+        return logged, page["@odata.deltaLink"]
+
+
+async def run_mail_sync(db: AsyncSession) -> dict:
+    if not graph_configured():
+        return {"skipped": "Microsoft 365 is not configured"}
+
+    users = (await db.execute(select(User).where(User.is_active.is_(True)))).scalars().all()
+    names = [_job_name(u.id, f) for u in users for f in FOLDERS]
+    tokens = dict((await db.execute(
+        select(JobState.name, JobState.state_json).where(JobState.name.in_(names))
+    )).all()) if names else {}
+
+    logged, mailboxes, errors = 0, 0, 0
+    for user in users:
+        synced = 0
+        for folder in FOLDERS:
+            name = _job_name(user.id, folder)
+            delta_link = (tokens.get(name) or {}).get("delta_link")
+            try:
+                count, delta_link = await sync_folder(db, user, folder, delta_link)
+            except GraphError as e:
+                errors += 1
+                if e.status_code == 410:
+                    # Sync state expired: start over from the initial window next cycle
+                    await set_last_run(db, name, datetime.now(timezone.utc), {"delta_link": None})
+                continue
+            except httpx.TransportError:
+                # Network failure: this folder resumes from its stored deltaLink next cycle
+                errors += 1
+                continue
+            logged += count
+            synced += 1
+            await set_last_run(db, name, datetime.now(timezone.utc), {"delta_link": delta_link})
+        if synced:
+            mailboxes += 1
+
+    return {"mailboxes": mailboxes, "messages_logged": logged, "errors": errors}
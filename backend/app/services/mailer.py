@@ -0,0 +1,64 @@
+"""
+Outbound email. With Microsoft 365 credentials and MAIL_SENDER configured,
+messages go out through Graph sendMail, packed 20 to a $batch round trip.
+Otherwise they are written to the application log (stand-in transport).
+
+send_emails() is the transport; jobs and requests queue mail with
+app.services.email_outbox so nothing is sent for a transaction that rolls back.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.services.graph import get_graph_client, graph_configured
+
+logger = logging.getLogger("sentinel.mailer")
+
+
+@dataclass
+class EmailMessage:
+    to: str
+    subject: str
+    body: str
+    html: Optional[str] = None
+
+
+def _send_mail_request(m: EmailMessage) -> dict:
+    return {
+        "method": "POST",
+        "url": f"/users/{settings.MAIL_SENDER}/sendMail",
+        "body": {
+            "message": {
+                "subject": m.subject,
+                "body": {"contentType": "HTML" if m.html else "Text", "content": m.html or m.body},
+                "toRecipients": [{"emailAddress": {"address": m.to}}],
+            },
+            "saveToSentItems": True,
+        },
+    }
+
+
+async def send_emails(messages: list[EmailMessage]) -> list[Optional[str]]:
+    """
+    Send a batch of messages right away. Returns one entry per message: None if
+    it was accepted, else the error. Callers inside a database transaction
+    queue through app.services.email_outbox instead.
+    """
+    if not messages:
+        return []
+    if not (graph_configured() and settings.MAIL_SENDER):
+        for m in messages:
+            logger.info("email to=%s subject=%s", m.to, m.subject)
+        return [None] * len(messages)
+
+    results = await get_graph_client().batch([_send_mail_request(m) for m in messages])
+    errors = []
+    for m, result in zip(messages, results):
+        if result and result["status"] == 202:
+            errors.append(None)
+        else:
+            error = str(result and result.get("body") or "no response")[:1000]
+            logger.warning("email to=%s failed: %s", m.to, error)
+            errors.append(error)
+    return errors
@@ -0,0 +1,249 @@
+"""
+Set-based account merge.
+
+A merge folds one or more duplicate accounts ("merged") into a surviving account.
+Any number of pairs are merged together in one transaction: the pairs are bound
+once as arrays and unnested into a (merged_id, survivor_id) mapping, and every
+referencing table is re-pointed with a single UPDATE ... FROM that mapping:
+  - typed references: every column with a foreign key to accounts.id (discovered
+    from the model metadata, so new tables are covered automatically)
+  - polymorphic references: linked_entity_type = 'Account' / linked_entity_id
+    on notes, tasks, documents, communication logs (and links), reminders and
+    notifications
+  - tags: copied with INSERT ... ON CONFLICT DO NOTHING
+Blank fields on the survivor are filled from the merged account, duplicate
+candidate pairs are resolved, the merged accounts are deleted and each pair gets
+one audit entry holding the whole change set.
+"""
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update, delete, and_, or_, func, bindparam, column
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import Base
+from app.models.models import Account, SequenceEnrollment, DuplicateCandidate, account_tags
+from app.services.account_summaries import mark_summaries_stale
+from app.services.audit import audit_entry, write_audit_logs_bulk
+
+# Survivor fields filled from the merged account when blank
+FILL_FIELDS = (
+    "primary_contact_id", "assigned_producer_id", "assigned_csr_id",
+    "address_line1", "address_line2", "city", "state", "zip_code", "county", "phone", "email",
+)
+
+
+class MergeError(ValueError):
+    pass
+
+
+def account_references() -> list:
+    """
+    Columns holding a foreign key to accounts.id. account_tags is merged
+    separately; account_summaries rows go with their account and are recomputed.
+    """
+    return [
+        col
+        for table in Base.metadata.sorted_tables
+        if table.name not in ("accounts", "account_tags", "account_summaries")
+        for col in table.c
+        if any(fk.column.table.name == "accounts" for fk in col.foreign_keys)
+    ]
+
+
+def polymorphic_tables() -> list:
+    return [
+        table for table in Base.metadata.sorted_tables
+        if "linked_entity_type" in table.c and "linked_entity_id" in table.c
+    ]
+
+
+def _mapping(merged_ids: list, survivor_ids: list):
+    return func.unnest(
+        bindparam("merged_ids", merged_ids, type_=ARRAY(UUID(as_uuid=True))),
+        bindparam("survivor_ids", survivor_ids, type_=ARRAY(UUID(as_uuid=True))),
+    ).table_valued(
+        column("merged_id", UUID(as_uuid=True)), column("survivor_id", UUID(as_uuid=True)),
+    ).render_derived(name="merge_map")
+
+
+def _validate(pairs: list[tuple[uuid.UUID, uuid.UUID]]):
+    survivors = {s for s, _ in pairs}
+    merged = [m for _, m in pairs]
+    if any(s == m for s, m in pairs):
+        raise MergeError("An account cannot be merged into itself")
+    if len(set(merged)) != len(merged):
+        raise MergeError("An account can only be merged once per request")
+    if survivors & set(merged):
+        raise MergeError("An account cannot both survive and be merged in the same request")
+
+
+async def _cancel_conflicting_enrollments(db: AsyncSession, mapping) -> int:
+    """
+    Only one Active enrollment per sequence and account is allowed
+    (uq_enrollments_active_account). Within each survivor's group, keep the
+    survivor's own enrollment (else the earliest) and cancel the others.
+    """
+    group_of = func.coalesce(mapping.c.survivor_id, SequenceEnrollment.account_id)
+    ranked = (
+        select(
+            SequenceEnrollment.id,
+            func.row_number().over(
+                partition_by=(group_of, SequenceEnrollment.sequence_id),
+                order_by=(mapping.c.survivor_id.is_(None).desc(), SequenceEnrollment.enrolled_at),
+            ).label("rank"),
+        )
+        .select_from(SequenceEnrollment)
+        .outerjoin(mapping, mapping.c.merged_id == SequenceEnrollment.account_id)
+        .where(and_(
+            SequenceEnrollment.status == "Active",
+            or_(
+                SequenceEnrollment.account_id.in_(select(mapping.c.merged_id)),
+                SequenceEnrollment.account_id.in_(select(mapping.c.survivor_id)),
+            ),
+        ))
+        .subquery()
+    )
+    result = await db.execute(
+        update(SequenceEnrollment)
+        .where(SequenceEnrollment.id.in_(select(ranked.c.id).where(ranked.c.rank > 1)))
+        .values(status="Cancelled", completed_at=func.now(), next_due_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def merge_accounts(db: AsyncSession, pairs: list[tuple[uuid.UUID, uuid.UUID]], user_id) -> dict:
+    """
+    Merge each (survivor_id, merged_id) pair. Raises MergeError on an invalid
+    request or unknown account; nothing is written in that case.
+    """
+    _validate(pairs)
+    survivor_ids = [s for s, _ in pairs]
+    merged_ids = [m for _, m in pairs]
+
+    rows = (await db.execute(
+        select(Account).where(Account.id.in_(set(survivor_ids) | set(merged_ids)))
+    )).scalars().all()
+    accounts = {a.id: a for a in rows}
+    missing = (set(survivor_ids) | set(merged_ids)) - accounts.keys()
+    if missing:
+        raise MergeError(f"Account(s) not found: {', '.join(sorted(str(m) for m in missing))}")
+    # Snapshot before the ORM objects are expired by the bulk statements below
+    snapshot = {
+        a.id: {"name": a.name, "external_id": a.external_id, **{f: getattr(a, f) for f in FILL_FIELDS}}
+        for a in rows
+    }
+
+    mapping = _mapping(merged_ids, survivor_ids)
+    moved = defaultdict(lambda: defaultdict(int))  # merged id -> table -> rows re-pointed
+
+    cancelled = await _cancel_conflicting_enrollments(db, mapping)
+
+    for col in account_references():
+        result = await db.execute(
+            update(col.table)
+            .values({col.name: mapping.c.survivor_id})
+            .where(col == mapping.c.merged_id)
+            .returning(mapping.c.merged_id)
+        )
+        for (merged_id,) in result.all():
+            moved[merged_id][f"{col.table.name}.{col.name}"] += 1
+
+    for table in polymorphic_tables():
+        result = await db.execute(
+            update(table)
+            .values(linked_entity_id=mapping.c.survivor_id)
+            .where(and_(table.c.linked_entity_type == "Account", table.c.linked_entity_id == mapping.c.merged_id))
+            .returning(mapping.c.merged_id)
+        )
+        for (merged_id,) in result.all():
+            moved[merged_id][table.name] += 1
+
+    result = await db.execute(
+        pg_insert(account_tags)
+        .from_select(
+            ["account_id", "tag_id"],
+            select(mapping.c.survivor_id, account_tags.c.tag_id)
+            .join(mapping, mapping.c.merged_id == account_tags.c.account_id),
+        )
+        .on_conflict_do_nothing()
+        .returning(account_tags.c.account_id)
+    )
+    tags_added = len(result.all())
+
+    # Blank survivor fields take the first merged account's values
+    filled = defaultdict(dict)  # survivor id -> field -> value
+    filled_from = {}            # pair -> fields it supplied (for the audit)
+    for survivor_id, merged_id in pairs:
+        survivor, source = snapshot[survivor_id], snapshot[merged_id]
+        supplied = {
+            f: source[f] for f in (*FILL_FIELDS, "external_id")
+            if survivor[f] in (None, "") and source[f] not in (None, "") and f not in filled[survivor_id]
+        }
+        filled[survivor_id].update(supplied)
+        filled_from[(survivor_id, merged_id)] = supplied
+
+    await db.execute(
+        update(DuplicateCandidate)
+        .where(and_(
+            DuplicateCandidate.entity_type == "Account",
+            DuplicateCandidate.status != "Merged",
+            or_(*[
+                and_(DuplicateCandidate.entity_a_id == min(s, m), DuplicateCandidate.entity_b_id == max(s, m))
+                for s, m in pairs
+            ]),
+        ))
+        .values(status="Merged", resolved_by=user_id, resolved_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(DuplicateCandidate)
+        .where(and_(
+            DuplicateCandidate.entity_type == "Account",
+            DuplicateCandidate.status == "Open",
+            or_(DuplicateCandidate.entity_a_id.in_(merged_ids), DuplicateCandidate.entity_b_id.in_(merged_ids)),
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+    # Delete first so the merged accounts' external_ids are free for the survivors
+    await db.execute(
+        delete(Account).where(Account.id.in_(merged_ids)).execution_options(synchronize_session=False)
+    )
+    now = datetime.now(timezone.utc)
+    by_keys = defaultdict(list)
+    for survivor_id, changes in filled.items():
+        if changes:
+            by_keys[tuple(sorted(changes))].append({"id": survivor_id, "updated_at": now, **changes})
+    for updates in by_keys.values():
+        await db.execute(update(Account), updates)
+
+    mark_summaries_stale(db, survivor_ids)
+
+    await write_audit_logs_bulk(db, [
+        audit_entry(
+            user_id, "Update", "Account", survivor_id, "merged_account_id", None, merged_id,
+            metadata={
+                "merge": True,
+                "merged_account_name": snapshot[merged_id]["name"],
+                "merged_external_id": snapshot[merged_id]["external_id"],
+                "references": dict(moved[merged_id]),
+                "filled": {f: str(v) for f, v in filled_from[(survivor_id, merged_id)].items()},
+            },
+        )
+        for survivor_id, merged_id in pairs
+    ])
+
+    totals = defaultdict(int)
+    for tables in moved.values():
+        for table, count in tables.items():
+            totals[table] += count
+    return {
+        "merged": len(pairs),
+        "references": dict(totals),
+        "tags_added": tags_added,
+        "enrollments_cancelled": cancelled,
+    }
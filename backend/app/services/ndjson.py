@@ -0,0 +1,37 @@
+"""
+NDJSON streaming mode for list endpoints (?format=ndjson).
+
+Integrations that want every matching row get one JSON object per line instead
+of a page. The list query (same filters and order, no LIMIT/OFFSET, no count)
+runs through a server-side cursor (AsyncSession.stream with yield_per) and
+each partition is serialized and written as soon as it is fetched, so memory
+stays at one partition and the first bytes go out after the first partition
+whatever the size of the result.
+
+The body is produced after the route returns, when the request's session has
+already been committed and closed, so the stream reads on its own session.
+Auth and filter validation have run by then; errors surface as normal
+responses before any bytes are sent.
+"""
+from typing import Callable
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Row, Select
+
+from app.db.session import async_session_factory
+
+FORMATS = "^(json|ndjson)$"
+MEDIA_TYPE = "application/x-ndjson"
+BATCH_SIZE = 500
+
+
+def ndjson_response(query: Select, to_item: Callable[[Row], BaseModel], batch_size: int = BATCH_SIZE) -> StreamingResponse:
+    """Stream `query` as NDJSON; to_item turns each result row into its response schema."""
+    async def lines():
+        async with async_session_factory() as session:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                yield "".join(to_item(row).model_dump_json() + "\n" for row in partition)
+
+    return StreamingResponse(lines(), media_type=MEDIA_TYPE)
@@ -0,0 +1,94 @@
+"""
+In-app notifications and the reminder dispatcher.
+
+The dispatcher claims due reminders through idx_reminders_date (partial on
+pending rows) and marks the batch delivered with one UPDATE ... RETURNING, then
+writes the batch's notifications in one multi-row INSERT and optionally emails
+the reminder owners.
+"""
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Reminder, Notification, User
+from app.services.email_outbox import queue_emails
+from app.services.mailer import EmailMessage
+
+BATCH_SIZE = 500
+MAX_BATCHES_PER_TICK = 20
+
+
+async def create_notifications(db: AsyncSession, rows: list[dict]):
+    """Insert many notifications at once. Rows without a user_id are dropped."""
+    rows = [r for r in rows if r.get("user_id")]
+    if rows:
+        await db.execute(pg_insert(Notification), rows)
+
+
+async def _deliver_batch(db: AsyncSession, now: datetime) -> int:
+    due = (
+        select(Reminder.id)
+        .where(and_(
+            ~Reminder.is_dismissed,
+            Reminder.delivered_at.is_(None),
+            Reminder.reminder_date <= now,
+        ))
+        .order_by(Reminder.reminder_date)
+        .limit(BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(Reminder)
+        .where(Reminder.id.in_(due.scalar_subquery()))
+        .values(delivered_at=now)
+        .returning(
+            Reminder.id, Reminder.created_by, Reminder.message,
+            Reminder.linked_entity_type, Reminder.linked_entity_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    delivered = result.all()
+    if not delivered:
+        return 0
+
+    await create_notifications(db, [
+        {
+            "id": uuid.uuid4(),
+            "user_id": r.created_by,
+            "title": "Reminder",
+            "message": r.message,
+            "linked_entity_type": r.linked_entity_type,
+            "linked_entity_id": r.linked_entity_id,
+            "source": "Reminder",
+            "source_id": r.id,
+        }
+        for r in delivered
+    ])
+
+    if settings.REMINDER_EMAILS:
+        user_ids = {r.created_by for r in delivered if r.created_by}
+        emails = dict((await db.execute(
+            select(User.id, User.email).where(and_(User.id.in_(user_ids), User.is_active.is_(True)))
+        )).all()) if user_ids else {}
+        await queue_emails(db, [
+            EmailMessage(to=emails[r.created_by], subject=f"Reminder: {r.message[:80]}", body=r.message)
+            for r in delivered if r.created_by in emails
+        ], source="reminder")
+
+    return len(delivered)
+
+
+async def dispatch_due_reminders(db: AsyncSession) -> dict:
+    """One dispatcher tick: deliver due reminders batch by batch (bounded per tick)."""
+    now = datetime.now(timezone.utc)
+    delivered = 0
+    for _ in range(MAX_BATCHES_PER_TICK):
+        count = await _deliver_batch(db, now)
+        delivered += count
+        if count < BATCH_SIZE:
+            break
+    return {"reminders_delivered": delivered}
@@ -0,0 +1,318 @@
+"""
+Nurture sequence scheduler.
+
+Every active enrollment carries next_due_at, the time its next step becomes due,
+indexed by idx_enrollments_next_due (partial on status = 'Active'). Each tick
+claims the earliest due enrollments with FOR UPDATE SKIP LOCKED, so only due
+rows are read and concurrent workers never pick the same enrollment. Steps for
+the whole batch are executed with multi-row inserts (tasks, communication logs,
+step executions) and the enrollments are advanced in one executemany UPDATE.
+
+Semantics: current_step_order is the last executed step (0 = none yet) and a
+step's delay_days counts from the previous step (or from enrollment for step 1).
+"Send Email" steps render the template, record the outbound CommunicationLog and
+queue the message in the email outbox, which sends it after commit and stamps
+the log's sent_at on delivery; "Internal Notification" steps post to the
+owner's in-app notification feed.
+"""
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, and_, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import (
+    NurtureSequence, SequenceEnrollment, SequenceStep, SequenceStepExecution,
+    Prospect, Account, Task, CommunicationLog,
+)
+from app.services.account_summaries import comm_log_accounts, mark_summaries_stale
+from app.services.audit import audit_bulk
+from app.services.email_outbox import queue_emails
+from app.services.email_templates import agency_context, load_templates, render
+from app.services.mailer import EmailMessage
+from app.services.notifications import create_notifications
+
+BATCH_SIZE = 500
+MAX_BATCHES_PER_TICK = 20
+
+
+async def _claim_due(db: AsyncSession, now: datetime, limit: int):
+    result = await db.execute(
+        select(
+            SequenceEnrollment.id,
+            SequenceEnrollment.sequence_id,
+            SequenceEnrollment.prospect_id,
+            SequenceEnrollment.account_id,
+            SequenceEnrollment.current_step_order,
+            SequenceEnrollment.enrolled_at,
+        )
+        .where(and_(SequenceEnrollment.status == "Active", SequenceEnrollment.next_due_at <= now))
+        .order_by(SequenceEnrollment.next_due_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return result.all()
+
+
+async def _load_steps(db: AsyncSession, sequence_ids) -> dict[uuid.UUID, list]:
+    """Active steps per sequence, ordered by step_order."""
+    result = await db.execute(
+        select(SequenceStep)
+        .where(and_(SequenceStep.sequence_id.in_(sequence_ids), SequenceStep.is_active.is_(True)))
+        .order_by(SequenceStep.sequence_id, SequenceStep.step_order)
+    )
+    steps = defaultdict(list)
+    for step in result.scalars().all():
+        steps[step.sequence_id].append(step)
+    return steps
+
+
+async def _load_targets(db: AsyncSession, enrollments) -> dict[uuid.UUID, dict]:
+    """Merge context + owner for every prospect/account in the batch, one query per type."""
+    prospect_ids = {e.prospect_id for e in enrollments if e.prospect_id}
+    account_ids = {e.account_id for e in enrollments if e.account_id}
+    targets = {}
+    if prospect_ids:
+        result = await db.execute(
+            select(Prospect.id, Prospect.first_name, Prospect.last_name, Prospect.business_name,
+                   Prospect.email, Prospect.assigned_producer_id)
+            .where(Prospect.id.in_(prospect_ids))
+        )
+        for p in result.all():
+            targets[p.id] = {
+                "entity_type": "Prospect",
+                "owner_id": p.assigned_producer_id,
+                "email": p.email,
+                "first_name": p.first_name,
+                "last_name": p.last_name,
+                "full_name": f"{p.first_name} {p.last_name}",
+                "business_name": p.business_name,
+            }
+    if account_ids:
+        result = await db.execute(
+            select(Account.id, Account.name, Account.email, Account.assigned_csr_id, Account.assigned_producer_id)
+            .where(Account.id.in_(account_ids))
+        )
+        for a in result.all():
+            targets[a.id] = {
+                "entity_type": "Account",
+                "owner_id": a.assigned_csr_id or a.assigned_producer_id,
+                "email": a.email,
+                "account_name": a.name,
+                "full_name": a.name,
+            }
+    return targets
+
+
+def _next_step(steps: list, after_order: int):
+    for step in steps:
+        if step.step_order > after_order:
+            return step
+    return None
+
+
+async def process_due_batch(db: AsyncSession, now: datetime, limit: int = BATCH_SIZE) -> int:
+    """Claim and execute one batch of due enrollments. Returns the number claimed."""
+    enrollments = await _claim_due(db, now, limit)
+    if not enrollments:
+        return 0
+
+    steps_by_seq = await _load_steps(db, {e.sequence_id for e in enrollments})
+    targets = await _load_targets(db, enrollments)
+    templates = await load_templates(
+        db, (s.email_template_id for steps in steps_by_seq.values() for s in steps)
+    )
+    base_context = agency_context()
+
+    tasks, comm_logs, messages, notifications, executions, enrollment_updates = [], [], [], [], [], []
+
+    for e in enrollments:
+        steps = steps_by_seq.get(e.sequence_id, [])
+        step = _next_step(steps, e.current_step_order)
+        target_id = e.prospect_id or e.account_id
+        target = targets.get(target_id)
+
+        if step is None or target is None:
+            enrollment_updates.append({
+                "id": e.id, "status": "Completed", "completed_at": now, "next_due_at": None,
+            })
+            continue
+
+        # Newly enrolled rows default to due-now; honour the first step's delay
+        if e.current_step_order == 0 and e.enrolled_at + timedelta(days=step.delay_days) > now:
+            enrollment_updates.append({
+                "id": e.id, "next_due_at": e.enrolled_at + timedelta(days=step.delay_days),
+            })
+            continue
+
+        context = {**base_context, **target}
+        result = "Skipped"
+        comm_log_id = None
+
+        if step.action_type == "Send Email":
+            template = templates.get(step.email_template_id)
+            if template and target["email"]:
+                message = EmailMessage(
+                    to=target["email"],
+                    subject=render(template.subject, context),
+                    body=render(template.body_text or template.body_html, context),
+                    html=render(template.body_html, context),
+                )
+                messages.append(message)
+                comm_log_id = uuid.uuid4()
+                comm_logs.append({
+                    "id": comm_log_id,
+                    "direction": "Outbound",
+                    "channel": "Email",
+                    "subject": message.subject[:500],
+                    "body_preview": message.body[:500],
+                    "linked_entity_type": target["entity_type"],
+                    "linked_entity_id": target_id,
+                    "user_id": target["owner_id"],
+                    "template_id": template.id,
+                    "logged_at": now,
+                })
+                # Queued in this transaction: the outbox delivers it once the batch commits
+                result = "Sent"
+        elif step.action_type == "Internal Notification" and target["owner_id"]:
+            # No owner means nobody to notify; recorded as Skipped
+            spec = step.task_template_json or {}
+            notifications.append({
+                "id": uuid.uuid4(),
+                "user_id": target["owner_id"],
+                "title": render(spec.get("title") or f"Nurture: {context['full_name']}", context)[:255],
+                "message": render(spec.get("description"), context),
+                "linked_entity_type": target["entity_type"],
+                "linked_entity_id": target_id,
+                "source": "Nurture",
+                "source_id": e.id,
+            })
+            result = "Sent"
+        elif step.action_type == "Create Task":
+            spec = step.task_template_json or {}
+            tasks.append({
+                "id": uuid.uuid4(),
+                "title": render(spec.get("title") or f"Follow up: {context['full_name']}", context)[:500],
+                "description": render(spec.get("description"), context),
+                "linked_entity_type": target["entity_type"],
+                "linked_entity_id": target_id,
+                "assigned_to": target["owner_id"],
+                "due_date": (now + timedelta(days=spec.get("due_in_days", 0))).date(),
+                "priority": spec.get("priority", "Medium"),
+                "source": "Automation",
+            })
+            result = "Task Created"
+
+        executions.append({
+            "id": uuid.uuid4(),
+            "enrollment_id": e.id,
+            "step_id": step.id,
+            "executed_at": now,
+            "result": result,
+            "comm_log_id": comm_log_id,
+        })
+
+        following = _next_step(steps, step.step_order)
+        if following:
+            enrollment_updates.append({
+                "id": e.id,
+                "current_step_order": step.step_order,
+                "next_due_at": now + timedelta(days=following.delay_days),
+            })
+        else:
+            enrollment_updates.append({
+                "id": e.id,
+                "current_step_order": step.step_order,
+                "status": "Completed",
+                "completed_at": now,
+                "next_due_at": None,
+            })
+
+    if comm_logs:
+        await db.execute(pg_insert(CommunicationLog), comm_logs)
+        await queue_emails(db, messages, [c["id"] for c in comm_logs], source="nurture_sequence")
+        mark_summaries_stale(db, comm_log_accounts(comm_logs))
+        await audit_bulk(db, None, "EmailSent", "CommunicationLog", [c["id"] for c in comm_logs],
+                         meta={"source": "nurture_sequence"})
+    if tasks:
+        await db.execute(pg_insert(Task), tasks)
+        await audit_bulk(db, None, "Create", "Task", [t["id"] for t in tasks],
+                         meta={"source": "nurture_sequence"})
+    await create_notifications(db, notifications)
+    if executions:
+        await db.execute(pg_insert(SequenceStepExecution), executions)
+
+    # Group by key set so each executemany UPDATE has uniform parameters
+    by_keys = defaultdict(list)
+    for row in enrollment_updates:
+        by_keys[tuple(sorted(row))].append(row)
+    for rows in by_keys.values():
+        await db.execute(update(SequenceEnrollment), rows)
+
+    return len(enrollments)
+
+
+async def run_nurture_scheduler(db: AsyncSession) -> dict:
+    """One scheduler tick: keep claiming due batches until none remain (bounded per tick)."""
+    now = datetime.now(timezone.utc)
+    processed = 0
+    for _ in range(MAX_BATCHES_PER_TICK):
+        claimed = await process_due_batch(db, now)
+        processed += claimed
+        if claimed < BATCH_SIZE:
+            break
+    return {"enrollments_processed": processed}
+
+
+# ---------- Enrollment ----------
+
+async def bulk_enroll(db: AsyncSession, sequence: NurtureSequence, conditions: list, user_id) -> dict:
+    """
+    Enroll every prospect (or account, for Client sequences) matching conditions
+    with one INSERT ... SELECT. Anyone already actively enrolled in the sequence is
+    skipped by the uq_enrollments_active_* partial unique indexes.
+    """
+    if sequence.target_type == "Prospect":
+        model, target_col = Prospect, "prospect_id"
+    else:
+        model, target_col = Account, "account_id"
+
+    first_delay = (await db.execute(
+        select(SequenceStep.delay_days)
+        .where(and_(SequenceStep.sequence_id == sequence.id, SequenceStep.is_active.is_(True)))
+        .order_by(SequenceStep.step_order)
+        .limit(1)
+    )).scalar() or 0
+
+    matched = (await db.execute(
+        select(func.count(model.id)).where(*conditions)
+    )).scalar() or 0
+
+    audience = select(
+        func.uuid_generate_v4(),
+        literal(sequence.id, UUID(as_uuid=True)),
+        model.id,
+        literal(0),
+        literal("Active"),
+        func.now(),
+        func.now() + timedelta(days=first_delay),
+    ).where(*conditions)
+
+    stmt = (
+        pg_insert(SequenceEnrollment)
+        .from_select(
+            ["id", "sequence_id", target_col, "current_step_order", "status", "enrolled_at", "next_due_at"],
+            audience,
+            include_defaults=False,
+        )
+        .on_conflict_do_nothing()
+        .returning(SequenceEnrollment.id)
+    )
+    enrolled_ids = (await db.execute(stmt)).scalars().all()
+
+    await audit_bulk(db, user_id, "Create", "SequenceEnrollment", enrolled_ids,
+                     meta={"sequence_id": str(sequence.id), "bulk": True})
+
+    return {"matched": matched, "enrolled": len(enrolled_ids), "skipped": matched - len(enrolled_ids)}
@@ -0,0 +1,114 @@
+"""
+Bulk reassignment of a user's book to another user (staff turnover, rebalancing).
+
+Each kind of assignment moves with one UPDATE ... RETURNING id:
+  - accounts: assigned_producer_id, assigned_csr_id
+  - policies: servicing_owner_id, producing_agent_id (Active policies only, so
+    historical sales and commissions stay with the agent who wrote them)
+  - open tasks and open service items: assigned_to
+  - open prospects: assigned_producer_id
+An optional account filter narrows accounts and the policies, service items and
+tasks that belong to them; a prospect filter narrows prospects. The returned ids
+are audited with one bulk insert per field, and the receiving user gets an
+in-app notification summarizing the move. Everything runs in the caller's
+transaction.
+"""
+import uuid
+from typing import Optional
+
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import User, Account, Policy, Task, ServiceItem, Prospect
+from app.schemas.schemas import AccountFilter, ProspectFilter
+from app.services.audit import audit_bulk
+from app.services.filters import account_conditions, prospect_conditions
+from app.services.notifications import create_notifications
+from app.services.service_items import OPEN_STATUSES_EXCLUDED, OPEN_TASK_STATUSES
+
+SCOPES = ("accounts", "policies", "tasks", "service_items", "prospects")
+CLOSED_PIPELINE_STAGES = ("Closed-Won", "Closed-Lost")
+
+LABELS = {
+    "accounts.assigned_producer_id": "accounts (producer)",
+    "accounts.assigned_csr_id": "accounts (CSR)",
+    "policies.servicing_owner_id": "policies (servicing)",
+    "policies.producing_agent_id": "policies (producing agent)",
+    "service_items.assigned_to": "service items",
+    "tasks.assigned_to": "open tasks",
+    "prospects.assigned_producer_id": "prospects",
+}
+
+
+async def reassign_book(
+    db: AsyncSession,
+    from_user_id: uuid.UUID,
+    to_user_id: uuid.UUID,
+    actor: User,
+    include: tuple[str, ...] = SCOPES,
+    accounts: Optional[AccountFilter] = None,
+    prospects: Optional[ProspectFilter] = None,
+) -> dict:
+    """Move from_user's assignments to to_user. Returns {field: count} plus a total."""
+    scoped_accounts = None
+    if accounts is not None:
+        scoped_accounts = select(Account.id).where(*account_conditions(accounts, actor))
+    meta = {"reassignment": True, "from_user_id": str(from_user_id), "to_user_id": str(to_user_id)}
+    counts = {}
+
+    async def move(model, column, entity_type: str, *conditions):
+        result = await db.execute(
+            update(model)
+            .where(and_(column == from_user_id, *conditions))
+            .values({column.key: to_user_id})
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        ids = result.scalars().all()
+        await audit_bulk(db, actor.id, "Update", entity_type, ids, column.key, from_user_id, to_user_id, meta=meta)
+        counts[f"{model.__tablename__}.{column.key}"] = len(ids)
+
+    if "accounts" in include:
+        scope = [Account.id.in_(scoped_accounts)] if scoped_accounts is not None else []
+        await move(Account, Account.assigned_producer_id, "Account", *scope)
+        await move(Account, Account.assigned_csr_id, "Account", *scope)
+
+    if "policies" in include:
+        scope = [Policy.account_id.in_(scoped_accounts)] if scoped_accounts is not None else []
+        await move(Policy, Policy.servicing_owner_id, "Policy", Policy.status == "Active", *scope)
+        await move(Policy, Policy.producing_agent_id, "Policy", Policy.status == "Active", *scope)
+
+    if "service_items" in include:
+        scope = [ServiceItem.account_id.in_(scoped_accounts)] if scoped_accounts is not None else []
+        await move(ServiceItem, ServiceItem.assigned_to, "ServiceItem",
+                   ServiceItem.status.not_in(OPEN_STATUSES_EXCLUDED), *scope)
+
+    if "tasks" in include:
+        scope = []
+        if scoped_accounts is not None:
+            # Tasks on the scoped accounts or on their policies
+            scope.append(or_(
+                and_(Task.linked_entity_type == "Account", Task.linked_entity_id.in_(scoped_accounts)),
+                and_(Task.linked_entity_type == "Policy", Task.linked_entity_id.in_(
+                    select(Policy.id).where(Policy.account_id.in_(scoped_accounts))
+                )),
+            ))
+        await move(Task, Task.assigned_to, "Task", Task.status.in_(OPEN_TASK_STATUSES), *scope)
+
+    if "prospects" in include:
+        scope = prospect_conditions(prospects, actor) if prospects is not None else []
+        await move(Prospect, Prospect.assigned_producer_id, "Prospect",
+                   Prospect.pipeline_stage.not_in(CLOSED_PIPELINE_STAGES), *scope)
+
+    total = sum(counts.values())
+    if total:
+        from_name = (await db.execute(select(User.name).where(User.id == from_user_id))).scalar()
+        summary = ", ".join(f"{n} {LABELS[field]}" for field, n in counts.items() if n)
+        await create_notifications(db, [{
+            "id": uuid.uuid4(),
+            "user_id": to_user_id,
+            "title": f"Book reassigned to you from {from_name}"[:255],
+            "message": summary,
+            "source": "Reassignment",
+        }])
+    return {"moved": counts, "total": total}
@@ -0,0 +1,141 @@
+"""
+Nightly renewal and mid-term review generator for the service board.
+
+Both item types are created with a single INSERT ... SELECT over policies:
+  - Renewal: Active policies whose expiration_date falls inside the renewal
+    window (range scan on idx_policies_expiration).
+  - MidTermReview: Active policies whose term midpoint is within the lead time
+    (or passed within the grace period, so policies already past mid-term on
+    the first run don't flood the board).
+A policy is skipped if it already has an open item of that type, or any item of
+that type created during the current cycle (so completing an item does not make
+the next run recreate it). Owners come from servicing_owner_id, falling back to
+the account's CSR.
+
+renewal_status is then reconciled set-wise: policies replaced by a renewal term
+(a policy pointing at them through prior_policy_id) become 'Bound'.
+"""
+from datetime import timedelta
+
+from sqlalchemy import select, update, and_, func, literal, case, exists, union_all, Date
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Policy, Account
+from app.services.audit import audit_bulk
+from app.services.account_summaries import mark_summaries_stale
+from app.services.service_items import insert_service_items_from, open_item_exists
+
+RENEWAL_OPEN_STATUSES = ["Not Started", "Contacted", "Awaiting Insured", "Quoted", "Proposal Sent"]
+
+
+def _owner():
+    return func.coalesce(Policy.servicing_owner_id, Account.assigned_csr_id)
+
+
+def _policy_label():
+    return func.concat(Policy.line_of_business, " ", func.coalesce(Policy.policy_number, ""))
+
+
+def _renewal_source():
+    today = func.current_date()
+    window = timedelta(days=settings.RENEWAL_WINDOW_DAYS)
+    days_left = Policy.expiration_date - today  # date - date = integer days
+
+    return (
+        select(
+            literal("Renewal"),
+            Policy.account_id,
+            Policy.id,
+            func.concat("Renewal: ", _policy_label(), " expires ", Policy.expiration_date),
+            _owner(),
+            func.greatest(today, Policy.expiration_date - timedelta(days=14)).cast(Date),
+            case((days_left <= 14, "Critical"), (days_left <= 30, "High"), else_="Medium"),
+        )
+        .join(Account, Account.id == Policy.account_id)
+        .where(and_(
+            Policy.status == "Active",
+            Policy.renewal_status.in_(RENEWAL_OPEN_STATUSES),
+            Policy.expiration_date >= today,
+            Policy.expiration_date <= today + window,
+            ~open_item_exists("Renewal", Policy.id, since=Policy.expiration_date - window),
+        ))
+    )
+
+
+def _midterm_source():
+    today = func.current_date()
+    # Integer division keeps this a date (date + integer days)
+    midpoint = Policy.effective_date + (Policy.expiration_date - Policy.effective_date).self_group().op("/")(2)
+
+    return (
+        select(
+            literal("MidTermReview"),
+            Policy.account_id,
+            Policy.id,
+            func.concat("Mid-term review: ", _policy_label()),
+            _owner(),
+            func.greatest(today, midpoint).cast(Date),
+            literal("Low"),
+        )
+        .join(Account, Account.id == Policy.account_id)
+        .where(and_(
+            Policy.status == "Active",
+            Policy.expiration_date > today,
+            midpoint <= today + timedelta(days=settings.MIDTERM_REVIEW_LEAD_DAYS),
+            midpoint >= today - timedelta(days=settings.MIDTERM_REVIEW_GRACE_DAYS),
+            ~open_item_exists("MidTermReview", Policy.id, since=Policy.effective_date),
+        ))
+    )
+
+
+async def generate_service_items(db: AsyncSession) -> list:
+    """Create due Renewal and MidTermReview items. Returns (id, type, account_id) rows."""
+    return await insert_service_items_from(db, union_all(_renewal_source(), _midterm_source()))
+
+
+async def reconcile_renewal_status(db: AsyncSession) -> list:
+    """Mark policies that have a renewal term on file as Bound. Returns (id, old status) rows."""
+    successor = aliased(Policy)
+    before = (
+        select(Policy.id, Policy.renewal_status.label("old_status"))
+        .where(and_(
+            Policy.renewal_status.in_(RENEWAL_OPEN_STATUSES),
+            exists().where(and_(
+                successor.prior_policy_id == Policy.id,
+                successor.status == "Active",
+            )),
+        ))
+        .subquery()
+    )
+    # UPDATE ... FROM reads the pre-update snapshot, so old_status is the prior value
+    result = await db.execute(
+        update(Policy)
+        .where(Policy.id == before.c.id)
+        .values(renewal_status="Bound", updated_at=func.now())
+        .returning(Policy.id, before.c.old_status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.all()
+
+
+async def run_renewal_generator(db: AsyncSession) -> dict:
+    created = await generate_service_items(db)
+    await audit_bulk(db, None, "Create", "ServiceItem", [row.id for row in created],
+                     meta={"source": "renewal_generator"})
+    mark_summaries_stale(db, {row.account_id for row in created})
+
+    bound = await reconcile_renewal_status(db)
+    by_old = {}
+    for policy_id, old in bound:
+        by_old.setdefault(old, []).append(policy_id)
+    for old, ids in by_old.items():
+        await audit_bulk(db, None, "StatusChange", "Policy", ids, field="renewal_status",
+                         old_val=old, new_val="Bound", meta={"source": "renewal_generator"})
+
+    return {
+        "renewal_items": sum(1 for row in created if row.type == "Renewal"),
+        "midterm_reviews": sum(1 for row in created if row.type == "MidTermReview"),
+        "policies_bound": len(bound),
+    }
@@ -0,0 +1,53 @@
+"""
+Set-based service item creation for the batch generators (renewals, installments).
+"""
+from sqlalchemy import select, func, literal, and_, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import ServiceItem
+
+OPEN_STATUSES_EXCLUDED = ["Completed", "Closed"]
+OPEN_TASK_STATUSES = ("Open", "In Progress")
+
+# Columns the source SELECT must provide, in this order
+SOURCE_COLUMNS = ["type", "account_id", "policy_id", "description", "assigned_to", "due_date", "urgency"]
+
+
+def open_item_exists(item_type: str, policy_id_col, since=None):
+    """
+    EXISTS clause for dedupe: an open item of this type on the policy, or (with
+    since) any item of this type created on or after that date, even if closed.
+    """
+    current = ServiceItem.status.notin_(OPEN_STATUSES_EXCLUDED)
+    if since is not None:
+        current = current | (ServiceItem.created_at >= since)
+    return exists().where(and_(
+        ServiceItem.policy_id == policy_id_col,
+        ServiceItem.type == item_type,
+        current,
+    ))
+
+
+async def insert_service_items_from(db: AsyncSession, source) -> list:
+    """
+    INSERT ... SELECT service items. source selects SOURCE_COLUMNS in order;
+    id, status and timestamps are filled in here. Returns (id, type, account_id) rows.
+    """
+    src = source.subquery()
+    stmt = (
+        pg_insert(ServiceItem)
+        .from_select(
+            ["id", *SOURCE_COLUMNS, "status", "created_at", "updated_at"],
+            select(
+                func.uuid_generate_v4(),
+                *[src.c[i] for i in range(len(SOURCE_COLUMNS))],
+                literal("Not Started"),
+                func.now(),
+                func.now(),
+            ),
+            include_defaults=False,
+        )
+        .returning(ServiceItem.id, ServiceItem.type, ServiceItem.account_id)
+    )
+    return (await db.execute(stmt)).all()
@@ -0,0 +1,238 @@
+"""
+Document storage backends.
+
+Bytes always move in DOCUMENT_CHUNK_SIZE pieces: uploads are re-chunked from the
+request stream and written one chunk at a time, downloads read one chunk at a
+time, so memory per transfer is bounded by the chunk size whatever the file size.
+
+- LocalStorage: files under DOCUMENT_STORAGE_PATH (development, tests).
+- OneDriveStorage: Graph upload sessions (through the shared Graph client), one
+  PUT per chunk with Content-Range; a failed chunk is retried from the
+  session's nextExpectedRanges.
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.graph import GraphClient, GraphError, get_graph_client, graph_configured
+
+CHUNK_SIZE = settings.DOCUMENT_CHUNK_SIZE
+CHUNK_RETRIES = 3
+
+
+class StorageError(Exception):
+    pass
+
+
+@dataclass
+class StoredObject:
+    ref: str  # local relative path, or OneDrive item id
+    size: int
+
+
+async def fixed_chunks(stream: AsyncIterator[bytes], chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Re-chunk an arbitrary byte stream into chunk_size pieces (the last may be shorter)."""
+    buffer = bytearray()
+    async for data in stream:
+        buffer.extend(data)
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class StorageBackend(ABC):
+    @abstractmethod
+    async def upload(self, key: str, chunks: AsyncIterator[bytes], size: int) -> StoredObject:
+        """Store exactly `size` bytes from chunks under key."""
+
+    @abstractmethod
+    def download(self, ref: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) of the stored object."""
+
+    @abstractmethod
+    async def delete(self, ref: str):
+        """Remove the stored object; removing one that is already gone is not an error."""
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def _path(self, ref: str) -> Path:
+        path = (self.root / ref).resolve()
+        if self.root not in path.parents:
+            raise StorageError("Invalid storage path")
+        return path
+
+    async def upload(self, key: str, chunks: AsyncIterator[bytes], size: int) -> StoredObject:
+        path = self._path(key)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.part")
+        written = 0
+        f = await asyncio.to_thread(open, partial, "wb")
+        try:
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > size:
+                    raise StorageError("Body exceeds declared Content-Length")
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            if written != size:
+                raise StorageError("Body shorter than declared Content-Length")
+            await asyncio.to_thread(os.replace, partial, path)
+        except BaseException:
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(partial.unlink, missing_ok=True)
+            raise
+        return StoredObject(ref=key, size=written)
+
+    async def download(self, ref: str, start: int, end: int) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._path(ref), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def delete(self, ref: str):
+        await asyncio.to_thread(self._path(ref).unlink, missing_ok=True)
+
+
+@contextmanager
+def _graph_errors():
+    """Graph failures surface as StorageError, which upload and sweep callers handle."""
+    try:
+        yield
+    except GraphError as e:
+        raise StorageError(f"OneDrive request failed: {e}") from e
+
+
+class OneDriveStorage(StorageBackend):
+    def __init__(self, drive_id: str, root_folder: str):
+        self.drive_id = drive_id
+        self.root_folder = root_folder.strip("/")
+
+    async def upload(self, key: str, chunks: AsyncIterator[bytes], size: int) -> StoredObject:
+        with _graph_errors():
+            return await self._upload(key, chunks, size)
+
+    async def _upload(self, key: str, chunks: AsyncIterator[bytes], size: int) -> StoredObject:
+        graph = get_graph_client()
+        session = await graph.request_json(
+            "POST", f"drives/{self.drive_id}/root:/{self.root_folder}/{key}:/createUploadSession",
+            json={"item": {"@microsoft.graph.conflictBehavior": "replace"}},
+        )
+        upload_url = session["uploadUrl"]
+
+        offset, item = 0, None
+        try:
+            async for chunk in chunks:
+                if offset + len(chunk) > size:
+                    raise StorageError("Body exceeds declared Content-Length")
+                item = await self._put_chunk(graph, upload_url, chunk, offset, size)
+                offset += len(chunk)
+            if offset != size or item is None:
+                raise StorageError("Body shorter than declared Content-Length")
+        except BaseException:
+            # Upload URLs are pre-authenticated; deleting cancels the session
+            try:
+                await graph.request("DELETE", upload_url, auth=False)
+            except httpx.HTTPError:
+                pass
+            raise
+        return StoredObject(ref=item["id"], size=size)
+
+    async def _put_chunk(self, graph: GraphClient, upload_url: str, chunk: bytes, offset: int, size: int):
+        """PUT one fragment; on failure resume from the session's next expected byte."""
+        sent = 0
+        for attempt in range(CHUNK_RETRIES + 1):
+            data = chunk[sent:]
+            start = offset + sent
+            try:
+                response = await graph.request("PUT", upload_url, auth=False, content=data, headers={
+                    "Content-Length": str(len(data)),
+                    "Content-Range": f"bytes {start}-{start + len(data) - 1}/{size}",
+                })
+                if response.status_code in (200, 201):
+                    return response.json()
+                if response.status_code == 202:
+                    return None
+                if response.status_code < 500:
+                    raise StorageError(f"Upload fragment rejected: {response.status_code} {response.text[:200]}")
+            except httpx.TransportError:
+                if attempt == CHUNK_RETRIES:
+                    raise
+            await asyncio.sleep(2 ** attempt)
+            status = await graph.request_json("GET", upload_url, auth=False)
+            next_start = int(status["nextExpectedRanges"][0].split("-")[0])
+            sent = max(0, min(next_start - offset, len(chunk)))
+            if sent == len(chunk):
+                return None
+        raise StorageError("Upload fragment failed after retries")
+
+    async def download(self, ref: str, start: int, end: int) -> AsyncIterator[bytes]:
+        with _graph_errors():
+            graph = get_graph_client()
+            async with graph.stream("GET", f"drives/{self.drive_id}/items/{ref}/content",
+                                    headers={"Range": f"bytes={start}-{end}"}) as response:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    yield chunk
+
+    async def delete(self, ref: str):
+        # Item ids never contain '/'; upload guards refer to the upload path instead
+        if "/" in ref:
+            path = f"drives/{self.drive_id}/root:/{self.root_folder}/{ref}"
+        else:
+            path = f"drives/{self.drive_id}/items/{ref}"
+        with _graph_errors():
+            response = await get_graph_client().request("DELETE", path)
+        if response.status_code not in (204, 404):
+            raise StorageError(f"OneDrive delete failed: {response.status_code}")
+
+
+_local: Optional[LocalStorage] = None
+_onedrive: Optional[OneDriveStorage] = None
+
+
+def get_local_storage() -> LocalStorage:
+    global _local
+    if _local is None:
+        _local = LocalStorage(settings.DOCUMENT_STORAGE_PATH)
+    return _local
+
+
+def get_onedrive_storage() -> OneDriveStorage:
+    global _onedrive
+    if _onedrive is None:
+        if not settings.ONEDRIVE_DRIVE_ID:
+            raise StorageError("ONEDRIVE_DRIVE_ID is not configured")
+        if not graph_configured():
+            raise StorageError("Microsoft 365 credentials are not configured")
+        _onedrive = OneDriveStorage(settings.ONEDRIVE_DRIVE_ID, settings.ONEDRIVE_ROOT_FOLDER)
+    return _onedrive
+
+
+def get_storage() -> StorageBackend:
+    """Backend for new uploads."""
+    return get_onedrive_storage() if settings.DOCUMENT_STORAGE == "onedrive" else get_local_storage()
+
+
+def storage_for(onedrive_file_id: Optional[str]) -> StorageBackend:
+    """Backend holding an existing document (OneDrive if it has an item id)."""
+    return get_onedrive_storage() if onedrive_file_id else get_local_storage()
@@ -0,0 +1,70 @@
+"""
+Background worker: runs the scheduled batch jobs on fixed intervals.
+
+    python -m app.worker
+
+Each job run gets its own session and transaction. Jobs are written to be
+safe to run concurrently with the API and with another worker instance.
+"""
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.session import async_session_factory, commit
+from app.services.account_summaries import run_account_summary_reconcile
+from app.services.automation import run_date_based_rules
+from app.services.blobs import run_blob_sweep
+from app.services.book_cube import run_book_cube_refresh
+from app.services.commissions import generate_expected_commissions
+from app.services.duplicates import run_duplicate_scan
+from app.services.email_outbox import run_email_outbox
+from app.services.installments import run_installment_job
+from app.services.mail_sync import run_mail_sync
+from app.services.notifications import dispatch_due_reminders
+from app.services.nurture import run_nurture_scheduler
+from app.services.renewals import run_renewal_generator
+
+logger = logging.getLogger("sentinel.worker")
+
+# (name, interval in seconds, coroutine taking a session)
+JOBS = [
+    ("automation", 15 * 60, run_date_based_rules),
+    ("nurture", 60, run_nurture_scheduler),
+    ("reminders", 60, dispatch_due_reminders),
+    ("renewals", 24 * 60 * 60, run_renewal_generator),
+    ("installments", 60 * 60, run_installment_job),
+    ("expected_commissions", 24 * 60 * 60, generate_expected_commissions),
+    ("mail_sync", 5 * 60, run_mail_sync),
+    ("duplicate_scan", 24 * 60 * 60, run_duplicate_scan),
+    ("account_summaries", 6 * 60 * 60, run_account_summary_reconcile),
+    ("book_cube", 60 * 60, run_book_cube_refresh),
+    ("email_outbox", 60, run_email_outbox),
+    ("blob_sweep", 15 * 60, run_blob_sweep),
+]
+
+
+async def run_job(name, job):
+    async with async_session_factory() as session:
+        try:
+            result = await job(session)
+            await commit(session)
+            print(f"🛡️  [{name}] {result}")
+        except Exception:
+            await session.rollback()
+            logger.exception("🛡️  [%s] failed", name)
+
+
+async def schedule(name, interval, job):
+    while True:
+        await run_job(name, job)
+        await asyncio.sleep(interval)
+
+
+async def main():
+    print(f"🛡️  {settings.APP_NAME} worker starting ({len(JOBS)} jobs)...")
+    await asyncio.gather(*(schedule(*j) for j in JOBS))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(main())
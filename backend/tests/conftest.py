@@ -0,0 +1,67 @@
+"""
+Shared fixtures. FakeGraph stands in for Microsoft Graph and the login endpoint
+on an httpx.MockTransport, so GraphClient runs unchanged without a network.
+"""
+import asyncio
+import inspect
+import time
+
+import httpx
+import pytest
+
+from app.services.graph import GraphClient
+
+GRAPH_URL = "https://graph.test/v1.0"
+LOGIN_URL = "https://login.test"
+
+
+class FakeGraph:
+    """
+    Routes map (method, path below the Graph base URL) to a handler taking the
+    httpx.Request; handlers may be async. $batch requests are answered item by
+    item through batch_item(item) -> {"status", "headers", "body"}.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.calls: list[tuple[float, str, str]] = []  # (monotonic time, method, path)
+        self.token_requests = 0
+        self.token_delay = 0.0
+        self.batches: list[list[dict]] = []
+        self.batch_item = lambda item: {"id": item["id"], "status": 200, "body": {"url": item["url"]}}
+
+    def route(self, method: str, path: str, handler):
+        self.routes[(method, path)] = handler
+
+    def calls_to(self, method: str, path: str) -> list[float]:
+        return [t for t, m, p in self.calls if (m, p) == (method, path)]
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.url.host == "login.test":
+            self.token_requests += 1
+            await asyncio.sleep(self.token_delay)
+            return httpx.Response(200, json={"access_token": f"token-{self.token_requests}", "expires_in": 3600})
+
+        path = path.removeprefix("/v1.0")
+        self.calls.append((time.monotonic(), request.method, path))
+        if (request.method, path) == ("POST", "/$batch"):
+            items = httpx.Response(200, content=request.content).json()["requests"]
+            self.batches.append(items)
+            return httpx.Response(200, json={"responses": [
+                {"id": item["id"], **self.batch_item(item)} for item in items
+            ]})
+        handler = self.routes.get((request.method, path))
+        if handler is None:
+            return httpx.Response(404, json={"error": {"code": "itemNotFound"}})
+        response = handler(request)
+        return await response if inspect.isawaitable(response) else response
+
+    def client(self, **kwargs) -> GraphClient:
+        return GraphClient("tenant", "client", "secret", base_url=GRAPH_URL, login_url=LOGIN_URL,
+                           transport=httpx.MockTransport(self.handle), **kwargs)
+
+
+@pytest.fixture
+def fake_graph() -> FakeGraph:
+    return FakeGraph()
@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.db.session import commit
+from app.models.models import ServiceItem
+from app.services import account_summaries
+from app.services.account_summaries import mark_summaries_stale, run_account_summary_reconcile
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Records statements; SELECTs return `ids`, upserts return every id they were given."""
+
+    def __init__(self, ids=()):
+        self.info = {}
+        self.ids = list(ids)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        sql = str(statement.compile(dialect=postgresql.asyncpg.dialect()))
+        self.statements.append((sql, statement.compile().params))
+        if "LIMIT" in sql:  # reconcile paging
+            after = statement.compile().params.get("id_1")
+            page = sorted(i for i in self.ids if after is None or i > after)
+            return FakeResult(page[:statement.compile().params["param_1"]])
+        if "FOR NO KEY UPDATE" in sql:
+            wanted = statement.compile().params["account_ids"]
+            return FakeResult(sorted(i for i in self.ids if i in wanted))
+        if sql.startswith("INSERT INTO account_summaries"):
+            return FakeResult(list(statement.compile().params["account_ids"]))
+        return FakeResult(self.ids)
+
+    async def commit(self):
+        self.commits += 1
+
+    def sql(self, marker):
+        return [s for s, _ in self.statements if marker in s]
+
+
+def test_stale_accounts_are_recomputed_once_at_commit():
+    a, b, c = sorted(uuid.uuid4() for _ in range(3))
+    db = FakeSession([a, b, c])
+
+    mark_summaries_stale(db, [a, None])
+    mark_summaries_stale(db, {b})
+    mark_summaries_stale(db, select(ServiceItem.account_id))
+    assert db.statements == []
+
+    asyncio.run(commit(db))
+    locks = db.sql("FOR NO KEY UPDATE")
+    assert len(locks) == 1 and "ORDER BY accounts.id" in locks[0]
+    assert len(db.sql("INSERT INTO account_summaries")) == 1
+    assert db.commits == 1
+    assert account_summaries.STALE_KEY not in db.info
+
+    asyncio.run(commit(db))  # nothing marked since
+    assert len(db.sql("FOR NO KEY UPDATE")) == 1
+
+
+def test_last_contact_prefers_the_communication_time():
+    sql = str(account_summaries.summary_statement([uuid.uuid4()]).compile(dialect=postgresql.asyncpg.dialect()))
+    assert "max(coalesce(communication_logs.sent_at, communication_logs.logged_at))" in sql
+
+
+def test_reconcile_commits_per_chunk(monkeypatch):
+    monkeypatch.setattr(account_summaries, "RECONCILE_CHUNK", 2)
+    ids = sorted(uuid.uuid4() for _ in range(5))
+    db = FakeSession(ids)
+
+    result = asyncio.run(run_account_summary_reconcile(db))
+    assert result == {"corrected": 5}
+    assert db.commits == 3
+    assert all("SKIP LOCKED" in s for s in db.sql("FOR NO KEY UPDATE"))
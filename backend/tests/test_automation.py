@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.services import automation
+from app.services.automation import RuleCompileError, compile_rule, run_date_based_rules
+
+
+def _rule(assign_to):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        trigger_type="Date-based",
+        trigger_config_json={"entity": "Policy", "date_field": "expiration_date", "days_before": 60},
+        conditions_json=None,
+        actions_json={"actions": [{"type": "create_task", "title": "Call {policy_number}", "assign_to": assign_to}]},
+    )
+
+
+@pytest.mark.parametrize("assign_to", ["servicing_owner_id", str(uuid.uuid4()), None])
+def test_assign_to_accepts_a_field_or_a_user_id(assign_to):
+    compile_rule(_rule(assign_to))
+
+
+def test_assign_to_rejects_anything_else():
+    with pytest.raises(RuleCompileError, match="assign_to"):
+        compile_rule(_rule("the owner"))
+
+
+class FakeSession:
+    def __init__(self, rules):
+        self.rules = rules
+        self.savepoints = []
+
+    async def execute(self, query):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.rules))
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        try:
+            yield
+            self.savepoints.append("released")
+        except Exception:
+            self.savepoints.append("rolled back")
+            raise
+
+    async def flush(self):
+        pass
+
+
+def test_a_failing_rule_is_rolled_back_and_skipped(monkeypatch):
+    good, broken, invalid = _rule(None), _rule(None), _rule("the owner")
+
+    async def evaluate(db, rule):
+        if rule is broken:
+            raise DBAPIError("INSERT ...", {}, Exception("deadlock detected"))
+        compile_rule(rule)
+        return 3
+    monkeypatch.setattr(automation, "evaluate_rule", evaluate)
+
+    db = FakeSession([broken, invalid, good])
+    summary = asyncio.run(run_date_based_rules(db))
+    assert summary["rules"] == 1
+    assert summary["entities"] == 3
+    assert set(summary["errors"]) == {str(broken.id), str(invalid.id)}
+    assert db.savepoints == ["rolled back", "rolled back", "released"]
@@ -0,0 +1,78 @@
+import re
+import sqlite3
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+
+from app.core.config import settings
+from app.services.duplicates import SPECS, _probe, _score
+
+
+def _trigrams(text: str) -> set:
+    """pg_trgm's trigrams: lower-cased words padded with two spaces before and one after."""
+    grams = set()
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _similarity(a, b) -> float:
+    ta, tb = _trigrams(a), _trigrams(b)
+    return len(ta & tb) / len(ta | tb) if ta | tb else 0.0
+
+
+def score(entity_type: str, a: dict, b: dict) -> float:
+    """Evaluate the SQL scoring expression for two probes (SQLite standing in for Postgres)."""
+    expression, _ = _score(SPECS[entity_type], _probe(entity_type, a), _probe(entity_type, b))
+    compiled = select(expression).compile(dialect=sqlite.dialect())
+    # RIGHT is reserved in SQLite; the Postgres builtins are registered as Python functions
+    sql = str(compiled).replace("right(", "right_(")
+    db = sqlite3.connect(":memory:")
+    db.create_function("similarity", 2, _similarity)
+    db.create_function("least", 2, min)
+    db.create_function("right_", 2, lambda s, n: s[-n:] if s is not None else None)
+    db.create_function("regexp_replace", 4, lambda s, p, r, f: re.sub(p, r, s) if s is not None else None)
+    return float(db.execute(sql, [compiled.params[k] for k in compiled.positiontup]).fetchone()[0])
+
+
+def flagged(entity_type: str, a: dict, b: dict) -> bool:
+    return score(entity_type, a, b) >= settings.DUPLICATE_MIN_SCORE
+
+
+def test_same_household_at_the_same_zip_is_flagged():
+    a = {"first_name": "Maria", "last_name": "Lopez", "zip_code": "33101"}
+    b = {"first_name": "Maria", "last_name": "Lopez", "zip_code": "33101", "email": "maria@example.com"}
+    assert flagged("Prospect", a, b)
+    assert flagged("Account", {"name": "Lopez Household", "zip_code": "33101"},
+                   {"name": "Lopez Household", "zip_code": "33101", "phone": "305-555-0100"})
+
+
+def test_near_exact_name_at_the_same_zip_is_flagged():
+    assert flagged("Account", {"name": "Smith Plumbing LLC", "zip_code": "33101"},
+                   {"name": "Smith Plumbing", "zip_code": "33101"})
+
+
+def test_same_name_elsewhere_is_not_flagged():
+    assert not flagged("Prospect", {"first_name": "John", "last_name": "Smith", "zip_code": "33101"},
+                       {"first_name": "John", "last_name": "Smith", "zip_code": "60601"})
+
+
+def test_shared_contact_details_with_a_similar_name_are_flagged():
+    a = {"first_name": "Rob", "last_name": "Jones", "phone": "(305) 555-0100"}
+    b = {"first_name": "Robert", "last_name": "Jones", "phone": "+1 305 555 0100"}
+    assert flagged("Contact", a, b)
+
+
+@pytest.mark.parametrize("entity_type, a, b", [
+    ("Account", {"name": "Acme Roofing", "zip_code": "33101"}, {"name": "Sunrise Bakery", "zip_code": "33101"}),
+    ("Contact", {"first_name": "Ann", "last_name": "Lee"}, {"first_name": "Tom", "last_name": "Ortiz"}),
+])
+def test_unrelated_records_are_not_flagged(entity_type, a, b):
+    assert not flagged(entity_type, a, b)
+
+
+def test_score_is_capped_at_one():
+    a = {"name": "Acme Roofing", "zip_code": "33101", "email": "x@acme.com", "phone": "3055550100"}
+    assert score("Account", a, dict(a)) == 1.0
@@ -0,0 +1,39 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.entities import resolve_entities
+
+
+class FakeSession:
+    def __init__(self):
+        self.sql = []
+
+    async def execute(self, query):
+        self.sql.append(str(query.compile(dialect=postgresql.asyncpg.dialect())))
+        return SimpleNamespace(all=lambda: [])
+
+
+def _resolve(role: str, entity_type: str) -> str:
+    db = FakeSession()
+    user = SimpleNamespace(id=uuid.uuid4(), role=role)
+    asyncio.run(resolve_entities(db, [(entity_type, uuid.uuid4())], user))
+    return db.sql[0]
+
+
+@pytest.mark.parametrize("entity_type, column", [
+    ("Account", "accounts.assigned_producer_id"),
+    ("Contact", "accounts.assigned_producer_id"),
+    ("Policy", "accounts.assigned_producer_id"),
+    ("Prospect", "prospects.assigned_producer_id"),
+])
+def test_producers_only_resolve_their_own_records(entity_type, column):
+    assert f"{column} = " in _resolve("Producer", entity_type)
+
+
+@pytest.mark.parametrize("entity_type", ["Account", "Contact", "Policy", "Prospect"])
+def test_other_roles_are_not_scoped(entity_type):
+    assert "assigned_producer_id" not in _resolve("CSR", entity_type)
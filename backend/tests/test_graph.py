@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import httpx
+
+from app.services import graph as graph_module
+
+
+def test_concurrent_callers_share_one_token_refresh(fake_graph):
+    fake_graph.token_delay = 0.05
+
+    async def scenario():
+        client = fake_graph.client()
+        try:
+            tokens = await asyncio.gather(*(client.token() for _ in range(10)))
+            cached = await client.token()
+        finally:
+            await client.aclose()
+        return tokens, cached
+
+    tokens, cached = asyncio.run(scenario())
+    assert fake_graph.token_requests == 1
+    assert set(tokens) == {"token-1"}
+    assert cached == "token-1"
+
+
+def test_expired_token_is_refreshed(fake_graph):
+    async def scenario():
+        client = fake_graph.client()
+        try:
+            first = await client.token()
+            client._token_expires = 0
+            return first, await client.token()
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == ("token-1", "token-2")
+
+
+def test_401_refreshes_the_token_once(fake_graph):
+    def me(request):
+        if request.headers["Authorization"] == "Bearer token-1":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"id": "me"})
+    fake_graph.route("GET", "/me", me)
+
+    async def scenario():
+        client = fake_graph.client()
+        try:
+            return await client.request_json("GET", "me")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == {"id": "me"}
+    assert fake_graph.token_requests == 2
+
+
+def test_429_holds_every_caller_until_retry_after(fake_graph):
+    throttled = []
+
+    def busy(request):
+        if not throttled:
+            throttled.append(time.monotonic())
+            return httpx.Response(429, headers={"Retry-After": "0.3"})
+        return httpx.Response(200, json={"ok": True})
+    fake_graph.route("GET", "/busy", busy)
+    fake_graph.route("GET", "/other", lambda request: httpx.Response(200, json={"ok": True}))
+
+    async def scenario():
+        client = fake_graph.client()
+        try:
+            first = asyncio.ensure_future(client.request_json("GET", "busy"))
+            while not throttled:
+                await asyncio.sleep(0.01)
+            second = await client.request_json("GET", "other")
+            return await first, second
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == ({"ok": True}, {"ok": True})
+    retried = fake_graph.calls_to("GET", "/busy")[1]
+    other = fake_graph.calls_to("GET", "/other")[0]
+    assert len(fake_graph.calls_to("GET", "/busy")) == 2
+    assert retried - throttled[0] >= 0.29
+    assert other - throttled[0] >= 0.29
+
+
+def test_503_is_retried_only_for_idempotent_methods(fake_graph):
+    def unavailable_once(request):
+        if len(fake_graph.calls_to(request.method, request.url.path.removeprefix("/v1.0"))) == 1:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={})
+    fake_graph.route("GET", "/items", unavailable_once)
+    fake_graph.route("POST", "/me/sendMail", unavailable_once)
+
+    async def scenario():
+        client = fake_graph.client()
+        try:
+            return (await client.request("GET", "items")).status_code, \
+                (await client.request("POST", "me/sendMail", json={})).status_code
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == (200, 503)
+    assert len(fake_graph.calls_to("GET", "/items")) == 2
+    assert len(fake_graph.calls_to("POST", "/me/sendMail")) == 1
+
+
+def test_batch_splits_into_round_trips_of_20(fake_graph):
+    requests = [{"method": "GET", "url": f"/users/{i}"} for i in range(45)]
+
+    async def scenario():
+        client = fake_graph.client()
+        try:
+            return await client.batch(requests)
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+    assert [len(b) for b in fake_graph.batches] == [graph_module.BATCH_LIMIT, graph_module.BATCH_LIMIT, 5]
+    assert [r["body"]["url"] for r in results] == [r["url"] for r in requests]
+    assert all(r["status"] == 200 for r in results)
+
+
+def test_batch_retries_only_throttled_items(fake_graph):
+    seen = set()
+
+    def batch_item(item):
+        first = item["id"] not in seen
+        seen.add(item["id"])
+        if first and item["url"].startswith("/slow"):
+            return {"status": 429, "headers": {"Retry-After": "0"}}
+        if first and item["url"].startswith("/down"):
+            return {"status": 503, "headers": {"Retry-After": "0"}}
+        return {"status": 200, "body": {"url": item["url"]}}
+    fake_graph.batch_item = batch_item
+
+    requests = (
+        [{"method": "GET", "url": f"/fast/{i}"} for i in range(15)]
+        + [{"method": "GET", "url": f"/slow/{i}"} for i in range(10)]
+        + [{"method": "GET", "url": "/down/get"}, {"method": "POST", "url": "/down/sendMail", "body": {}}]
+    )
+
+    async def scenario():
+        client = fake_graph.client()
+        try:
+            return await client.batch(requests)
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+    # 27 items in two round trips, then one for the 10 throttled GETs and the unavailable GET
+    assert [len(b) for b in fake_graph.batches] == [20, 7, 11]
+    assert {item["url"] for item in fake_graph.batches[2]} == {f"/slow/{i}" for i in range(10)} | {"/down/get"}
+    assert [r["status"] for r in results[:26]] == [200] * 26
+    assert results[26]["status"] == 503  # the POST is not replayed
+    assert [r["body"]["url"] for r in results[:26]] == [r["url"] for r in requests[:26]]
+
+
+def test_stream_releases_its_slot_once_headers_arrive(fake_graph):
+    fake_graph.route("GET", "/file", lambda request: httpx.Response(200, content=b"x" * 10))
+    fake_graph.route("GET", "/me", lambda request: httpx.Response(200, json={"id": "me"}))
+
+    async def scenario():
+        client = fake_graph.client(max_connections=1)
+        try:
+            async with client.stream("GET", "file") as response:
+                # The only slot is free again while the body is still unread
+                me = await asyncio.wait_for(client.request_json("GET", "me"), 1)
+                body = await response.aread()
+            return me, body
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == ({"id": "me"}, b"x" * 10)
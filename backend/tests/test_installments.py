@@ -0,0 +1,37 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services.installments import ScheduleError, compute_schedule
+
+TERM = (date(2026, 1, 31), date(2027, 1, 31))
+
+
+def test_down_payment_is_the_first_installment():
+    schedule = compute_schedule("Quarterly", Decimal("1000.00"), Decimal("250.01"), *TERM)
+    assert schedule == [
+        (date(2026, 1, 31), Decimal("250.01")),
+        (date(2026, 4, 30), Decimal("250.01")),
+        (date(2026, 7, 31), Decimal("249.99")),
+        (date(2026, 10, 31), Decimal("249.99")),
+    ]
+
+
+def test_without_down_payment_the_premium_is_split_evenly():
+    schedule = compute_schedule("Monthly", Decimal("1200.05"), Decimal("0"), *TERM)
+    assert len(schedule) == 12
+    assert sum(amount for _, amount in schedule) == Decimal("1200.05")
+    assert schedule[0][1] == Decimal("100.05")
+
+
+@pytest.mark.parametrize("down_payment", [Decimal("1000.00"), Decimal("1200.00")])
+def test_down_payment_must_leave_a_balance(down_payment):
+    with pytest.raises(ScheduleError):
+        compute_schedule("Monthly", Decimal("1000.00"), down_payment, *TERM)
+
+
+def test_single_installment_terms_take_no_down_payment():
+    assert compute_schedule("Annual", Decimal("900.00"), Decimal("0"), *TERM) == [(TERM[0], Decimal("900.00"))]
+    with pytest.raises(ScheduleError):
+        compute_schedule("Annual", Decimal("900.00"), Decimal("100.00"), *TERM)
@@ -0,0 +1,211 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import documents
+from app.core.auth import get_current_user
+from app.db.session import get_db
+from app.services import storage
+from app.services.storage import LocalStorage, OneDriveStorage, StorageError, fixed_chunks
+
+DATA = bytes(range(256)) * 4  # 1 KiB
+
+
+async def _stream(data: bytes, piece: int = 100):
+    for i in range(0, len(data), piece):
+        yield data[i:i + piece]
+
+
+async def _collect(chunks) -> list[bytes]:
+    return [c async for c in chunks]
+
+
+def _upload(backend, key, data, size, chunk_size=64):
+    return asyncio.run(backend.upload(key, fixed_chunks(_stream(data), chunk_size), size))
+
+
+# ---------- LocalStorage ----------
+
+def test_fixed_chunks_rechunks_the_stream():
+    chunks = asyncio.run(_collect(fixed_chunks(_stream(DATA, 100), 64)))
+    assert [len(c) for c in chunks] == [64] * 16
+    assert b"".join(chunks) == DATA
+
+
+def test_local_upload_writes_the_file(tmp_path):
+    backend = LocalStorage(str(tmp_path))
+    stored = _upload(backend, "blobs/a", DATA, len(DATA))
+    assert (stored.ref, stored.size) == ("blobs/a", len(DATA))
+    assert (tmp_path / "blobs" / "a").read_bytes() == DATA
+
+
+@pytest.mark.parametrize("declared", [len(DATA) - 1, len(DATA) + 1])
+def test_local_upload_rejects_a_body_of_the_wrong_length(tmp_path, declared):
+    backend = LocalStorage(str(tmp_path))
+    with pytest.raises(StorageError):
+        _upload(backend, "blobs/a", DATA, declared)
+    # Neither the object nor its partial file is left behind
+    assert list((tmp_path / "blobs").iterdir()) == []
+
+
+def test_local_upload_rejects_paths_outside_the_root(tmp_path):
+    with pytest.raises(StorageError):
+        _upload(LocalStorage(str(tmp_path / "root")), "../escape", DATA, len(DATA))
+
+
+def test_local_download_reads_the_range_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "CHUNK_SIZE", 100)
+    backend = LocalStorage(str(tmp_path))
+    _upload(backend, "blobs/a", DATA, len(DATA))
+    chunks = asyncio.run(_collect(backend.download("blobs/a", 50, 409)))
+    assert [len(c) for c in chunks] == [100, 100, 100, 60]
+    assert b"".join(chunks) == DATA[50:410]
+
+
+# ---------- Range downloads ----------
+
+@pytest.fixture
+def download_client(tmp_path, monkeypatch):
+    backend = LocalStorage(str(tmp_path))
+    _upload(backend, "blobs/a", DATA, len(DATA))
+    monkeypatch.setattr(storage, "_local", backend)
+    document = SimpleNamespace(id=uuid.uuid4(), name="report.pdf", file_size=len(DATA), file_path="blobs/a",
+                               onedrive_file_id=None, file_type="application/pdf")
+
+    class FakeSession:
+        async def execute(self, query):
+            return SimpleNamespace(scalar_one_or_none=lambda: document)
+
+    async def fake_db():
+        yield FakeSession()
+
+    app = FastAPI()
+    app.include_router(documents.router)
+    app.dependency_overrides[get_db] = fake_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role="Admin")
+    return TestClient(app), f"/documents/{document.id}/content"
+
+
+def test_download_without_range_returns_the_whole_file(download_client):
+    client, url = download_client
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.content == DATA
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=1000-", 1000, 1023),
+    ("bytes=-24", 1000, 1023),
+    ("bytes=1000-5000", 1000, 1023),
+])
+def test_download_single_range_returns_206(download_client, header, start, end):
+    client, url = download_client
+    response = client.get(url, headers={"Range": header})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(DATA)}"
+    assert response.headers["content-length"] == str(end - start + 1)
+    assert response.content == DATA[start:end + 1]
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=2000-3000", "bytes=10-5"])
+def test_download_unsatisfiable_range_returns_416(download_client, header):
+    client, url = download_client
+    response = client.get(url, headers={"Range": header})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+def test_download_multiple_ranges_fall_back_to_the_whole_file(download_client):
+    client, url = download_client
+    response = client.get(url, headers={"Range": "bytes=0-9,20-29"})
+    assert response.status_code == 200
+    assert response.content == DATA
+
+
+# ---------- OneDrive upload sessions ----------
+
+UPLOAD_URL = "https://graph.test/upload/session-1"
+
+
+def test_onedrive_upload_resumes_from_next_expected_ranges(fake_graph, monkeypatch):
+    received = bytearray()
+    puts = []
+    failed = []
+
+    def put(request):
+        start = int(request.headers["Content-Range"].split()[1].split("-")[0])
+        puts.append((start, len(request.content)))
+        assert start == len(received)
+        if start == 256 and not failed:
+            # The server keeps part of the fragment before the request fails
+            failed.append(True)
+            received.extend(request.content[:100])
+            return httpx.Response(500)
+        received.extend(request.content)
+        if len(received) == len(DATA):
+            return httpx.Response(201, json={"id": "item-1"})
+        return httpx.Response(202, json={"nextExpectedRanges": [f"{len(received)}-"]})
+
+    fake_graph.route("POST", "/drives/drive-1/root:/Sentinel/blobs/a:/createUploadSession",
+                     lambda request: httpx.Response(200, json={"uploadUrl": UPLOAD_URL}))
+    fake_graph.route("PUT", "/upload/session-1", put)
+    fake_graph.route("GET", "/upload/session-1",
+                     lambda request: httpx.Response(200, json={"nextExpectedRanges": [f"{len(received)}-"]}))
+
+    async def scenario():
+        client = fake_graph.client()
+        monkeypatch.setattr(storage, "get_graph_client", lambda: client)
+        try:
+            return await OneDriveStorage("drive-1", "/Sentinel/").upload(
+                "blobs/a", fixed_chunks(_stream(DATA), 256), len(DATA))
+        finally:
+            await client.aclose()
+
+    stored = asyncio.run(scenario())
+    assert (stored.ref, stored.size) == ("item-1", len(DATA))
+    assert bytes(received) == DATA
+    # The failed fragment is resent from the first byte the session is missing
+    assert puts == [(0, 256), (256, 256), (356, 156), (512, 256), (768, 256)]
+
+
+def test_onedrive_upload_cancels_the_session_on_a_short_body(fake_graph, monkeypatch):
+    fake_graph.route("POST", "/drives/drive-1/root:/Sentinel/blobs/a:/createUploadSession",
+                     lambda request: httpx.Response(200, json={"uploadUrl": UPLOAD_URL}))
+    fake_graph.route("PUT", "/upload/session-1", lambda request: httpx.Response(202, json={}))
+    fake_graph.route("DELETE", "/upload/session-1", lambda request: httpx.Response(204))
+
+    async def scenario():
+        client = fake_graph.client()
+        monkeypatch.setattr(storage, "get_graph_client", lambda: client)
+        try:
+            await OneDriveStorage("drive-1", "Sentinel").upload(
+                "blobs/a", fixed_chunks(_stream(DATA), 256), len(DATA) + 1)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(StorageError):
+        asyncio.run(scenario())
+    assert len(fake_graph.calls_to("DELETE", "/upload/session-1")) == 1
+
+
+def test_onedrive_graph_failures_surface_as_storage_errors(fake_graph, monkeypatch):
+    fake_graph.route("DELETE", "/drives/drive-1/items/item-1", lambda request: httpx.Response(403))
+
+    async def scenario():
+        client = fake_graph.client()
+        monkeypatch.setattr(storage, "get_graph_client", lambda: client)
+        try:
+            await OneDriveStorage("drive-1", "Sentinel").upload("blobs/a", fixed_chunks(_stream(DATA)), len(DATA))
+        finally:
+            await client.aclose()
+
+    # createUploadSession is not routed: the fake answers 404
+    with pytest.raises(StorageError):
+        asyncio.run(scenario())
@@ -17,7 +17,7 @@ export default function CommLogForm({ entityType, entityId }) {
   const mutation = useMutation({
     mutationFn: (data) => commLogsApi.create(data),
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['accountCommLogs', entityId] });
+      queryClient.invalidateQueries({ queryKey: ['accountOverview', entityId] });
       setForm({ direction: 'Outbound', channel: 'Phone', subject: '', body_preview: '' });
       setOpen(false);
       toast.success('Activity logged');
@@ -25,7 +25,7 @@ export default function ContactModal({ accountId, contact, onClose }) {
       ? contactsApi.update(contact.id, data)
       : contactsApi.create({ ...data, account_id: accountId }),
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['accountContacts', accountId] });
+      queryClient.invalidateQueries({ queryKey: ['accountOverview', accountId] });
       toast.success(isEdit ? 'Contact updated' : 'Contact added');
       onClose();
     },
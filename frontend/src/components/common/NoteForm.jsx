@@ -12,7 +12,7 @@ export default function NoteForm({ entityType, entityId }) {
     mutationFn: (data) => notesApi.create(data),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [`${entityType.toLowerCase()}Notes`, entityId] });
-      queryClient.invalidateQueries({ queryKey: ['accountNotes', entityId] });
+      queryClient.invalidateQueries({ queryKey: ['accountOverview', entityId] });
       setContent('');
       toast.success('Note added');
     },
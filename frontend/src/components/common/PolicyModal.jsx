@@ -37,7 +37,7 @@ export default function PolicyModal({ accountId, onClose }) {
   const mutation = useMutation({
     mutationFn: (data) => policiesApi.create(data),
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['accountPolicies'] });
+      queryClient.invalidateQueries({ queryKey: ['accountOverview'] });
       queryClient.invalidateQueries({ queryKey: ['policies'] });
       toast.success('Policy added');
       onClose();
@@ -38,7 +38,7 @@ export default function ServiceItemModal({ accountId: initialAccountId, policies
   const mutation = useMutation({
     mutationFn: (data) => serviceBoardApi.create(data),
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['accountServiceItems'] });
+      queryClient.invalidateQueries({ queryKey: ['accountOverview'] });
       queryClient.invalidateQueries({ queryKey: ['serviceBoard'] });
       queryClient.invalidateQueries({ queryKey: ['dashboard'] });
       toast.success('Service item created');
@@ -16,7 +16,7 @@ export default function TaskModal({ entityType, entityId, onClose }) {
   const mutation = useMutation({
     mutationFn: (data) => tasksApi.create(data),
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['accountTasks'] });
+      queryClient.invalidateQueries({ queryKey: ['accountOverview'] });
       queryClient.invalidateQueries({ queryKey: ['dashboard'] });
       toast.success('Task created');
       onClose();
@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { accountsApi, policiesApi, serviceBoardApi, tasksApi, notesApi, commLogsApi } from '../services/api';
+import { accountsApi } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import {
   Users, Phone, Mail, MapPin, FileText, ClipboardList, MessageSquare,
@@ -53,53 +53,18 @@ export default function AccountDetailPage() {
   const [editing, setEditing] = useState(false);
   const [editData, setEditData] = useState({});
 
-  // Queries
-  const { data: account, isLoading } = useQuery({
-    queryKey: ['account', id],
-    queryFn: () => accountsApi.get(id).then(r => r.data),
-  });
-
-  const { data: contacts } = useQuery({
-    queryKey: ['accountContacts', id],
-    queryFn: () => accountsApi.contacts(id).then(r => r.data),
-    enabled: !!id,
-  });
-
-  const { data: policies } = useQuery({
-    queryKey: ['accountPolicies', id],
-    queryFn: () => policiesApi.list({ account_id: id, page_size: 100 }).then(r => r.data),
-    enabled: !!id,
-  });
-
-  const { data: serviceItems } = useQuery({
-    queryKey: ['accountServiceItems', id],
-    queryFn: () => serviceBoardApi.list({ account_id: id }).then(r => r.data),
-    enabled: !!id,
-  });
-
-  const { data: taskData } = useQuery({
-    queryKey: ['accountTasks', id],
-    queryFn: () => tasksApi.list({ linked_entity_type: 'Account', linked_entity_id: id }).then(r => r.data),
-    enabled: !!id,
-  });
-
-  const { data: notes } = useQuery({
-    queryKey: ['accountNotes', id],
-    queryFn: () => notesApi.list('Account', id).then(r => r.data),
-    enabled: !!id,
-  });
-
-  const { data: commLogs } = useQuery({
-    queryKey: ['accountCommLogs', id],
-    queryFn: () => commLogsApi.list('Account', id).then(r => r.data),
-    enabled: !!id,
+  // One request for the account and everything shown on the page
+  const { data: overview, isLoading } = useQuery({
+    queryKey: ['accountOverview', id],
+    queryFn: () => accountsApi.overview(id).then(r => r.data),
   });
+  const account = overview?.account;
 
   // Mutations
   const updateAccount = useMutation({
     mutationFn: (data) => accountsApi.update(id, data),
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['account', id] });
+      queryClient.invalidateQueries({ queryKey: ['accountOverview', id] });
       setEditing(false);
       toast.success('Account updated');
     },
@@ -114,12 +79,8 @@ export default function AccountDetailPage() {
     return <div className="card text-center py-12"><p className="text-gray-500">Account not found</p></div>;
   }
 
-  const policyList = policies?.items || [];
-  const siList = serviceItems?.items || [];
-  const taskList = taskData?.items || [];
-  const noteList = notes || [];
-  const commList = commLogs || [];
-  const contactList = contacts || [];
+  const { contacts: contactList, policies: policyList, service_items: siList, tasks: taskList,
+          notes: noteList, comm_logs: commList, summary } = overview;
 
   return (
     <div className="space-y-6">
@@ -189,6 +150,11 @@ export default function AccountDetailPage() {
                 {account.county && <span className="text-gray-400">({account.county} County)</span>}
               </div>
             )}
+            <div className="flex flex-wrap items-center gap-4 mt-3 text-xs text-gray-500">
+              <span>{summary.active_policies} active policies · ${Number(summary.total_premium).toLocaleString()} premium</span>
+              <span>{summary.open_service_items} open service items</span>
+              {summary.last_contact_at && <span>Last contact {new Date(summary.last_contact_at).toLocaleDateString()}</span>}
+            </div>
           </div>
           {!editing && (
             <button
@@ -207,7 +173,7 @@ export default function AccountDetailPage() {
 
           {/* Contacts */}
           <Section
-            title="Contacts" icon={Users} count={contactList.length}
+            title="Contacts" icon={Users} count={summary.contacts}
             actions={<button onClick={() => setShowContactModal(true)} className="p-1 text-sentinel-500 hover:bg-sentinel-50 rounded"><Plus className="w-4 h-4" /></button>}
           >
             {contactList.length === 0 ? (
@@ -246,7 +212,7 @@ export default function AccountDetailPage() {
 
           {/* Policies */}
           <Section
-            title="Policies" icon={FileText} count={policyList.length}
+            title="Policies" icon={FileText} count={summary.policies}
             actions={<button onClick={() => setShowPolicyModal(true)} className="p-1 text-sentinel-500 hover:bg-sentinel-50 rounded"><Plus className="w-4 h-4" /></button>}
           >
             {policyList.length === 0 ? (
@@ -297,7 +263,7 @@ export default function AccountDetailPage() {
 
           {/* Service Items */}
           <Section
-            title="Service Items" icon={ClipboardList} count={siList.length}
+            title="Service Items" icon={ClipboardList} count={summary.open_service_items}
             actions={<button onClick={() => setShowServiceModal(true)} className="p-1 text-sentinel-500 hover:bg-sentinel-50 rounded"><Plus className="w-4 h-4" /></button>}
           >
             {siList.length === 0 ? (
@@ -333,7 +299,7 @@ export default function AccountDetailPage() {
 
           {/* Tasks */}
           <Section
-            title="Tasks" icon={ClipboardList} count={taskList.length} defaultOpen={true}
+            title="Tasks" icon={ClipboardList} count={summary.open_tasks} defaultOpen={true}
             actions={<button onClick={() => setShowTaskModal(true)} className="p-1 text-sentinel-500 hover:bg-sentinel-50 rounded"><Plus className="w-4 h-4" /></button>}
           >
             {taskList.length === 0 ? (
@@ -356,7 +322,7 @@ export default function AccountDetailPage() {
           </Section>
 
           {/* Notes */}
-          <Section title="Notes" icon={StickyNote} count={noteList.length}>
+          <Section title="Notes" icon={StickyNote} count={summary.notes}>
             <NoteForm entityType="Account" entityId={id} />
             <div className="space-y-3 mt-3">
               {noteList.map(n => (
@@ -369,7 +335,7 @@ export default function AccountDetailPage() {
           </Section>
 
           {/* Communication Log */}
-          <Section title="Activity" icon={MessageSquare} count={commList.length}>
+          <Section title="Activity" icon={MessageSquare} count={summary.comm_logs}>
             <CommLogForm entityType="Account" entityId={id} />
             <div className="space-y-2 mt-3">
               {commList.map(c => (
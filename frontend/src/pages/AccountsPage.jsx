@@ -9,10 +9,14 @@ export default function AccountsPage() {
   const [search, setSearch] = useState('');
   const [typeFilter, setTypeFilter] = useState('');
   const [statusFilter, setStatusFilter] = useState('');
+  const [sort, setSort] = useState('name');
 
   const { data, isLoading } = useQuery({
-    queryKey: ['accounts', { page, search, type: typeFilter, status: statusFilter }],
-    queryFn: () => accountsApi.list({ page, page_size: 25, search: search || undefined, type: typeFilter || undefined, status: statusFilter || undefined }).then(r => r.data),
+    queryKey: ['accounts', { page, search, type: typeFilter, status: statusFilter, sort }],
+    queryFn: () => accountsApi.list({
+      page, page_size: 25, search: search || undefined, type: typeFilter || undefined, status: statusFilter || undefined,
+      sort, descending: sort !== 'name',
+    }).then(r => r.data),
     keepPreviousData: true,
   });
 
@@ -66,6 +70,16 @@ export default function AccountsPage() {
             <option value="Prospect">Prospect</option>
           </select>
         </div>
+        <div>
+          <label className="label">Sort</label>
+          <select className="input" value={sort} onChange={e => { setSort(e.target.value); setPage(1); }}>
+            <option value="name">Name</option>
+            <option value="active_premium">Premium</option>
+            <option value="policy_count">Policies</option>
+            <option value="open_service_items">Open service items</option>
+            <option value="last_contact_at">Last contact</option>
+          </select>
+        </div>
       </div>
 
       {/* Table */}
@@ -84,6 +98,8 @@ export default function AccountsPage() {
                 <th className="text-left py-3 px-3 font-medium text-gray-500">Phone</th>
                 <th className="text-left py-3 px-3 font-medium text-gray-500">City</th>
                 <th className="text-left py-3 px-3 font-medium text-gray-500">Zip</th>
+                <th className="text-right py-3 px-3 font-medium text-gray-500">Policies</th>
+                <th className="text-right py-3 px-3 font-medium text-gray-500">Premium</th>
                 <th className="py-3 px-3"></th>
               </tr>
             </thead>
@@ -114,6 +130,10 @@ export default function AccountsPage() {
                   </td>
                   <td className="py-2.5 px-3 text-gray-500">{acct.city || '—'}</td>
                   <td className="py-2.5 px-3 text-gray-500">{acct.zip_code || '—'}</td>
+                  <td className="py-2.5 px-3 text-right text-gray-500">{acct.policy_count ?? '—'}</td>
+                  <td className="py-2.5 px-3 text-right text-gray-500">
+                    {acct.active_premium != null ? `$${Number(acct.active_premium).toLocaleString()}` : '—'}
+                  </td>
                   <td className="py-2.5 px-3">
                     <Link to={`/accounts/${acct.id}`} className="text-gray-400 hover:text-gray-600">
                       <ChevronRight className="w-4 h-4" />
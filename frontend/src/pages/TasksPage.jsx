@@ -1,6 +1,7 @@
 import { useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { tasksApi } from '../services/api';
+import { Link } from 'react-router-dom';
+import { tasksApi, entitiesApi } from '../services/api';
 import { CheckSquare, Plus, Check } from 'lucide-react';
 import TaskModal from '../components/common/TaskModal';
 import toast from 'react-hot-toast';
@@ -44,6 +45,17 @@ export default function TasksPage() {
 
   const tasks = data?.items || [];
 
+  // "Linked to" names for the whole list in one request
+  const refs = tasks
+    .filter(t => t.linked_entity_type && t.linked_entity_id)
+    .map(t => ({ type: t.linked_entity_type, id: t.linked_entity_id }));
+  const { data: linked } = useQuery({
+    queryKey: ['linkedEntities', refs.map(r => `${r.type}:${r.id}`).join(',')],
+    queryFn: () => entitiesApi.resolve(refs).then(r => r.data),
+    enabled: refs.length > 0,
+  });
+  const linkedName = (task) => linked?.find(e => e.type === task.linked_entity_type && e.id === task.linked_entity_id);
+
   return (
     <div className="space-y-4">
       <div className="flex items-center justify-between flex-wrap gap-4">
@@ -91,6 +103,11 @@ export default function TasksPage() {
                 <div className="flex-1 min-w-0">
                   <p className="text-sm font-medium text-gray-900">{task.title}</p>
                   {task.description && <p className="text-xs text-gray-500 truncate mt-0.5">{task.description}</p>}
+                  {linkedName(task) && (
+                    <Link to={linkedName(task).link} className="text-xs text-sentinel-600 hover:text-sentinel-700">
+                      {linkedName(task).name}
+                    </Link>
+                  )}
                 </div>
                 <span className={`badge ${priorityBadge(task.priority)}`}>{task.priority}</span>
                 <span className={`text-xs ${dueDateColor(task.due_date)}`}>
@@ -55,6 +55,9 @@ export const accountsApi = {
   update: (id, data) => api.put(`/accounts/${id}`, data),
   delete: (id) => api.delete(`/accounts/${id}`),
   contacts: (id) => api.get(`/accounts/${id}/contacts`),
+  overview: (id) => api.get(`/accounts/${id}/overview`),
+  // pairs: [{ survivor_id, merged_id }]
+  merge: (pairs) => api.post('/accounts/merge', { pairs }),
 };
 
 // ========== CONTACTS ==========
@@ -72,6 +75,7 @@ export const policiesApi = {
   update: (id, data) => api.put(`/policies/${id}`, data),
   installments: (policyId) => api.get(`/policies/${policyId}/installments`),
   createInstallment: (policyId, data) => api.post(`/policies/${policyId}/installments`, data),
+  generateSchedule: (policyId, data) => api.post(`/policies/${policyId}/installments/schedule`, data),
   updateInstallment: (id, data) => api.put(`/policies/installments/${id}`, data),
 };
 
@@ -81,6 +85,7 @@ export const serviceBoardApi = {
   get: (id) => api.get(`/service-board/${id}`),
   create: (data) => api.post('/service-board', data),
   update: (id, data) => api.put(`/service-board/${id}`, data),
+  bulkUpdate: (data) => api.post('/service-board/bulk', data),
 };
 
 // ========== TASKS ==========
@@ -89,6 +94,7 @@ export const tasksApi = {
   my: (params) => api.get('/tasks/my', { params }),
   create: (data) => api.post('/tasks', data),
   update: (id, data) => api.put(`/tasks/${id}`, data),
+  bulkUpdate: (data) => api.post('/tasks/bulk', data),
 };
 
 // ========== PROSPECTS ==========
@@ -115,6 +121,8 @@ export const carriersApi = {
   list: (params) => api.get('/carriers', { params }),
   get: (id) => api.get(`/carriers/${id}`),
   create: (data) => api.post('/carriers', data),
+  // formData: file, kind (policies | billing), optional layout JSON, dry_run
+  ingestDownload: (id, formData) => api.post(`/carriers/${id}/downloads`, formData),
 };
 
 // ========== NOTES ==========
@@ -128,3 +136,72 @@ export const commLogsApi = {
   list: (entityType, entityId, channel) => api.get('/comm-logs', { params: { linked_entity_type: entityType, linked_entity_id: entityId, channel } }),
   create: (data) => api.post('/comm-logs', data),
 };
+
+// ========== IMPORTS ==========
+export const importsApi = {
+  // entity: accounts | contacts | policies; formData carries file and dry_run
+  upload: (entity, formData) => api.post(`/imports/${entity}`, formData),
+};
+
+// ========== DUPLICATES ==========
+export const duplicatesApi = {
+  check: (data) => api.post('/duplicates/check', data),
+  list: (params) => api.get('/duplicates', { params }),
+  update: (id, data) => api.put(`/duplicates/${id}`, data),
+};
+
+// ========== REASSIGNMENTS ==========
+export const reassignmentsApi = {
+  // data: { from_user_id, to_user_id, include?, accounts?, prospects? }
+  reassign: (data) => api.post('/reassignments', data),
+};
+
+// ========== ENTITY REFERENCES ==========
+export const entitiesApi = {
+  // refs: [{ type: 'Account' | 'Contact' | 'Policy' | 'Prospect', id }]
+  resolve: (refs) => api.post('/entities/resolve', { refs }),
+};
+
+// ========== ANALYTICS ==========
+export const analyticsApi = {
+  // params: { group_by: 'carrier,lob', status, carrier_id, producer_id, county, expiration_from, ... }
+  book: (params) => api.get('/analytics/book', { params }),
+};
+
+// ========== DOCUMENTS ==========
+export const documentsApi = {
+  list: (entityType, entityId) => api.get('/documents', { params: { linked_entity_type: entityType, linked_entity_id: entityId } }),
+  // Raw file body; metadata travels in the query string. An optional hex
+  // SHA-256 is verified against the uploaded bytes.
+  upload: (file, params, sha256) => api.post('/documents', file, {
+    params: { name: file.name, ...params },
+    headers: {
+      'Content-Type': file.type || 'application/octet-stream',
+      ...(sha256 ? { 'X-Content-SHA256': sha256 } : {}),
+    },
+  }),
+  download: (id) => api.get(`/documents/${id}/content`, { responseType: 'blob' }),
+  delete: (id) => api.delete(`/documents/${id}`),
+};
+
+// ========== NURTURE SEQUENCES ==========
+export const sequencesApi = {
+  enroll: (sequenceId, filters) => api.post(`/sequences/${sequenceId}/enroll`, filters),
+};
+
+// ========== REMINDERS & NOTIFICATIONS ==========
+export const remindersApi = {
+  create: (data) => api.post('/reminders', data),
+  dismiss: (id) => api.put(`/reminders/${id}/dismiss`),
+};
+
+export const notificationsApi = {
+  unread: (params) => api.get('/notifications/unread', { params }),
+  markRead: (ids) => api.post('/notifications/read', { ids }),
+};
+
+// ========== COMMISSIONS ==========
+export const commissionsApi = {
+  generateExpected: (data) => api.post('/commissions/expected', data),
+  reconcile: (formData) => api.post('/commissions/reconcile', formData),
+};
@@ -7,6 +7,7 @@
 -- Enable UUID generation
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pg_trgm";  -- For fuzzy text search
+CREATE EXTENSION IF NOT EXISTS "fuzzystrmatch";  -- soundex() blocking keys for duplicate detection
 
 -- ============================================================================
 -- ENUMS
@@ -109,16 +110,22 @@ CREATE TABLE accounts (
     county VARCHAR(100),
     phone VARCHAR(20),
     email VARCHAR(255),
+    external_id VARCHAR(100),  -- key in the previous agency management system (imports)
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+CREATE UNIQUE INDEX uq_accounts_external_id ON accounts(external_id) WHERE external_id IS NOT NULL;
 CREATE INDEX idx_accounts_type ON accounts(type);
 CREATE INDEX idx_accounts_status ON accounts(status);
 CREATE INDEX idx_accounts_zip ON accounts(zip_code);
 CREATE INDEX idx_accounts_county ON accounts(county);
 CREATE INDEX idx_accounts_producer ON accounts(assigned_producer_id);
 CREATE INDEX idx_accounts_name_trgm ON accounts USING gin(name gin_trgm_ops);
+CREATE INDEX idx_accounts_email_lower ON accounts(lower(email));
+-- Duplicate detection blocking keys (expressions must match app.services.duplicates)
+CREATE INDEX idx_accounts_phone_digits ON accounts(nullif(right(regexp_replace(phone, '[^0-9]', '', 'g'), 10), ''));
+CREATE INDEX idx_accounts_zip_soundex ON accounts(zip_code, soundex(name));
 
 -- 2. Contact
 CREATE TABLE contacts (
@@ -139,7 +146,12 @@ CREATE TABLE contacts (
 
 CREATE INDEX idx_contacts_account ON contacts(account_id);
 CREATE INDEX idx_contacts_email ON contacts(email);
+-- Mail sync matches on normalized (lower-cased) addresses
+CREATE INDEX idx_contacts_email_lower ON contacts(lower(email));
 CREATE INDEX idx_contacts_name_trgm ON contacts USING gin((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX idx_contacts_phone_digits ON contacts(nullif(right(regexp_replace(phone, '[^0-9]', '', 'g'), 10), ''));
+CREATE INDEX idx_contacts_mobile_digits ON contacts(nullif(right(regexp_replace(mobile_phone, '[^0-9]', '', 'g'), 10), ''));
+CREATE INDEX idx_contacts_soundex ON contacts(soundex(last_name), lower(left(first_name, 1)));
 
 -- Add FK for Account.primary_contact_id
 ALTER TABLE accounts ADD CONSTRAINT fk_accounts_primary_contact
@@ -155,6 +167,8 @@ CREATE TABLE carriers (
     portal_url VARCHAR(500),
     appetite_notes TEXT,
     am_best_rating VARCHAR(20),
+    new_business_commission_pct DECIMAL(5,2),
+    renewal_commission_pct DECIMAL(5,2),
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
@@ -203,6 +217,8 @@ CREATE INDEX idx_policies_status ON policies(status);
 CREATE INDEX idx_policies_lob ON policies(line_of_business);
 CREATE INDEX idx_policies_renewal_status ON policies(renewal_status);
 CREATE INDEX idx_policies_servicing_owner ON policies(servicing_owner_id);
+-- Carrier downloads match on the policy number's letters and digits only
+CREATE INDEX idx_policies_carrier_number_norm ON policies(carrier_id, (upper(regexp_replace(policy_number, '[^A-Za-z0-9]', '', 'g'))));
 
 -- 4. Installment
 CREATE TABLE installments (
@@ -254,11 +270,38 @@ CREATE INDEX idx_prospects_producer ON prospects(assigned_producer_id);
 CREATE INDEX idx_prospects_zip ON prospects(zip_code);
 CREATE INDEX idx_prospects_county ON prospects(county);
 CREATE INDEX idx_prospects_name_trgm ON prospects USING gin((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX idx_prospects_email_lower ON prospects(lower(email));
+CREATE INDEX idx_prospects_phone_digits ON prospects(nullif(right(regexp_replace(phone, '[^0-9]', '', 'g'), 10), ''));
+CREATE INDEX idx_prospects_zip_soundex ON prospects(zip_code, soundex(last_name));
 
 -- ============================================================================
 -- DOCUMENTS, NOTES, TASKS
 -- ============================================================================
 
+-- 43. Document Blob (content-addressed: one stored object per distinct SHA-256)
+CREATE TABLE document_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size BIGINT NOT NULL,
+    storage VARCHAR(20) NOT NULL,  -- local, onedrive
+    ref TEXT NOT NULL,             -- local path or OneDrive item id
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- 48. Blob Deletion (stored objects to remove once the transaction that queued
+--     them has committed; swept by the blob_sweep job)
+CREATE TABLE blob_deletions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    storage VARCHAR(20) NOT NULL,  -- local, onedrive
+    ref TEXT NOT NULL,             -- local path, OneDrive item id or path under the root folder
+    not_before TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_blob_deletions_due ON blob_deletions(not_before);
+
 -- 9. Document (polymorphic)
 CREATE TABLE documents (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -272,10 +315,12 @@ CREATE TABLE documents (
     uploaded_by UUID REFERENCES users(id),
     uploaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     description TEXT,
-    onedrive_file_id VARCHAR(500)
+    onedrive_file_id VARCHAR(500),
+    content_hash CHAR(64) REFERENCES document_blobs(sha256)
 );
 
 CREATE INDEX idx_documents_entity ON documents(linked_entity_type, linked_entity_id);
+CREATE INDEX idx_documents_content_hash ON documents(content_hash);
 CREATE INDEX idx_documents_category ON documents(category);
 
 -- 10. Note (polymorphic)
@@ -345,6 +390,8 @@ CREATE INDEX idx_comm_logs_contact ON communication_logs(contact_id);
 CREATE INDEX idx_comm_logs_user ON communication_logs(user_id);
 CREATE INDEX idx_comm_logs_channel ON communication_logs(channel);
 CREATE INDEX idx_comm_logs_logged ON communication_logs(logged_at DESC);
+-- Synced Outlook messages are logged once (Internet Message-ID)
+CREATE UNIQUE INDEX uq_comm_logs_outlook_message ON communication_logs(outlook_message_id) WHERE outlook_message_id IS NOT NULL;
 
 -- 39. Communication Log Link (multi-entity linking)
 CREATE TABLE communication_log_links (
@@ -625,13 +672,19 @@ CREATE TABLE sequence_enrollments (
     current_step_order INTEGER NOT NULL DEFAULT 0,
     status enrollment_status NOT NULL DEFAULT 'Active',
     enrolled_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    completed_at TIMESTAMPTZ
+    completed_at TIMESTAMPTZ,
+    next_due_at TIMESTAMPTZ DEFAULT NOW()  -- When the next step is due (NULL once finished)
 );
 
 CREATE INDEX idx_enrollments_sequence ON sequence_enrollments(sequence_id);
 CREATE INDEX idx_enrollments_prospect ON sequence_enrollments(prospect_id);
 CREATE INDEX idx_enrollments_account ON sequence_enrollments(account_id);
 CREATE INDEX idx_enrollments_status ON sequence_enrollments(status);
+-- Scheduler claims due enrollments through this index only
+CREATE INDEX idx_enrollments_next_due ON sequence_enrollments(next_due_at) WHERE status = 'Active';
+-- At most one active enrollment per sequence and target (bulk enrollment dedupes on these)
+CREATE UNIQUE INDEX uq_enrollments_active_prospect ON sequence_enrollments(sequence_id, prospect_id) WHERE status = 'Active';
+CREATE UNIQUE INDEX uq_enrollments_active_account ON sequence_enrollments(sequence_id, account_id) WHERE status = 'Active';
 
 -- 25. Sequence Step Execution
 CREATE TABLE sequence_step_executions (
@@ -686,7 +739,7 @@ CREATE UNIQUE INDEX idx_auto_exec_unique ON automation_executions(rule_id, targe
     WHERE status = 'Success';
 
 -- ============================================================================
--- REMINDERS
+-- REMINDERS & NOTIFICATIONS
 -- ============================================================================
 
 -- 28. Reminder
@@ -699,12 +752,33 @@ CREATE TABLE reminders (
     is_dismissed BOOLEAN NOT NULL DEFAULT false,
     created_by UUID REFERENCES users(id),
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    dismissed_at TIMESTAMPTZ
+    dismissed_at TIMESTAMPTZ,
+    delivered_at TIMESTAMPTZ  -- Set by the reminder dispatcher
 );
 
-CREATE INDEX idx_reminders_date ON reminders(reminder_date) WHERE NOT is_dismissed;
+-- Pending reminders only: the dispatcher claims due rows through this index,
+-- and delivered or dismissed rows drop out of it
+CREATE INDEX idx_reminders_date ON reminders(reminder_date) WHERE NOT is_dismissed AND delivered_at IS NULL;
 CREATE INDEX idx_reminders_entity ON reminders(linked_entity_type, linked_entity_id);
 
+-- 41. Notification (in-app feed)
+CREATE TABLE notifications (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    title VARCHAR(255) NOT NULL,
+    message TEXT,
+    linked_entity_type VARCHAR(50),
+    linked_entity_id UUID,
+    source VARCHAR(30) NOT NULL,  -- Reminder, Nurture, Automation, Reassignment
+    source_id UUID,
+    is_read BOOLEAN NOT NULL DEFAULT false,
+    read_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Unread feed per user is a single index range scan
+CREATE INDEX idx_notifications_user_unread ON notifications(user_id, created_at DESC) WHERE NOT is_read;
+
 -- ============================================================================
 -- TAGS
 -- ============================================================================
@@ -781,6 +855,8 @@ CREATE TABLE commissions (
 
 CREATE INDEX idx_commissions_policy ON commissions(policy_id);
 CREATE INDEX idx_commissions_status ON commissions(status);
+-- One expected commission per policy per period (upsert target for the generator)
+CREATE UNIQUE INDEX uq_commissions_policy_period ON commissions(policy_id, period);
 
 -- ============================================================================
 -- REVIEWS & REFERRALS
@@ -852,6 +928,117 @@ CREATE TABLE acord_form_mappings (
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+-- ============================================================================
+-- JOB STATE
+-- ============================================================================
+
+-- 42. Job State (watermarks for incremental batch jobs)
+CREATE TABLE job_states (
+    name VARCHAR(100) PRIMARY KEY,
+    last_run_at TIMESTAMPTZ,
+    state_json JSONB,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- ============================================================================
+-- DATA QUALITY
+-- ============================================================================
+
+-- 44. Duplicate Candidate (likely-duplicate record pairs, entity_a_id < entity_b_id)
+CREATE TABLE duplicate_candidates (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    entity_type VARCHAR(50) NOT NULL,  -- Account, Contact, Prospect
+    entity_a_id UUID NOT NULL,
+    entity_b_id UUID NOT NULL,
+    score DECIMAL(4,3) NOT NULL,
+    reasons TEXT[] NOT NULL DEFAULT '{}',  -- name, phone, email, zip
+    status VARCHAR(20) NOT NULL DEFAULT 'Open',  -- Open, Dismissed, Merged
+    detected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    resolved_by UUID REFERENCES users(id),
+    resolved_at TIMESTAMPTZ
+);
+
+CREATE UNIQUE INDEX uq_duplicate_candidates_pair ON duplicate_candidates(entity_type, entity_a_id, entity_b_id);
+CREATE INDEX idx_duplicate_candidates_open ON duplicate_candidates(entity_type, score DESC) WHERE status = 'Open';
+
+-- ============================================================================
+-- ACCOUNT SUMMARY
+-- ============================================================================
+
+-- 45. Account Summary (rollups for list filtering/sorting; maintained by the
+--     application's write paths and reconciled by the account_summary job)
+CREATE TABLE account_summaries (
+    account_id UUID PRIMARY KEY REFERENCES accounts(id) ON DELETE CASCADE,
+    policy_count INTEGER NOT NULL DEFAULT 0,  -- Active policies
+    active_premium DECIMAL(14,2) NOT NULL DEFAULT 0,  -- Premium on Active policies
+    written_premium DECIMAL(14,2) NOT NULL DEFAULT 0,  -- Sales log premium
+    open_service_items INTEGER NOT NULL DEFAULT 0,
+    last_contact_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_account_summaries_policies ON account_summaries(policy_count, active_premium);
+CREATE INDEX idx_account_summaries_premium ON account_summaries(active_premium);
+CREATE INDEX idx_account_summaries_written ON account_summaries(written_premium);
+CREATE INDEX idx_account_summaries_open_items ON account_summaries(open_service_items);
+CREATE INDEX idx_account_summaries_last_contact ON account_summaries(last_contact_at);
+
+-- ============================================================================
+-- BOOK OF BUSINESS CUBE
+-- ============================================================================
+
+-- 46. Policy Book Cube (policies pre-aggregated over the reporting dimensions;
+--     refreshed CONCURRENTLY by the book_cube job so readers are never blocked)
+CREATE MATERIALIZED VIEW policy_book_cube AS
+SELECT
+    p.carrier_id,
+    p.line_of_business,
+    COALESCE(p.producing_agent_id, a.assigned_producer_id) AS producer_id,
+    a.county,
+    a.type AS account_type,
+    p.status,
+    date_trunc('month', p.effective_date)::date AS effective_month,
+    date_trunc('month', p.expiration_date)::date AS expiration_month,
+    COUNT(*) AS policy_count,
+    COALESCE(SUM(p.premium), 0)::DECIMAL(14,2) AS premium,
+    -- Policies that have been renewed (a later policy points back at them)
+    COUNT(*) FILTER (WHERE EXISTS (SELECT 1 FROM policies n WHERE n.prior_policy_id = p.id)) AS renewed_count
+FROM policies p
+JOIN accounts a ON a.id = p.account_id
+GROUP BY 1, 2, 3, 4, 5, 6, 7, 8;
+
+-- REFRESH ... CONCURRENTLY requires a unique index over plain columns
+CREATE UNIQUE INDEX uq_policy_book_cube ON policy_book_cube(
+    carrier_id, line_of_business, producer_id, county, account_type, status, effective_month, expiration_month
+);
+CREATE INDEX idx_policy_book_cube_expiration ON policy_book_cube(expiration_month);
+CREATE INDEX idx_policy_book_cube_producer ON policy_book_cube(producer_id);
+
+-- ============================================================================
+-- EMAIL OUTBOX
+-- ============================================================================
+
+-- 47. Email Outbox (messages queued inside a transaction; the email_outbox job
+--     sends them only after that transaction has committed)
+CREATE TABLE email_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    to_address VARCHAR(255) NOT NULL,
+    subject VARCHAR(500) NOT NULL,
+    body TEXT NOT NULL,
+    body_html TEXT,
+    comm_log_id UUID REFERENCES communication_logs(id) ON DELETE SET NULL,  -- sent_at is set on delivery
+    source VARCHAR(50),
+    status VARCHAR(20) NOT NULL DEFAULT 'Pending',  -- Pending, Sending, Sent, Failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    claimed_at TIMESTAMPTZ,
+    sent_at TIMESTAMPTZ
+);
+
+CREATE INDEX idx_email_outbox_pending ON email_outbox(created_at) WHERE status = 'Pending';
+CREATE INDEX idx_email_outbox_sending ON email_outbox(claimed_at) WHERE status = 'Sending';
+
 -- ============================================================================
 -- AUDIT LOG (IMMUTABLE)
 -- ============================================================================